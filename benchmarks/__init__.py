@@ -0,0 +1 @@
+"""Benchmarks for farpostbooks_backend."""
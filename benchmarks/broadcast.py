@@ -0,0 +1,142 @@
+"""
+Пропускная способность рассылки в Telegram (сообщений в секунду).
+
+Вместо Bot API поднимается локальный сервер, который отвечает на
+sendMessage с задержкой LATENCY. Прежняя последовательная рассылка
+(отправка + asyncio.sleep(0.05)) сохранена здесь только для сравнения.
+
+Запуск: python -m benchmarks.broadcast
+"""
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+
+from farpostbooks_backend.services.broadcast import Broadcaster, send_message
+from farpostbooks_backend.settings import settings
+
+HOST = "127.0.0.1"
+PORT = 8181
+LATENCY = 0.05
+LEGACY_SLEEP = 0.05
+MESSAGES = 300
+MAX_IN_FLIGHT = 16
+GLOBAL_LIMITS = ((30, 30), (1000, 100))
+
+
+async def send_message_handler(request: web.Request) -> web.Response:
+    """
+    Ответ на sendMessage с задержкой, как у настоящего Bot API.
+
+    :param request: Запрос.
+    :return: Ответ в формате Bot API.
+    """
+    form = await request.post()
+    await asyncio.sleep(LATENCY)
+    chat_id = int(str(form["chat_id"]))
+    return web.json_response(
+        {
+            "ok": True,
+            "result": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": form["text"],
+            },
+        },
+    )
+
+
+async def legacy_broadcast(bot: Bot, chat_ids: Iterable[int], text: str) -> None:
+    """
+    Прежняя рассылка: по одному сообщению с паузой.
+
+    :param bot: Инстанс бота.
+    :param chat_ids: ID чатов.
+    :param text: Текст для отправки.
+    """
+    for chat_id in chat_ids:
+        await send_message(bot=bot, chat_id=chat_id, text=text)
+        await asyncio.sleep(LEGACY_SLEEP)
+
+
+async def report_rate(name: str, func: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Вывод числа сообщений в секунду.
+
+    :param name: Название замера.
+    :param func: Функция, выполняющая рассылку MESSAGES сообщений.
+    """
+    before_time = time.perf_counter()
+    await func()
+    rate = MESSAGES / (time.perf_counter() - before_time)
+    print(f"{name:<40} {rate:8.1f} msg/s")  # noqa: WPS421
+
+
+async def concurrent_broadcast(
+    bot: Bot,
+    chat_ids: Iterable[int],
+    text: str,
+    global_limit: Tuple[float, int],
+) -> None:
+    """
+    Новая рассылка с общим ограничением частоты global_limit.
+
+    :param bot: Инстанс бота.
+    :param chat_ids: ID чатов.
+    :param text: Текст для отправки.
+    :param global_limit: Сообщений в секунду и размер корзины.
+    """
+    broadcaster = Broadcaster(
+        bot,
+        global_limit=global_limit,
+        chat_limit=(1, 1),
+        max_in_flight=MAX_IN_FLIGHT,
+    )
+    await broadcaster.broadcast(chat_ids, text)
+
+
+async def start_server() -> web.AppRunner:
+    """
+    Запуск локального сервера вместо Bot API.
+
+    :return: Запущенный сервер.
+    """
+    app = web.Application()
+    app.router.add_post("/bot{token}/sendMessage", send_message_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    return runner
+
+
+async def main() -> None:
+    """Запуск сервера и замеры."""
+    logging.disable(logging.INFO)
+    runner = await start_server()
+    api = TelegramAPIServer.from_base(f"http://{HOST}:{PORT}")
+    bot = Bot(token=settings.bot_token, session=AiohttpSession(api=api))
+    chat_ids = range(MESSAGES)
+    try:  # noqa: WPS501
+        await report_rate(
+            "sequential, sleep 0.05",
+            partial(legacy_broadcast, bot, chat_ids, "text"),
+        )
+        for global_limit in GLOBAL_LIMITS:
+            await report_rate(
+                f"concurrent, limit {global_limit[0]}/s",
+                partial(concurrent_broadcast, bot, chat_ids, "text", global_limit),
+            )
+    finally:
+        await bot.session.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+Размер ответа и время сжатия для разных кодировок.
+
+Запуск: python -m benchmarks.compression
+"""
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import ujson
+from faker import Faker
+
+from farpostbooks_backend.services.compression import BrotliCodec, GzipCodec
+
+MAX_ROUNDS = 200
+MIN_SECONDS = 0.5
+PAGE_SIZE = 50
+LOANS_PER_BOOK = 20
+DESCRIPTION_CHARS = 3000
+MICROSECONDS = 1000000
+PERCENT = 100
+
+Compress = Callable[[bytes], bytes]
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 11)
+
+
+def fake_book(fake: Faker, book_id: int) -> Dict[str, Any]:
+    """
+    Книга в формате BookModelDTO с историей выдачи.
+
+    :param fake: Генератор фейковых данных.
+    :param book_id: ISBN книги.
+    :return: Словарь книги.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    user_books = [
+        {
+            "user": {
+                "id": fake.random_int(),
+                "name": fake.name(),
+                "position": fake.job(),
+                "about": fake.sentence(nb_words=10),
+                "timestamp": now,
+            },
+            "get_timestamp": now,
+            "back_timestamp": now,
+            "rating": fake.random_int(1, 5),
+        }
+        for _ in range(LOANS_PER_BOOK)
+    ]
+    return {
+        "id": book_id,
+        "name": fake.sentence(nb_words=5),
+        "description": fake.text(max_nb_chars=DESCRIPTION_CHARS),
+        "image": f"{book_id}.jpeg",
+        "author": fake.name(),
+        "publish": fake.year(),
+        "added_timestamp": now,
+        "user_books": user_books,
+    }
+
+
+def encode(content: Any) -> bytes:
+    """
+    Сериализация так же, как в UJSONResponse.
+
+    :param content: Данные ответа.
+    :return: Тело ответа.
+    """
+    return ujson.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def measure_codec(
+    name: str,
+    compress: Compress,
+    body: bytes,
+) -> None:
+    """
+    Вывод размера и процессорного времени сжатия одного ответа.
+
+    :param name: Название кодировки.
+    :param compress: Функция сжатия.
+    :param body: Тело ответа.
+    """
+    size = len(compress(body))
+    rounds = 0
+    before_time = time.process_time()
+    while rounds < MAX_ROUNDS and time.process_time() - before_time < MIN_SECONDS:
+        compress(body)
+        rounds += 1
+    elapsed = time.process_time() - before_time
+    cpu = elapsed / rounds * MICROSECONDS
+    ratio = size / len(body) * PERCENT
+    line = f"  {name:<12} {size:>9} B"
+    line = f"{line} ({ratio:5.1f}%)"
+    print(f"{line} cpu={cpu:10.1f} us/response")  # noqa: WPS421
+
+
+def get_codecs() -> List[Tuple[str, Compress]]:
+    """
+    Кодировки для сравнения.
+
+    :return: Названия и функции сжатия.
+    """
+    codecs: List[Tuple[str, Compress]] = [
+        ("identity", lambda body: body),
+    ]
+    for level in GZIP_LEVELS:
+        codecs.append((f"gzip-{level}", GzipCodec(level).compress))
+    for quality in BROTLI_QUALITIES:
+        codecs.append((f"br-{quality}", BrotliCodec(quality).compress))
+    return codecs
+
+
+def main() -> None:
+    """Запуск замеров."""
+    fake = Faker(locale="ru_RU", seed=0)
+    page = [fake_book(fake, index) for index in range(PAGE_SIZE)]
+    payloads = (("BookModelDTO", page[0]), ("BookModelDTO x50", page))
+
+    for payload_name, content in payloads:
+        print(payload_name)  # noqa: WPS421
+        for codec_name, compress in get_codecs():
+            measure_codec(codec_name, compress, encode(content))
+
+
+if __name__ == "__main__":
+    main()
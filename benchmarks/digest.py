@@ -0,0 +1,90 @@
+"""
+Время подготовки персональной еженедельной рассылки без БД.
+
+Синтетический каталог и история: у каждого читателя BORROWS_PER_USER
+книг с оценками, на неделе добавлено NEW_BOOKS книг. Для сравнения
+выводится время самой отправки стольких сообщений при лимите Bot API.
+
+Запуск: python -m benchmarks.digest
+"""
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from farpostbooks_backend.db.dao.userbook_dao import Rating
+from farpostbooks_backend.services.digest import rank_new_books, render_digests
+from farpostbooks_backend.settings import settings
+
+USERS = 10000
+BOOKS = 5000
+AUTHORS = 2000
+BORROWS_PER_USER = 20
+NEW_BOOKS = 30
+MAX_BOOKS = 10
+SEED = 42
+
+
+def random_authors(rng: np.random.Generator, count: int) -> List[str]:
+    """
+    Случайные авторы книг.
+
+    :param rng: Генератор случайных чисел.
+    :param count: Количество книг.
+    :return: Автор каждой книги.
+    """
+    return [f"Автор {author}" for author in rng.integers(AUTHORS, size=count)]
+
+
+def generate_history(rng: np.random.Generator) -> List[Rating]:
+    """
+    Синтетическая история взятия книг с оценками.
+
+    :param rng: Генератор случайных чисел.
+    :return: История взятия книг.
+    """
+    user_ids = np.repeat(np.arange(USERS), BORROWS_PER_USER)
+    book_ids = rng.integers(BOOKS, size=len(user_ids))
+    ratings = rng.integers(1, 6, size=len(user_ids))
+    return list(zip(user_ids.tolist(), book_ids.tolist(), ratings.tolist()))
+
+
+def measure(
+    history: List[Rating],
+    catalogue: List[Tuple[int, str]],
+    new_authors: List[str],
+) -> Tuple[float, Dict[int, str]]:
+    """
+    Замер ранжирования и рендеринга рассылки.
+
+    :param history: История взятия книг.
+    :param catalogue: Пары ISBN и авторов.
+    :param new_authors: Авторы новых книг.
+    :return: Время в секундах и персональные тексты.
+    """
+    lines = [f"<b>- Книга {index}</b>" for index in range(NEW_BOOKS)]
+    before_time = time.perf_counter()
+    users, order = rank_new_books(history, catalogue, new_authors)
+    texts = render_digests(users, order, lines, MAX_BOOKS)
+    return time.perf_counter() - before_time, texts
+
+
+def main() -> None:
+    """Генерация данных и замер."""
+    rng = np.random.default_rng(SEED)
+    catalogue = list(enumerate(random_authors(rng, BOOKS)))
+    duration, texts = measure(
+        generate_history(rng),
+        catalogue,
+        random_authors(rng, NEW_BOOKS),
+    )
+    unique_count = len(set(texts.values()))
+    personal_count = len(texts)
+    send_duration = USERS / settings.broadcast_limit[0]
+    print(f"{USERS} users: {duration:.2f} s")  # noqa: WPS421
+    print(f"{personal_count} personal, {unique_count} unique")  # noqa: WPS421
+    print(f"sending at the Bot API limit: {send_duration:.0f} s")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Накладные расходы middleware метрик на один запрос.
+
+Прежняя реализация (BaseHTTPMiddleware с перебором маршрутов на каждый
+запрос) сохранена здесь только для сравнения.
+
+Запуск: python -m benchmarks.prometheus
+"""
+import asyncio
+import time
+from typing import Any, List, Optional, Tuple
+
+from benchmarks.utils import report
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import Message
+
+from farpostbooks_backend.services.utils import (
+    REQUESTS,
+    REQUESTS_PROCESSING_TIME,
+    RESPONSES,
+    PrometheusMiddleware,
+)
+from farpostbooks_backend.web.api.router import api_router
+
+ROUNDS = 5000
+PATHS = ("/api/health", "/api/books/9785911511036")
+
+
+class LegacyPrometheusMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация: BaseHTTPMiddleware и линейный поиск маршрута."""
+
+    def __init__(self, app: Any, app_name: str = "legacy") -> None:
+        super().__init__(app)
+        self.app_name = app_name
+
+    async def dispatch(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint,
+    ) -> Response:
+        """
+        Запись метрик запроса.
+
+        :param request: Запрос.
+        :param call_next: Следующий обработчик.
+        :return: Ответ.
+        """
+        method = request.method
+        path, is_handled_path = self.get_path(request)
+        if not is_handled_path:
+            return await call_next(request)
+
+        REQUESTS.labels(method=method, path=path, app_name=self.app_name).inc()
+        before_time = time.perf_counter()
+        response = await call_next(request)
+        REQUESTS_PROCESSING_TIME.labels(
+            method=method,
+            path=path,
+            app_name=self.app_name,
+        ).observe(time.perf_counter() - before_time)
+        RESPONSES.labels(
+            method=method,
+            path=path,
+            status_code=response.status_code,
+            app_name=self.app_name,
+        ).inc()
+        return response
+
+    @staticmethod
+    def get_path(request: Request) -> Tuple[str, bool]:
+        """
+        Поиск шаблона пути перебором маршрутов.
+
+        :param request: Запрос.
+        :return: Шаблон пути и признак найденного маршрута.
+        """
+        for route in request.app.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return route.path, True
+        return request.url.path, False
+
+
+def build_app(middleware: Optional[Any]) -> FastAPI:
+    """
+    Приложение со всеми маршрутами API.
+
+    :param middleware: Класс middleware метрик или None.
+    :return: Приложение.
+    """
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    if middleware is not None:
+        app.add_middleware(middleware, app_name="benchmark")
+    return app
+
+
+async def call(app: FastAPI, path: str) -> None:
+    """
+    Один запрос напрямую через ASGI интерфейс.
+
+    :param app: Приложение.
+    :param path: Путь запроса.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive() -> Message:  # noqa: WPS430
+        if messages:
+            return messages.pop()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:  # noqa: WPS430
+        """
+        Ответ не нужен.
+
+        :param message: ASGI сообщение.
+        """
+
+    await app(scope, receive, send)
+
+
+async def measure_app(app: FastAPI, path: str) -> List[float]:
+    """
+    Замер времени обработки запросов.
+
+    :param app: Приложение.
+    :param path: Путь запроса.
+    :return: Время каждого запроса в секундах.
+    """
+    await call(app, path)
+    timings = []
+    for _ in range(ROUNDS):
+        before_time = time.perf_counter()
+        await call(app, path)
+        timings.append(time.perf_counter() - before_time)
+    return timings
+
+
+async def main() -> None:
+    """Запуск замеров."""
+    variants = (
+        ("no middleware", None),
+        ("BaseHTTPMiddleware", LegacyPrometheusMiddleware),
+        ("ASGI + endpoint map", PrometheusMiddleware),
+    )
+    for path in PATHS:
+        for name, middleware in variants:
+            timings = await measure_app(build_app(middleware), path)
+            report(f"{path} {name}", timings)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
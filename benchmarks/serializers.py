@@ -0,0 +1,132 @@
+"""
+Сравнение сериализации ответов до и после предварительной сборки.
+
+Запуск: python -m benchmarks.serializers
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, List
+
+import ujson
+from benchmarks.utils import init_memory_db, measure, report
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from tortoise import Tortoise
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from farpostbooks_backend.db.models.book_model import BookModel
+from farpostbooks_backend.db.models.user_model import UserModel
+from farpostbooks_backend.db.models.userbook_model import UserBookModel
+from farpostbooks_backend.web.api.schema import BookIntroduction, BookModelDTO
+from farpostbooks_backend.web.api.serializers import BOOK_DETAIL, BOOK_INTRODUCTION
+
+PAGE_SIZE = 50
+LOANS_PER_BOOK = 5
+ROUNDS = 100
+DESCRIPTION_SENTENCES = 50
+
+DETAIL_FIELD = create_response_field("Response_books", List[BookModelDTO])
+INTRODUCTION_FIELD = create_response_field("Response_intro", List[BookIntroduction])
+
+
+async def fill_db() -> List[BookModel]:
+    """
+    Заполнение БД страницей книг с историей выдачи.
+
+    :return: Книги с подгруженной историей.
+    """
+    users = [
+        await UserModel.create(id=index, name="user", position="-", about="-")
+        for index in range(1, LOANS_PER_BOOK + 1)
+    ]
+    for book_id in range(1, PAGE_SIZE + 1):
+        await BookModel.create(
+            id=book_id,
+            name=f"Книга {book_id}",
+            description="Описание книги. " * DESCRIPTION_SENTENCES,
+            image=f"{book_id}.jpeg",
+            author="Автор",
+            publish="2023",
+        )
+        for user in users:
+            await UserBookModel.create(
+                user=user,
+                book_id=book_id,
+                back_timestamp=datetime.utcnow(),
+                rating=5,
+            )
+    return await BookModel.all().prefetch_related("user_books__user")
+
+
+async def old_detail(books: List[BookModel]) -> bytes:
+    """
+    Прежний путь: pydantic_model_creator и валидация response_model.
+
+    :param books: Книги.
+    :return: Тело ответа.
+    """
+    book_models: List[Any] = [
+        await pydantic_model_creator(BookModel).from_tortoise_orm(book)
+        for book in books
+    ]
+    content = await serialize_response(
+        field=DETAIL_FIELD,
+        response_content=book_models,
+    )
+    return ujson.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+async def new_detail(books: List[BookModel]) -> bytes:
+    """
+    Новый путь: предварительно собранный сериализатор.
+
+    :param books: Книги.
+    :return: Тело ответа.
+    """
+    content = BOOK_DETAIL.dump_many(books)
+    return ujson.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+async def old_introduction(books: List[BookModel]) -> bytes:
+    """
+    Прежний путь для списка книг: валидация response_model в orm_mode.
+
+    :param books: Книги.
+    :return: Тело ответа.
+    """
+    content = await serialize_response(
+        field=INTRODUCTION_FIELD,
+        response_content=books,
+    )
+    return ujson.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+async def new_introduction(books: List[BookModel]) -> bytes:
+    """
+    Новый путь для списка книг.
+
+    :param books: Книги.
+    :return: Тело ответа.
+    """
+    content = BOOK_INTRODUCTION.dump_many(books)
+    return ujson.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+async def main() -> None:
+    """Запуск замеров."""
+    await init_memory_db()
+    books = await fill_db()
+
+    cases = (
+        ("BookModelDTO x50: from_tortoise_orm", old_detail),
+        ("BookModelDTO x50: Serializer", new_detail),
+        ("BookIntroduction x50: response_model", old_introduction),
+        ("BookIntroduction x50: Serializer", new_introduction),
+    )
+    for name, path in cases:
+        report(name, await measure(path, ROUNDS, books))
+    await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Время пересчета похожих книг на синтетической истории взятия книг.
+
+Популярность книг распределена по Ципфу, как в реальных библиотеках:
+немногие книги берут часто, большинство - редко. Замеряется только
+расчет (compute_similar_books), без чтения и записи в БД.
+
+Запуск: python -m benchmarks.similar_books
+"""
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from farpostbooks_backend.services.recommendations import compute_similar_books
+
+USERS = 10000
+BOOKS = 50000
+BORROWS_PER_USER = 30
+ZIPF_EXPONENT = 1.2
+TOP_K = 20
+SEED = 42
+
+
+def generate_borrows() -> List[Tuple[int, int]]:
+    """
+    Синтетическая история взятия книг.
+
+    :return: Пары ID пользователя и ID книги.
+    """
+    rng = np.random.default_rng(SEED)
+    user_ids = np.repeat(np.arange(USERS), BORROWS_PER_USER)
+    book_ids = (rng.zipf(ZIPF_EXPONENT, len(user_ids)) - 1) % BOOKS
+    return list(zip(user_ids.tolist(), book_ids.tolist()))
+
+
+def main() -> None:
+    """Замер пересчета похожих книг."""
+    borrows = generate_borrows()
+    before_time = time.perf_counter()
+    similar = compute_similar_books(borrows, TOP_K)
+    duration = time.perf_counter() - before_time
+    books_count = len(np.unique(similar.book_ids))
+    pairs_count = len(similar.scores)
+    borrows_count = len(borrows)
+    print(f"{USERS} users x {BOOKS} books, {borrows_count} borrows")  # noqa: WPS421
+    print(  # noqa: WPS421
+        f"{duration:.2f} s, {pairs_count} pairs for {books_count} books",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import time
+from typing import Any, Awaitable, Callable, List
+
+from tortoise import Tortoise
+
+from farpostbooks_backend.db.config import MODELS_MODULES
+
+PERCENTILE = 0.95
+MILLISECONDS = 1000
+
+
+async def init_memory_db() -> None:
+    """Инициализация Tortoise ORM поверх SQLite в памяти."""
+    await Tortoise.init(
+        db_url="sqlite://:memory:",
+        modules={"models": MODELS_MODULES},
+    )
+    await Tortoise.generate_schemas()
+
+
+async def measure(
+    func: Callable[..., Awaitable[Any]],
+    rounds: int,
+    *args: Any,
+) -> List[float]:
+    """
+    Замер времени выполнения корутины.
+
+    :param func: Функция, возвращающая корутину для замера.
+    :param rounds: Количество повторений.
+    :param args: Аргументы для функции.
+    :return: Время каждого повторения в секундах.
+    """
+    await func(*args)
+    timings = []
+    for _ in range(rounds):
+        before_time = time.perf_counter()
+        await func(*args)
+        timings.append(time.perf_counter() - before_time)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    """
+    Вывод медианы и перцентилей замеров.
+
+    :param name: Название замера.
+    :param timings: Время каждого повторения в секундах.
+    """
+    ordered = sorted(timings)
+    median = ordered[len(ordered) // 2] * MILLISECONDS
+    p95_index = int(len(ordered) * PERCENTILE)
+    p95 = ordered[p95_index] * MILLISECONDS
+    line = f"{name:<40} median={median:8.3f} ms"
+    print(f"{line}  p95={p95:8.3f} ms")  # noqa: WPS421
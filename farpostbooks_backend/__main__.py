@@ -1,18 +1,22 @@
 import uvicorn
 
+from farpostbooks_backend.services.logs import create_log_config
+from farpostbooks_backend.services.multiprocess_metrics import enable_multiprocess
 from farpostbooks_backend.settings import settings
 
 
 def main() -> None:
     """Точка запуска приложения."""
-    # Конфигурация для логгирования
-    log_config = uvicorn.config.LOGGING_CONFIG
-    log_config["formatters"]["access"]["fmt"] = (
-        "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:"  # noqa: WPS323
-        "%(lineno)d] [trace_id=%(otelTraceID)s span_id=%(otelSpanID)s "  # noqa: WPS323
-        "resource.service.name=%(otelServiceName)s] - %(message)s"  # noqa: WPS323
+    # Конфигурация для логгирования: JSON через очереди в фоновых потоках
+    log_config = create_log_config(
+        settings.log_level.value,
+        settings.log_queue_size,
     )
 
+    # Общие метрики всех воркеров
+    if settings.workers_count > 1:
+        enable_multiprocess(settings.prometheus_multiproc_dir)
+
     # Запуск uvicorn
     uvicorn.run(
         "farpostbooks_backend.web.application:get_app",
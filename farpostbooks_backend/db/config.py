@@ -4,6 +4,9 @@ from farpostbooks_backend.settings import settings
 
 MODELS_MODULES: List[str] = [
     "farpostbooks_backend.db.models.userbook_model",
+    "farpostbooks_backend.db.models.catalogue_model",
+    "farpostbooks_backend.db.models.broadcast_model",
+    "farpostbooks_backend.db.models.similar_book_model",
 ]  # noqa: WPS407
 
 TORTOISE_CONFIG = {  # noqa: WPS407
@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple, cast
 
 from tortoise.expressions import Q
 from tortoise.functions import Count
 from tortoise.queryset import QuerySet
 
+from farpostbooks_backend.db.dao.catalogue_dao import CatalogueDAO
+from farpostbooks_backend.db.dao.fields import FieldTree, select_fields
 from farpostbooks_backend.db.models.book_model import BookModel
 from farpostbooks_backend.web.api.enums import FilterFlag
 
@@ -20,7 +22,7 @@ class BookDAO:
         image: str,
         author: str,
         publish: str,
-    ) -> BookModel:
+    ) -> Tuple[BookModel, bool]:
         """
         Добавление новой книги.
 
@@ -30,18 +32,19 @@ class BookDAO:
         :param image: Фотография книги.
         :param author: Авторы книги.
         :param publish: Дата публикации книги.
-        :return: Модель новой книги.
+        :return: Модель книги и признак того, что книга только что добавлена.
         """
-        return (
-            await BookModel.get_or_create(
-                id=book_id,
-                name=name,
-                description=description,
-                image=image,
-                author=author,
-                publish=publish,
-            )
-        )[0]
+        book, created = await BookModel.get_or_create(
+            id=book_id,
+            name=name,
+            description=description,
+            image=image,
+            author=author,
+            publish=publish,
+        )
+        if created:
+            await CatalogueDAO.bump_version()
+        return book, created
 
     @staticmethod
     async def delete_book_model(
@@ -52,27 +55,33 @@ class BookDAO:
 
         :param isbn: ISBN номер книги.
         """
-        await BookModel.filter(id=isbn).delete()
+        if await BookModel.filter(id=isbn).delete():
+            await CatalogueDAO.bump_version()
 
     @staticmethod
     async def search_book(
         book_id: int,
+        fields: Optional[FieldTree] = None,
     ) -> Optional[BookModel]:
         """
         Получить информацию о книге по его ISBN.
 
         :param book_id: ISBN книги.
+        :param fields: Выбранные поля книги или None для всех полей.
         :return: stream of dummies.
         """
-        return await BookModel.get_or_none(
-            id=book_id,
-        ).prefetch_related("user_books")
+        return await select_fields(
+            BookModel.filter(id=book_id),
+            fields,
+            default_prefetch=("user_books__user",),
+        ).get_or_none()
 
     @staticmethod
     async def get_books(
         flag: FilterFlag = FilterFlag.all,
         limit: int = 10,
         offset: int = 0,
+        fields: Optional[FieldTree] = None,
     ) -> List[BookModel]:
         """
         Выгрузка списка книг для выдачи на главной странице.
@@ -80,6 +89,7 @@ class BookDAO:
         :param flag: Фильтр для выдачи списка книг.
         :param limit: Максимальное количество выгружаемых книг.
         :param offset: Сдвиг от первой книги.
+        :param fields: Выбранные поля книги или None для всех полей.
         :return: Список из книг со сдвигом.
         """
         books_qs: QuerySet[BookModel] = BookModel.all()
@@ -98,9 +108,12 @@ class BookDAO:
                 Q(count_user_books=0),
             )
         return (
-            await books_qs.distinct()
-            .prefetch_related("user_books")
-            .all()
+            await select_fields(
+                books_qs.distinct(),
+                fields,
+                default_prefetch=("user_books",),
+            )
+            .order_by("id")
             .limit(limit)
             .offset(offset)
         )
@@ -115,4 +128,14 @@ class BookDAO:
         date = datetime.utcnow() - timedelta(weeks=1)
         return await BookModel.filter(
             Q(added_timestamp__gt=date),
-        ).all()
+        ).order_by("-added_timestamp", "id")
+
+    @staticmethod
+    async def get_authors() -> List[Tuple[int, str]]:
+        """
+        Авторы всех книг каталога.
+
+        :return: Список пар ISBN и авторов по возрастанию ISBN.
+        """
+        authors = BookModel.all().order_by("id").values_list("id", "author")
+        return cast(List[Tuple[int, str]], await authors)
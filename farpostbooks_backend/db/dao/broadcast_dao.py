@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, cast
+
+from tortoise.functions import Count
+
+from farpostbooks_backend.db.models.broadcast_model import (
+    BroadcastModel,
+    BroadcastRecipientModel,
+    BroadcastStatus,
+    DeliveryStatus,
+)
+
+# Количество получателей рассылки по состоянию доставки.
+Progress = Dict[DeliveryStatus, int]
+
+
+class BroadcastDAO:
+    """Класс для доступа к таблицам рассылок и их получателей."""
+
+    @staticmethod
+    async def get_or_create_broadcast(key: str, text: str) -> BroadcastModel:
+        """
+        Получение рассылки по ключу или создание новой.
+
+        :param key: Ключ рассылки.
+        :param text: Текст сообщения для новой рассылки.
+        :return: Модель рассылки.
+        """
+        return (await BroadcastModel.get_or_create(key=key, defaults={"text": text}))[0]
+
+    @staticmethod
+    async def get_broadcast(broadcast_id: int) -> Optional[BroadcastModel]:
+        """
+        Получение рассылки по ID.
+
+        :param broadcast_id: ID рассылки.
+        :return: Модель рассылки, если она существует.
+        """
+        return await BroadcastModel.get_or_none(id=broadcast_id)
+
+    @staticmethod
+    async def get_broadcasts(limit: int = 10, offset: int = 0) -> List[BroadcastModel]:
+        """
+        Получение списка рассылок, начиная с последней.
+
+        :param limit: Количество рассылок.
+        :param offset: Смещение.
+        :return: Список рассылок.
+        """
+        return await BroadcastModel.all().order_by("-id").offset(offset).limit(limit)
+
+    @staticmethod
+    async def set_status(broadcast_id: int, status: BroadcastStatus) -> None:
+        """
+        Изменение состояния рассылки.
+
+        :param broadcast_id: ID рассылки.
+        :param status: Новое состояние.
+        """
+        finished_timestamp = None
+        if status == BroadcastStatus.finished:
+            finished_timestamp = datetime.utcnow()
+        await BroadcastModel.filter(id=broadcast_id).update(
+            status=status,
+            finished_timestamp=finished_timestamp,
+        )
+
+    @staticmethod
+    async def add_recipients(
+        broadcast_id: int,
+        chat_ids: AsyncIterable[int],
+        chunk_size: int = 1000,
+    ) -> None:
+        """
+        Добавление получателей пачками.
+
+        Уже добавленные получатели пропускаются, поэтому прерванное
+        заполнение можно просто повторить.
+
+        :param broadcast_id: ID рассылки.
+        :param chat_ids: Поток ID чатов.
+        :param chunk_size: Сколько получателей добавляется одним запросом.
+        """
+        recipients = []
+        async for chat_id in chat_ids:
+            recipients.append(
+                BroadcastRecipientModel(broadcast_id=broadcast_id, chat_id=chat_id),
+            )
+            if len(recipients) >= chunk_size:
+                await BroadcastRecipientModel.bulk_create(
+                    recipients,
+                    ignore_conflicts=True,
+                )
+                recipients = []
+        if recipients:
+            await BroadcastRecipientModel.bulk_create(recipients, ignore_conflicts=True)
+
+    @staticmethod
+    async def iter_pending_chat_ids(
+        broadcast_id: int,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[int]:
+        """
+        Постраничный обход получателей, которым сообщение еще не отправлено.
+
+        :param broadcast_id: ID рассылки.
+        :param chunk_size: Размер страницы.
+        :yield: ID чатов по возрастанию.
+        """
+        queryset = (
+            BroadcastRecipientModel.filter(
+                broadcast_id=broadcast_id,
+                status=DeliveryStatus.pending,
+            )
+            .order_by("chat_id")
+            .limit(chunk_size)
+        )
+        page = queryset
+        while True:
+            chat_ids = cast(List[int], await page.values_list("chat_id", flat=True))
+            for chat_id in chat_ids:
+                yield chat_id
+            if len(chat_ids) < chunk_size:
+                break
+            page = queryset.filter(chat_id__gt=chat_ids[-1])
+
+    @staticmethod
+    async def set_delivery_status(
+        broadcast_id: int,
+        chat_ids: Iterable[int],
+        status: DeliveryStatus,
+    ) -> None:
+        """
+        Запись состояния доставки для пачки получателей.
+
+        :param broadcast_id: ID рассылки.
+        :param chat_ids: ID чатов.
+        :param status: Состояние доставки.
+        """
+        await BroadcastRecipientModel.filter(
+            broadcast_id=broadcast_id,
+            chat_id__in=list(chat_ids),
+        ).update(status=status, updated_timestamp=datetime.utcnow())
+
+    @staticmethod
+    async def get_progress(broadcast_ids: Iterable[int]) -> Dict[int, Progress]:
+        """
+        Количество получателей по состоянию доставки одним запросом.
+
+        :param broadcast_ids: ID рассылок.
+        :return: Словарь ID рассылки -> количество по состояниям.
+        """
+        rows = (
+            await BroadcastRecipientModel.filter(broadcast_id__in=list(broadcast_ids))
+            .annotate(count=Count("id"))
+            .group_by("broadcast_id", "status")
+            .values("broadcast_id", "status", "count")
+        )
+        progress: Dict[int, Progress] = {}
+        for row in rows:
+            counts = progress.setdefault(row["broadcast_id"], {})
+            counts[DeliveryStatus(row["status"])] = row["count"]
+        return progress
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from tortoise.expressions import F
+
+from farpostbooks_backend.db.models.catalogue_model import CatalogueModel
+
+CATALOGUE_ID = 1
+
+
+class CatalogueDAO:
+    """Класс для доступа к версии каталога книг."""
+
+    @staticmethod
+    async def get_catalogue() -> CatalogueModel:
+        """
+        Получение текущей версии каталога.
+
+        :return: Модель версии каталога.
+        """
+        return (await CatalogueModel.get_or_create(id=CATALOGUE_ID))[0]
+
+    @staticmethod
+    async def bump_version() -> None:
+        """Увеличение версии каталога после изменения книг, их выдачи или читателей."""
+        updated = await CatalogueModel.filter(id=CATALOGUE_ID).update(
+            version=F("version") + 1,
+            updated_timestamp=datetime.utcnow(),
+        )
+        if not updated:
+            await CatalogueModel.get_or_create(
+                id=CATALOGUE_ID,
+                defaults={"version": 1},
+            )
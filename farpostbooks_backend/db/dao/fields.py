@@ -0,0 +1,90 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from tortoise.models import Model
+from tortoise.query_utils import Prefetch
+from tortoise.queryset import QuerySet
+
+# Дерево выбранных полей: {"id": {}, "user_books": {"user": {"name": {}}}}.
+# Пустое поддерево у связи означает связанную модель целиком.
+FieldTree = Dict[str, Any]
+
+
+def select_fields(
+    queryset: "QuerySet[Any]",
+    fields: Optional[FieldTree],
+    default_prefetch: Iterable[str] = (),
+) -> "QuerySet[Any]":
+    """
+    Ограничение запроса выбранными полями.
+
+    Выбираются только нужные столбцы, а связи подгружаются только
+    запрошенные и тоже с нужными столбцами.
+
+    :param queryset: Исходный запрос.
+    :param fields: Дерево выбранных полей или None для всех полей.
+    :param default_prefetch: Связи, которые подгружаются без выбора полей.
+    :return: Запрос.
+    """
+    if fields is None:
+        return queryset.prefetch_related(*default_prefetch)
+    columns, prefetches = _get_query_plan(queryset.model, fields)
+    return queryset.only(*columns).prefetch_related(*prefetches)
+
+
+def _get_query_plan(
+    model: Type[Model],
+    fields: FieldTree,
+    required: Iterable[str] = (),
+) -> Tuple[List[str], List[Prefetch]]:
+    """
+    Столбцы и подгружаемые связи для дерева полей.
+
+    :param model: Модель Tortoise ORM.
+    :param fields: Дерево выбранных полей.
+    :param required: Столбцы, без которых не собрать связь с родителем.
+    :return: Столбцы для only и объекты Prefetch.
+    """
+    meta = model._meta  # noqa: WPS437
+    fields_map: Dict[str, Any] = meta.fields_map
+    columns: Set[str] = {meta.pk_attr, *required}
+    prefetches = []
+    for name, subtree in fields.items():
+        if name in meta.fk_fields:
+            relation = fields_map[name]
+            columns.add(relation.source_field)
+            prefetches.append(_prefetch(name, relation.related_model, subtree))
+        elif name in meta.backward_fk_fields:
+            relation = fields_map[name]
+            prefetches.append(
+                _prefetch(
+                    name,
+                    relation.related_model,
+                    subtree,
+                    required=(relation.relation_field,),
+                ),
+            )
+        else:
+            columns.add(name)
+    return sorted(columns), prefetches
+
+
+def _prefetch(
+    name: str,
+    model: Type[Model],
+    fields: FieldTree,
+    required: Iterable[str] = (),
+) -> Prefetch:
+    """
+    Подгрузка связи только с выбранными полями.
+
+    :param name: Название связи.
+    :param model: Связанная модель.
+    :param fields: Дерево выбранных полей связанной модели.
+    :param required: Столбцы, без которых не собрать связь с родителем.
+    :return: Объект Prefetch.
+    """
+    queryset = model.all()
+    if fields:
+        columns, prefetches = _get_query_plan(model, fields, required)
+        queryset = queryset.only(*columns).prefetch_related(*prefetches)
+    return Prefetch(name, queryset=queryset)
@@ -0,0 +1,69 @@
+from typing import Iterable, List, Tuple, cast
+
+from tortoise.transactions import in_transaction
+
+from farpostbooks_backend.db.models.book_model import BookModel
+from farpostbooks_backend.db.models.similar_book_model import SimilarBookModel
+from farpostbooks_backend.db.models.userbook_model import UserBookModel
+
+# ID книги, ID похожей книги, близость и место среди похожих.
+SimilarBook = Tuple[int, int, float, int]
+
+
+class SimilarBookDAO:
+    """Класс для доступа к таблице похожих книг."""
+
+    @staticmethod
+    async def get_borrows() -> List[Tuple[int, int]]:
+        """
+        Все пары (пользователь, книга) из истории взятия книг.
+
+        :return: Список пар Telegram ID и ISBN без повторов.
+        """
+        borrows = UserBookModel.all().distinct().values_list("user_id", "book_id")
+        return cast(List[Tuple[int, int]], await borrows)
+
+    @staticmethod
+    async def replace_similar_books(
+        similar_books: Iterable[SimilarBook],
+        batch_size: int = 1000,
+    ) -> None:
+        """
+        Замена таблицы похожих книг в одной транзакции.
+
+        Пока транзакция не завершена, читаются прежние похожие книги.
+
+        :param similar_books: Строки таблицы.
+        :param batch_size: Сколько строк добавляется одним запросом.
+        """
+        models = [
+            SimilarBookModel(
+                book_id=book_id,
+                similar_book_id=similar_book_id,
+                score=score,
+                rank=rank,
+            )
+            for book_id, similar_book_id, score, rank in similar_books
+        ]
+        async with in_transaction():
+            await SimilarBookModel.all().delete()
+            await SimilarBookModel.bulk_create(models, batch_size=batch_size)
+
+    @staticmethod
+    async def get_similar_books(book_id: int, limit: int = 10) -> List[BookModel]:
+        """
+        Похожие книги, начиная с самой близкой.
+
+        Один запрос по индексу (book_id, rank) с JOIN таблицы книг.
+
+        :param book_id: ISBN книги.
+        :param limit: Максимальное количество книг.
+        :return: Список книг.
+        """
+        similar_books = (
+            await SimilarBookModel.filter(book_id=book_id)
+            .select_related("similar_book")
+            .order_by("rank")
+            .limit(limit)
+        )
+        return [similar_book.similar_book for similar_book in similar_books]
@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, cast
 
+from farpostbooks_backend.db.dao.catalogue_dao import CatalogueDAO
 from farpostbooks_backend.db.models.user_model import UserModel
 from farpostbooks_backend.web.api.schema import UserModelUpdateDTO
 
@@ -48,13 +49,26 @@ class UserDAO:
         )
 
     @staticmethod
-    async def get_users() -> List[UserModel]:
+    async def iter_user_ids(chunk_size: int = 1000) -> AsyncIterator[int]:
         """
-        Получение списка всех пользователей.
+        Постраничный обход Telegram ID всех пользователей.
 
-        :return: Список пользователей.
+        Страницы выбираются по ключу (id > последнего), а не через offset,
+        и содержат только столбец id, поэтому память не зависит
+        от числа пользователей.
+
+        :param chunk_size: Размер страницы.
+        :yield: Telegram ID по возрастанию.
         """
-        return await UserModel.all()
+        queryset = UserModel.all().order_by("id").limit(chunk_size)
+        page = queryset
+        while True:
+            user_ids = cast(List[int], await page.values_list("id", flat=True))
+            for user_id in user_ids:
+                yield user_id
+            if len(user_ids) < chunk_size:
+                break
+            page = queryset.filter(id__gt=user_ids[-1])
 
     async def change_user_model(
         self,
@@ -64,11 +78,16 @@ class UserDAO:
         """
         Изменение информации о пользователе по его Telegram ID.
 
+        Данные читателей входят в ответ с книгой, поэтому изменение
+        увеличивает версию каталога.
+
         :param telegram_id: Telegram ID.
         :param new_user_data: Pydantic модель для сохранения новых данных.
         :return: Модель пользователя с измененными данными.
         """
-        await UserModel.filter(id=telegram_id).update(
+        updated = await UserModel.filter(id=telegram_id).update(
             **new_user_data.dict(exclude_unset=True),
         )
+        if updated:
+            await CatalogueDAO.bump_version()
         return await self.get_user(telegram_id=telegram_id)
@@ -1,8 +1,15 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple, cast
 
+from tortoise.expressions import Q
+
+from farpostbooks_backend.db.dao.catalogue_dao import CatalogueDAO
+from farpostbooks_backend.db.dao.fields import FieldTree, select_fields
 from farpostbooks_backend.db.models.userbook_model import UserBookModel
 
+# Telegram ID, ISBN и оценка (None, пока книга у читателя).
+Rating = Tuple[int, int, Optional[int]]
+
 
 class UserBookDAO:
     """Класс для доступа к таблице истории взятия книг."""
@@ -19,10 +26,12 @@ class UserBookDAO:
         :param book_id: ISBN выбранной книги.
         :return: Модель взятие книги.
         """
-        return await UserBookModel.create(
+        user_book = await UserBookModel.create(
             user_id=telegram_id,
             book_id=book_id,
         )
+        await CatalogueDAO.bump_version()
+        return user_book
 
     @staticmethod
     async def check_unreturned_books(
@@ -69,34 +78,40 @@ class UserBookDAO:
         :param telegram_id: Telegram ID пользователя.
         :param rating: Рейтинг книги.
         """
-        await UserBookModel.filter(
+        returned = await UserBookModel.filter(
             user_id=telegram_id,
             back_timestamp__isnull=True,
         ).update(
             back_timestamp=datetime.utcnow(),
             rating=rating,
         )
+        if returned:
+            await CatalogueDAO.bump_version()
 
     @staticmethod
     async def get_unreturned_book(
         telegram_id: int,
+        fields: Optional[FieldTree] = None,
     ) -> Optional[UserBookModel]:
         """
         Получение текущей читаемой книги, если она существует.
 
         :param telegram_id: Telegram ID пользователя.
+        :param fields: Выбранные поля или None для всех полей.
         :return: Текущая книга, если существует.
         """
-        return await UserBookModel.get_or_none(
-            user_id=telegram_id,
-            back_timestamp=None,
-        ).prefetch_related("book")
+        return await select_fields(
+            UserBookModel.filter(user_id=telegram_id, back_timestamp=None),
+            fields,
+            default_prefetch=("book",),
+        ).get_or_none()
 
     @staticmethod
     async def get_books(
         telegram_id: int,
         limit: int = 10,
         offset: int = 0,
+        fields: Optional[FieldTree] = None,
     ) -> List[UserBookModel]:
         """
         Выгрузка списка книг на главную страницу.
@@ -104,32 +119,112 @@ class UserBookDAO:
         :param telegram_id: Telegram ID пользователя.
         :param limit: Максимальное количество выгружаемых книг.
         :param offset: Сдвиг от первой книги.
+        :param fields: Выбранные поля или None для всех полей.
         :return: Список из книг со сдвигом.
         """
+        return (
+            await select_fields(
+                UserBookModel.filter(
+                    user_id=telegram_id,
+                    back_timestamp__isnull=False,
+                ),
+                fields,
+                default_prefetch=("book",),
+            )
+            .order_by("id")
+            .limit(limit)
+            .offset(offset)
+        )
+
+    @staticmethod
+    async def get_recent_books(
+        telegram_id: int,
+        limit: int = 10,
+    ) -> List[UserBookModel]:
+        """
+        Последние прочитанные пользователем книги, начиная с самой свежей.
+
+        Книга подтягивается через JOIN, поэтому нужен всего один запрос.
+
+        :param telegram_id: Telegram ID пользователя.
+        :param limit: Максимальное количество выгружаемых книг.
+        :return: Список из книг.
+        """
         return (
             await UserBookModel.filter(
                 user_id=telegram_id,
                 back_timestamp__isnull=False,
             )
-            .prefetch_related("book")
-            .order_by("id")
+            .select_related("book")
+            .order_by("-back_timestamp", "-id")
             .limit(limit)
-            .offset(offset)
         )
 
     @staticmethod
     async def get_user_book(
         telegram_id: int,
         book_id: int,
+        fields: Optional[FieldTree] = None,
     ) -> Optional[UserBookModel]:
         """
         Выгрузка одной книги.
 
         :param telegram_id: Telegram ID пользователя.
         :param book_id: ISBN выбранной книги.
+        :param fields: Выбранные поля или None для всех полей.
         :return: Модель взятие книги.
         """
-        return await UserBookModel.get_or_none(
-            user_id=telegram_id,
-            book_id=book_id,
+        return await select_fields(
+            UserBookModel.filter(user_id=telegram_id, book_id=book_id),
+            fields,
+            default_prefetch=("book",),
+        ).get_or_none()
+
+    @staticmethod
+    async def get_overdue_loans(
+        taken_before: datetime,
+        reminded_before: datetime,
+        limit: int = 100,
+    ) -> List[UserBookModel]:
+        """
+        Невозвращенные книги, взятые раньше taken_before.
+
+        Пропускаются книги, о которых уже напомнили после reminded_before.
+
+        :param taken_before: Книги, взятые раньше, считаются просроченными.
+        :param reminded_before: Граница последнего напоминания.
+        :param limit: Максимальное количество выгружаемых книг.
+        :return: Список взятых книг вместе с книгой, начиная с самой старой.
+        """
+        return (
+            await UserBookModel.filter(
+                Q(reminded_timestamp=None) | Q(reminded_timestamp__lt=reminded_before),
+                back_timestamp=None,
+                get_timestamp__lt=taken_before,
+            )
+            .select_related("book")
+            .order_by("get_timestamp", "id")
+            .limit(limit)
+        )
+
+    @staticmethod
+    async def mark_reminded(user_book_ids: List[int], reminded: datetime) -> None:
+        """
+        Запись времени напоминания о возврате.
+
+        :param user_book_ids: ID взятий книг.
+        :param reminded: Время напоминания.
+        """
+        await UserBookModel.filter(id__in=user_book_ids).update(
+            reminded_timestamp=reminded,
         )
+
+    @staticmethod
+    async def get_ratings() -> List[Rating]:
+        """
+        Вся история взятия книг одним запросом.
+
+        :return: Список из Telegram ID, ISBN и оценки.
+        """
+        ratings = UserBookModel.all().values_list("user_id", "book_id", "rating")
+        return cast(List[Rating], await ratings)
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "cataloguemodel" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "version" BIGINT NOT NULL  DEFAULT 0,
+    "updated_timestamp" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "cataloguemodel" IS 'Модель для таблицы с версией каталога книг.';
+INSERT INTO "cataloguemodel" ("id", "version") VALUES (1, 0) ON CONFLICT DO NOTHING;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "cataloguemodel";"""
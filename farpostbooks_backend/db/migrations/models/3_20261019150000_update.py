@@ -0,0 +1,31 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "broadcastmodel" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "key" VARCHAR(64) NOT NULL UNIQUE,
+    "text" TEXT NOT NULL,
+    "status" VARCHAR(8) NOT NULL  DEFAULT 'pending',
+    "created_timestamp" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "finished_timestamp" TIMESTAMPTZ
+);
+COMMENT ON COLUMN "broadcastmodel"."status" IS 'pending: pending\nrunning: running\nfinished: finished';
+COMMENT ON TABLE "broadcastmodel" IS 'Модель для таблицы с рассылками в Telegram.';
+CREATE TABLE IF NOT EXISTS "broadcastrecipientmodel" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "chat_id" BIGINT NOT NULL,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'pending',
+    "updated_timestamp" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "broadcast_id" BIGINT NOT NULL REFERENCES "broadcastmodel" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_broadcastre_broadca_bccf73" UNIQUE ("broadcast_id", "chat_id")
+);
+COMMENT ON COLUMN "broadcastrecipientmodel"."status" IS 'pending: pending\nsent: sent\nfailed: failed';
+COMMENT ON TABLE "broadcastrecipientmodel" IS 'Модель для таблицы с получателями рассылки.';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "broadcastrecipientmodel";
+        DROP TABLE IF EXISTS "broadcastmodel";"""
@@ -0,0 +1,13 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "userbookmodel" ADD "reminded_timestamp" TIMESTAMPTZ;
+        CREATE INDEX IF NOT EXISTS "idx_userbookmo_open_loans" ON "userbookmodel" ("get_timestamp") WHERE "back_timestamp" IS NULL;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_userbookmo_open_loans";
+        ALTER TABLE "userbookmodel" DROP COLUMN "reminded_timestamp";"""
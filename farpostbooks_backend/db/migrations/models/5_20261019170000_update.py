@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "similarbookmodel" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "score" DOUBLE PRECISION NOT NULL,
+    "rank" SMALLINT NOT NULL,
+    "book_id" BIGINT NOT NULL REFERENCES "bookmodel" ("id") ON DELETE CASCADE,
+    "similar_book_id" BIGINT NOT NULL REFERENCES "bookmodel" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_similarbook_book_id_3e117f" UNIQUE ("book_id", "rank")
+);
+COMMENT ON TABLE "similarbookmodel" IS 'Модель для таблицы с похожими книгами ("с этой книгой также брали").';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "similarbookmodel";"""
@@ -0,0 +1,58 @@
+from enum import Enum
+
+from tortoise import fields, models
+
+
+class BroadcastStatus(str, Enum):  # noqa: WPS600
+    """Состояние рассылки."""
+
+    # Список получателей еще заполняется.
+    pending = "pending"
+    running = "running"
+    finished = "finished"
+
+
+class DeliveryStatus(str, Enum):  # noqa: WPS600
+    """Состояние доставки сообщения получателю."""
+
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+
+class BroadcastModel(models.Model):
+    """Модель для таблицы с рассылками в Telegram."""
+
+    id = fields.BigIntField(pk=True)
+    # Ключ рассылки, например "new_books:2023-W10": повторный запуск
+    # задачи продолжает рассылку с тем же ключом.
+    key = fields.CharField(max_length=64, unique=True)  # noqa: WPS432
+    text = fields.TextField()
+    status = fields.CharEnumField(BroadcastStatus, default=BroadcastStatus.pending)
+    created_timestamp = fields.DatetimeField(auto_now_add=True)
+    finished_timestamp = fields.DatetimeField(null=True)
+
+    recipients: fields.ReverseRelation["BroadcastRecipientModel"]
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class BroadcastRecipientModel(models.Model):
+    """Модель для таблицы с получателями рассылки."""
+
+    id = fields.BigIntField(pk=True)
+    broadcast: fields.ForeignKeyRelation[BroadcastModel] = fields.ForeignKeyField(
+        model_name="models.BroadcastModel",
+        related_name="recipients",
+        on_delete="CASCADE",
+    )
+    chat_id = fields.BigIntField()
+    status = fields.CharEnumField(DeliveryStatus, default=DeliveryStatus.pending)
+    updated_timestamp = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("broadcast", "chat_id"),)
+
+    def __str__(self) -> str:
+        return str(self.chat_id)
@@ -0,0 +1,12 @@
+from tortoise import fields, models
+
+
+class CatalogueModel(models.Model):
+    """Модель для таблицы с версией каталога книг."""
+
+    id = fields.IntField(pk=True)
+    version = fields.BigIntField(default=0)
+    updated_timestamp = fields.DatetimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return str(self.version)
@@ -0,0 +1,32 @@
+from tortoise import fields, models
+
+from farpostbooks_backend.db.models.book_model import BookModel
+
+
+class SimilarBookModel(models.Model):
+    """Модель для таблицы с похожими книгами ("с этой книгой также брали")."""
+
+    id = fields.BigIntField(pk=True)
+    book: fields.ForeignKeyRelation[BookModel] = fields.ForeignKeyField(
+        model_name="models.BookModel",
+        related_name="similar_books",
+        on_delete="CASCADE",
+    )
+    book_id: int
+    similar_book: fields.ForeignKeyRelation[BookModel] = fields.ForeignKeyField(
+        model_name="models.BookModel",
+        related_name="similar_to",
+        on_delete="CASCADE",
+    )
+    similar_book_id: int
+    # Косинусная близость по читателям
+    score = fields.FloatField()
+    # Место среди похожих книг, начиная с 0.
+    # Индекс (book, rank) отдает похожие книги одним поиском по индексу.
+    rank = fields.SmallIntField()
+
+    class Meta:
+        unique_together = (("book", "rank"),)
+
+    def __str__(self) -> str:
+        return f"{self.book_id} -> {self.similar_book_id}"
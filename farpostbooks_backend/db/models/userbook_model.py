@@ -13,14 +13,19 @@ class UserBookModel(models.Model):
         related_name="books",
         on_delete="CASCADE",
     )
+    user_id: int
     book: fields.ForeignKeyRelation[BookModel] = fields.ForeignKeyField(
         model_name="models.BookModel",
         related_name="user_books",
         on_delete="CASCADE",
     )
     get_timestamp = fields.DatetimeField(auto_now_add=True)
+    # Открытые выдачи (back_timestamp IS NULL) ищутся по частичному индексу
+    # на get_timestamp, он создается миграцией.
     back_timestamp = fields.DatetimeField(null=True)
     rating = fields.SmallIntField(null=True)
+    # Когда пользователю последний раз напомнили вернуть книгу
+    reminded_timestamp = fields.DatetimeField(null=True)
 
     def __str__(self) -> str:
         return str(self.id)
@@ -9,6 +9,7 @@ from starlette import status
 
 from farpostbooks_backend.db.dao.user_dao import UserDAO
 from farpostbooks_backend.db.models.user_model import UserModel
+from farpostbooks_backend.services.server_timing import timed
 from farpostbooks_backend.settings import settings
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -85,6 +86,24 @@ def get_decoded_token(token: str, credentials_exception: HTTPException) -> Token
         raise credentials_exception from error
 
 
+def get_token_subject(token: str) -> Optional[str]:
+    """
+    Telegram ID из JWT токена без обращения к БД.
+
+    :param token: JWT токен.
+    :return: Telegram ID или None, если токен невалидный.
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            settings.secret_key,
+            algorithms=[settings.algorithm],
+        )
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
 async def get_current_user(
     security_scopes: SecurityScopes,
     user_dao: UserDAO = Depends(),
@@ -109,8 +128,9 @@ async def get_current_user(
         headers={"WWW-Authenticate": authenticate_value},
     )
 
-    token_data = get_decoded_token(token, credentials_exception)
-    user = await user_dao.get_user(token_data.id)
+    with timed("auth"):
+        token_data = get_decoded_token(token, credentials_exception)
+        user = await user_dao.get_user(token_data.id)
     if user is None:
         raise credentials_exception
 
@@ -0,0 +1,317 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple, Union
+
+import ujson
+from prometheus_client import Counter
+from redis.asyncio import Redis  # type: ignore
+from redis.exceptions import RedisError  # type: ignore
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from farpostbooks_backend.services.access_token import get_token_subject
+from farpostbooks_backend.settings import RateLimitBackend, Settings
+
+REJECTED = Counter(
+    "fastapi_requests_rejected_total",
+    "Total count of requests rejected by admission control",
+    ["reason", "group"],
+)
+
+# Атомарное списание токена: состояние корзины хранится в hash,
+# ключ живет, пока корзина не наполнится заново.
+RATE_LIMIT_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "timestamp")
+local tokens = tonumber(bucket[1]) or burst
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - timestamp) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "timestamp", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RateLimit(NamedTuple):
+    """Ограничение частоты запросов для группы маршрутов."""
+
+    # Сколько токенов в секунду добавляется в корзину.
+    rate: float
+    # Вместимость корзины (допустимый всплеск запросов).
+    burst: int
+
+
+class MemoryRateLimiter:
+    """
+    Token bucket в памяти процесса.
+
+    Корзины хранятся в LRU, чтобы поток новых ключей (например, IP)
+    не занимал память без ограничений.
+    """
+
+    def __init__(self, max_keys: int = 10000) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Списание токена из корзины.
+
+        :param key: Ключ корзины.
+        :param limit: Ограничение частоты.
+        :return: 0, если запрос разрешен, иначе через сколько секунд повторить.
+        """
+        now = time.monotonic()
+        tokens, timestamp = self._buckets.pop(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - timestamp) * limit.rate)
+        retry_after: float = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimiter:
+    """
+    Token bucket в Redis, общий для всех воркеров.
+
+    При недоступности Redis запросы пропускаются: ограничение частоты
+    не должно становиться причиной отказа всего API.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "farpostbooks:ratelimit") -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self._script = redis.register_script(RATE_LIMIT_SCRIPT)
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Списание токена из корзины.
+
+        :param key: Ключ корзины.
+        :param limit: Ограничение частоты.
+        :return: 0, если запрос разрешен, иначе через сколько секунд повторить.
+        """
+        try:
+            retry_after = await self._script(
+                keys=[":".join((self.prefix, key))],
+                args=[limit.rate, limit.burst, time.time()],
+            )
+        except RedisError:
+            logging.exception(f"Rate limit [{key}]: Redis is unavailable")
+            return 0
+        return float(retry_after)
+
+
+RateLimiter = Union[MemoryRateLimiter, RedisRateLimiter]
+
+
+def get_identity(scope: Scope) -> str:
+    """
+    Ключ клиента: Telegram ID из JWT токена или IP адрес.
+
+    :param scope: ASGI scope.
+    :return: Ключ клиента.
+    """
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer":
+        subject = get_token_subject(token)
+        if subject is not None:
+            return f"user:{subject}"
+    client = scope.get("client")
+    host = client[0] if client else "unknown"
+    return f"ip:{host}"
+
+
+class Rejection(NamedTuple):
+    """Отказ в обработке запроса."""
+
+    status_code: int
+    detail: str
+    retry_after: float
+
+
+class AdmissionMiddleware:
+    """
+    Middleware для ограничения нагрузки до обращения к БД.
+
+    Сначала проверяется общее число запросов в обработке: лишние сразу
+    получают 503 с Retry-After. Затем списывается токен из корзины клиента
+    в группе маршрутов (самый длинный совпавший префикс); при пустой
+    корзине клиент получает 429. Место в обработке освобождается
+    при начале ответа, поэтому долгие потоки (SSE) его не занимают.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter,
+        limits: Mapping[str, Tuple[float, int]],
+        max_concurrency: int = 64,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.limits: Dict[str, RateLimit] = {
+            prefix: RateLimit(*limits[prefix])
+            for prefix in sorted(limits, key=len, reverse=True)
+        }
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group = self.get_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await self.check(scope, group)
+        if rejection is None:
+            await self.admit(scope, receive, send)
+        else:
+            await send_rejection(send, rejection)
+
+    async def check(self, scope: Scope, group: str) -> Optional[Rejection]:
+        """
+        Проверка общего лимита и корзины клиента.
+
+        :param scope: ASGI scope.
+        :param group: Префикс группы маршрутов.
+        :return: Отказ или None, если запрос можно обработать.
+        """
+        if self.in_flight >= self.max_concurrency:
+            REJECTED.labels(reason="overloaded", group=group).inc()
+            return Rejection(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Сервер перегружен, повторите запрос позже.",
+                self.retry_after,
+            )
+
+        identity = get_identity(scope)
+        key = f"{group}:{identity}"
+        retry_after = await self.limiter.acquire(key, self.limits[group])
+        if retry_after:
+            REJECTED.labels(reason="rate_limited", group=group).inc()
+            return Rejection(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Слишком много запросов, повторите позже.",
+                retry_after,
+            )
+        return None
+
+    async def admit(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса, занимающего место в общем лимите.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        slot = ConcurrencySlot(self, send)
+        try:  # noqa: WPS501
+            await self.app(scope, receive, slot.send)
+        finally:
+            slot.release()
+
+    def get_group(self, path: str) -> Optional[str]:
+        """
+        Группа маршрутов для пути.
+
+        :param path: Путь запроса.
+        :return: Префикс группы или None, если путь не ограничивается.
+        """
+        for prefix in self.limits:
+            if path.startswith(prefix):
+                return prefix
+        return None
+
+
+class ConcurrencySlot:
+    """Место запроса в общем лимите, освобождается при начале ответа."""
+
+    def __init__(self, middleware: AdmissionMiddleware, send: Send) -> None:
+        self.middleware = middleware
+        self.released = False
+        self._send = send
+        middleware.in_flight += 1
+
+    async def send(self, message: Message) -> None:
+        """
+        Отправка сообщения ответа.
+
+        :param message: ASGI сообщение.
+        """
+        if message["type"] == "http.response.start":
+            self.release()
+        await self._send(message)
+
+    def release(self) -> None:
+        """Освобождение места (повторный вызов ничего не делает)."""
+        if not self.released:
+            self.released = True
+            self.middleware.in_flight -= 1
+
+
+async def send_rejection(send: Send, rejection: Rejection) -> None:
+    """
+    Отказ в обработке запроса в формате ошибок FastAPI.
+
+    :param send: ASGI send.
+    :param rejection: Отказ.
+    """
+    body = ujson.dumps({"detail": rejection.detail}, ensure_ascii=False)
+    encoded = body.encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": rejection.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(encoded)).encode()),
+                (b"retry-after", str(math.ceil(rejection.retry_after)).encode()),
+            ],
+        },
+    )
+    await send({"type": "http.response.body", "body": encoded})
+
+
+def create_rate_limiter(settings: Settings) -> RateLimiter:
+    """
+    Создание хранилища корзин по настройкам.
+
+    :param settings: Настройки приложения.
+    :return: Хранилище корзин.
+    """
+    if settings.rate_limit_backend == RateLimitBackend.redis:
+        return RedisRateLimiter(
+            Redis(host=settings.redis_host, port=settings.redis_port),
+        )
+    return MemoryRateLimiter()
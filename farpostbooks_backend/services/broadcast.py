@@ -0,0 +1,253 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import (
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from aiogram import Bot, exceptions
+
+from farpostbooks_backend.services.admission import MemoryRateLimiter, RateLimit
+from farpostbooks_backend.services.flood_control import (
+    RETRIES_EXHAUSTED,
+    FloodControl,
+    MemoryFloodControl,
+)
+from farpostbooks_backend.services.worker_metrics import MESSAGES
+
+GLOBAL_KEY = "global"
+ChatIds = Union[Iterable[int], AsyncIterable[int]]
+# ID чата и текст сообщения.
+Message = Tuple[int, str]
+Messages = Union[Iterable[Message], AsyncIterable[Message]]
+# Вызывается после каждой отправки с ID чата и признаком успеха.
+ResultCallback = Callable[[int, bool], Awaitable[None]]
+
+
+class BroadcastResult(NamedTuple):
+    """Итог рассылки."""
+
+    sent: int
+    failed: int
+
+
+async def send_message(
+    bot: Bot,
+    chat_id: int,
+    text: str,
+) -> bool:
+    """
+    Отправка сообщения пользователю в Telegram.
+
+    Превышение лимита Telegram не обрабатывается: паузу и повтор
+    выполняет вызывающий код (см. Broadcaster.send).
+
+    :param bot: Инстанс бота.
+    :param chat_id: ID пользователя, которому будет доставлено сообщение.
+    :param text: Текст для отправки.
+    :raises exceptions.TelegramRetryAfter: Превышен лимит, повторить через retry_after.
+    :return: Удалось ли отправить сообщение.
+    """
+    try:
+        await bot.send_message(chat_id=chat_id, text=text)
+    except (exceptions.TelegramBadRequest, exceptions.TelegramForbiddenError):
+        logging.error(f"Target [ID:{chat_id}]: got TelegramError")
+    except exceptions.TelegramRetryAfter:  # noqa: WPS329
+        raise
+    except exceptions.TelegramAPIError:
+        logging.exception(f"Target [ID:{chat_id}]: failed")
+    else:
+        logging.info(f"Target [ID:{chat_id}]: success")
+        return True
+    return False
+
+
+async def with_text(chat_ids: ChatIds, text: str) -> AsyncIterable[Message]:
+    """
+    Одно сообщение для всех чатов.
+
+    :param chat_ids: ID чатов или асинхронный поток ID.
+    :param text: Текст сообщения.
+    :yield: ID чата и текст.
+    """
+    if isinstance(chat_ids, AsyncIterable):
+        async for async_chat_id in chat_ids:
+            yield async_chat_id, text
+    else:
+        for chat_id in chat_ids:
+            yield chat_id, text
+
+
+async def fill_queue(
+    queue: "asyncio.Queue[Optional[Message]]",
+    messages: Messages,
+    workers_count: int,
+) -> None:
+    """
+    Передача сообщений в очередь рассылки, в конце - по None на воркер.
+
+    :param queue: Очередь сообщений.
+    :param messages: Сообщения или асинхронный поток сообщений.
+    :param workers_count: Количество воркеров.
+    """
+    if isinstance(messages, AsyncIterable):
+        async for async_message in messages:
+            await queue.put(async_message)
+    else:
+        for message in messages:
+            await queue.put(message)
+    for _ in range(workers_count):
+        await queue.put(None)
+
+
+async def wait_for_token(
+    limiter: MemoryRateLimiter,
+    key: str,
+    limit: RateLimit,
+) -> None:
+    """
+    Ожидание токена в корзине.
+
+    :param limiter: Хранилище корзин.
+    :param key: Ключ корзины.
+    :param limit: Ограничение частоты.
+    """
+    retry_after = await limiter.acquire(key, limit)
+    while retry_after:
+        await asyncio.sleep(retry_after)
+        retry_after = await limiter.acquire(key, limit)
+
+
+class Broadcaster:
+    """
+    Параллельная рассылка сообщений в Telegram.
+
+    Одновременно выполняется не больше max_in_flight запросов к Bot API,
+    а частота отправки ограничена двумя token bucket: общим для бота
+    и отдельным для каждого чата, как того требуют лимиты Telegram.
+    Медленный ответ на одно сообщение не задерживает остальные.
+
+    Если Telegram все же ответил TelegramRetryAfter, отправка
+    приостанавливается для всех отправителей (см. flood_control),
+    а сообщение повторяется не больше max_retries раз.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        bot: Bot,
+        global_limit: Tuple[float, int],
+        chat_limit: Tuple[float, int],
+        max_in_flight: int,
+        max_retries: int = 3,
+        flood_control: Optional[FloodControl] = None,
+    ) -> None:
+        self.bot = bot
+        self.global_limit = RateLimit(*global_limit)
+        self.chat_limit = RateLimit(*chat_limit)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self._limiter = MemoryRateLimiter()
+        self.flood_control = flood_control or MemoryFloodControl()
+
+    async def send(self, chat_id: int, text: str) -> bool:
+        """
+        Отправка сообщения с учетом лимитов.
+
+        :param chat_id: ID чата.
+        :param text: Текст для отправки.
+        :return: Удалось ли отправить сообщение.
+        """
+        await wait_for_token(self._limiter, f"chat:{chat_id}", self.chat_limit)
+        await wait_for_token(self._limiter, GLOBAL_KEY, self.global_limit)
+        for _ in range(self.max_retries + 1):
+            await self.flood_control.wait()
+            try:
+                return await send_message(bot=self.bot, chat_id=chat_id, text=text)
+            except exceptions.TelegramRetryAfter as error:
+                MESSAGES.labels(result="throttled").inc()
+                logging.error(
+                    f"Target [ID:{chat_id}]: Flood limit is exceeded."
+                    f" Pause {error.retry_after} seconds.",
+                )
+                await self.flood_control.pause(error.retry_after)
+        RETRIES_EXHAUSTED.inc()
+        logging.error(f"Target [ID:{chat_id}]: too many retries")
+        return False
+
+    async def broadcast(
+        self,
+        chat_ids: ChatIds,
+        text: str,
+        on_result: Optional[ResultCallback] = None,
+    ) -> BroadcastResult:
+        """
+        Рассылка сообщения по списку чатов.
+
+        ID чатов читаются по мере отправки, поэтому вместо списка можно
+        передать поток, например UserDAO.iter_user_ids.
+
+        :param chat_ids: ID чатов или асинхронный поток ID.
+        :param text: Текст для отправки.
+        :param on_result: Обработчик результата каждой отправки.
+        :return: Количество доставленных и недоставленных сообщений.
+        """
+        return await self.send_many(with_text(chat_ids, text), on_result)
+
+    async def send_many(
+        self,
+        messages: Messages,
+        on_result: Optional[ResultCallback] = None,
+    ) -> BroadcastResult:
+        """
+        Отправка своего сообщения каждому чату.
+
+        :param messages: Сообщения или асинхронный поток сообщений.
+        :param on_result: Обработчик результата каждой отправки.
+        :return: Количество доставленных и недоставленных сообщений.
+        """
+        queue: "asyncio.Queue[Optional[Message]]" = asyncio.Queue(self.max_in_flight)
+        results: "Counter[bool]" = Counter()
+        # Ошибка в любом воркере останавливает и остальных, и чтение ID.
+        tasks = [
+            asyncio.create_task(fill_queue(queue, messages, self.max_in_flight)),
+            *(
+                asyncio.create_task(self.worker(queue, results, on_result))
+                for _ in range(self.max_in_flight)
+            ),
+        ]
+        try:  # noqa: WPS501
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return BroadcastResult(sent=results[True], failed=results[False])
+
+    async def worker(
+        self,
+        queue: "asyncio.Queue[Optional[Message]]",
+        results: "Counter[bool]",
+        on_result: Optional[ResultCallback],
+    ) -> None:
+        """
+        Отправка сообщений из очереди до получения None.
+
+        :param queue: Очередь сообщений.
+        :param results: Счетчик отправок по успешности.
+        :param on_result: Обработчик результата каждой отправки.
+        """
+        message = await queue.get()
+        while message is not None:
+            chat_id, text = message
+            sent = await self.send(chat_id, text)
+            results[sent] += 1
+            MESSAGES.labels(result="sent" if sent else "failed").inc()
+            if on_result is not None:
+                await on_result(chat_id, sent)
+            message = await queue.get()
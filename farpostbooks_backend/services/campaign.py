@@ -0,0 +1,135 @@
+import logging
+from typing import AsyncIterable, Dict, List, Mapping, Optional
+
+from farpostbooks_backend.db.dao.broadcast_dao import BroadcastDAO
+from farpostbooks_backend.db.dao.user_dao import UserDAO
+from farpostbooks_backend.db.models.broadcast_model import (
+    BroadcastModel,
+    BroadcastStatus,
+    DeliveryStatus,
+)
+from farpostbooks_backend.services.broadcast import (
+    Broadcaster,
+    BroadcastResult,
+    Message,
+)
+
+
+class DeliveryLog:
+    """
+    Запись состояния доставки в БД пачками по batch_size получателей.
+
+    Получатели из незаписанной пачки при перезапуске рассылки получат
+    сообщение повторно, поэтому размер пачки ограничивает число дублей.
+    """
+
+    def __init__(self, broadcast_id: int, batch_size: int) -> None:
+        self.broadcast_id = broadcast_id
+        self.batch_size = batch_size
+        self._batches: Dict[DeliveryStatus, List[int]] = {}
+        self._size = 0
+
+    async def record(self, chat_id: int, sent: bool) -> None:
+        """
+        Учет результата отправки.
+
+        :param chat_id: ID чата.
+        :param sent: Доставлено ли сообщение.
+        """
+        status = DeliveryStatus.sent if sent else DeliveryStatus.failed
+        self._batches.setdefault(status, []).append(chat_id)
+        self._size += 1
+        if self._size >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Запись накопленных результатов."""
+        batches = self._batches
+        self._batches = {}
+        self._size = 0
+        for status, chat_ids in batches.items():
+            await BroadcastDAO.set_delivery_status(self.broadcast_id, chat_ids, status)
+
+
+async def with_texts(
+    chat_ids: AsyncIterable[int],
+    texts: Mapping[int, str],
+    default: str,
+) -> AsyncIterable[Message]:
+    """
+    Свой текст для каждого чата, для остальных - общий.
+
+    :param chat_ids: Поток ID чатов.
+    :param texts: ID чата -> текст сообщения.
+    :param default: Текст для чатов, которых нет в texts.
+    :yield: ID чата и текст.
+    """
+    async for chat_id in chat_ids:
+        yield chat_id, texts.get(chat_id, default)
+
+
+async def prepare_campaign(
+    key: str,
+    text: str,
+    chunk_size: int,
+) -> Optional[BroadcastModel]:
+    """
+    Создание рассылки и заполнение получателей.
+
+    :param key: Ключ рассылки.
+    :param text: Текст сообщения для новой рассылки.
+    :param chunk_size: Сколько получателей читается и добавляется за один запрос.
+    :return: Рассылка или None, если она уже завершена.
+    """
+    broadcast = await BroadcastDAO.get_or_create_broadcast(key, text)
+    if broadcast.status == BroadcastStatus.finished:
+        return None
+    if broadcast.status == BroadcastStatus.pending:
+        user_ids = UserDAO.iter_user_ids(chunk_size)
+        await BroadcastDAO.add_recipients(broadcast.id, user_ids, chunk_size)
+        await BroadcastDAO.set_status(broadcast.id, BroadcastStatus.running)
+    return broadcast
+
+
+async def run_campaign(  # noqa: WPS211
+    broadcaster: Broadcaster,
+    key: str,
+    text: str,
+    chunk_size: int,
+    batch_size: int,
+    texts: Optional[Mapping[int, str]] = None,
+) -> BroadcastResult:
+    """
+    Рассылка с сохранением состояния в БД.
+
+    При первом запуске рассылка создается и заполняется получателями.
+    Повторный запуск с тем же ключом (после перезапуска воркера или
+    повтора задачи) отправляет исходный текст только тем, кому сообщение
+    еще не отправлено; завершенная рассылка не повторяется.
+    Персональные тексты не сохраняются: при продолжении рассылки их
+    нужно передать снова.
+
+    :param broadcaster: Рассыльщик.
+    :param key: Ключ рассылки.
+    :param text: Текст сообщения для новой рассылки.
+    :param chunk_size: Сколько ID получателей читается из БД за один запрос.
+    :param batch_size: Сколько состояний доставки записывается за один запрос.
+    :param texts: Персональные тексты по ID чата вместо общего текста.
+    :return: Количество доставленных и недоставленных сообщений.
+    """
+    broadcast = await prepare_campaign(key, text, chunk_size)
+    if broadcast is None:
+        logging.info(f"Broadcast [{key}]: already finished")
+        return BroadcastResult(sent=0, failed=0)
+
+    delivery_log = DeliveryLog(broadcast.id, batch_size)
+    chat_ids = BroadcastDAO.iter_pending_chat_ids(broadcast.id, chunk_size)
+    try:  # noqa: WPS501
+        result = await broadcaster.send_many(
+            with_texts(chat_ids, texts or {}, broadcast.text),
+            on_result=delivery_log.record,
+        )
+    finally:
+        await delivery_log.flush()
+    await BroadcastDAO.set_status(broadcast.id, BroadcastStatus.finished)
+    return result
@@ -0,0 +1,363 @@
+import gzip
+import zlib
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESSIBLE_TYPES = frozenset(
+    (
+        "application/json",
+        "application/javascript",
+        "text/css",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+    ),
+)
+GZIP_WBITS = 31
+
+
+class GzipCodec:
+    """Сжатие gzip."""
+
+    name = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self.level = level
+
+    def compress(self, body: bytes) -> bytes:
+        """
+        Сжатие тела ответа целиком.
+
+        :param body: Тело ответа.
+        :return: Сжатое тело.
+        """
+        return gzip.compress(body, compresslevel=self.level, mtime=0)
+
+    def compressor(self) -> "StreamCompressor":
+        """
+        Потоковый компрессор для ответов из нескольких частей.
+
+        :return: Компрессор.
+        """
+        compressobj = zlib.compressobj(self.level, zlib.DEFLATED, GZIP_WBITS)
+        return StreamCompressor(
+            process=compressobj.compress,
+            flush=lambda: compressobj.flush(zlib.Z_SYNC_FLUSH),
+            finish=compressobj.flush,
+        )
+
+
+class BrotliCodec:
+    """Сжатие brotli."""
+
+    name = "br"
+
+    def __init__(self, quality: int) -> None:
+        self.quality = quality
+
+    def compress(self, body: bytes) -> bytes:
+        """
+        Сжатие тела ответа целиком.
+
+        :param body: Тело ответа.
+        :return: Сжатое тело.
+        """
+        return brotli.compress(body, quality=self.quality)
+
+    def compressor(self) -> "StreamCompressor":
+        """
+        Потоковый компрессор для ответов из нескольких частей.
+
+        :return: Компрессор.
+        """
+        compressor = brotli.Compressor(quality=self.quality)
+        return StreamCompressor(
+            process=compressor.process,
+            flush=compressor.flush,
+            finish=compressor.finish,
+        )
+
+
+class StreamCompressor:
+    """Обертка над потоковыми компрессорами zlib и brotli."""
+
+    def __init__(
+        self,
+        process: Callable[[bytes], bytes],
+        flush: Callable[[], bytes],
+        finish: Callable[[], bytes],
+    ) -> None:
+        self.process = process
+        self.flush = flush
+        self.finish = finish
+
+    def compress(self, chunk: bytes, more_body: bool) -> bytes:
+        """
+        Сжатие очередной части ответа.
+
+        Каждая часть сбрасывается сразу, чтобы клиент не ждал заполнения буфера.
+
+        :param chunk: Часть тела ответа.
+        :param more_body: Будут ли еще части.
+        :return: Сжатые данные.
+        """
+        compressed = self.process(chunk)
+        if more_body:
+            return compressed + self.flush()
+        return compressed + self.finish()
+
+
+Codec = Union[GzipCodec, BrotliCodec]
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Разбор заголовка Accept-Encoding.
+
+    :param header: Значение заголовка.
+    :return: Кодировки с их весами.
+    """
+    encodings: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0
+        encodings[name] = quality
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Middleware для сжатия ответов gzip или brotli.
+
+    Кодировка выбирается по Accept-Encoding (при равных весах brotli важнее).
+    Сжимаются только текстовые ответы больше порога, уже сжатые ответы
+    и исключенные пути пропускаются без изменений. Vary: Accept-Encoding
+    добавляется ко всем ответам неисключенных путей, в том числе несжатым:
+    иначе общий кэш может отдать несжатый вариант клиенту, который
+    просил br/gzip, или наоборот.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_paths: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.excluded_paths = tuple(excluded_paths)
+        self.codecs: Tuple[Codec, ...] = (
+            BrotliCodec(brotli_quality),
+            GzipCodec(gzip_level),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_vary(message: Message) -> None:  # noqa: WPS430
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            await send(message)
+
+        codec = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if codec is None:
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        responder = CompressionResponder(self.app, codec, self.minimum_size)
+        await responder(scope, receive, send_with_vary)
+
+    def negotiate(self, accept_encoding: str) -> Optional[Codec]:
+        """
+        Выбор кодировки для ответа.
+
+        :param accept_encoding: Заголовок Accept-Encoding.
+        :return: Кодек или None, если клиент не принимает сжатие.
+        """
+        encodings = parse_accept_encoding(accept_encoding)
+        default = encodings.get("*", 0)
+        best_quality: float = 0
+        best_codec: Optional[Codec] = None
+        for codec in self.codecs:
+            quality = encodings.get(codec.name, default)
+            if quality > best_quality:
+                best_quality, best_codec = quality, codec
+        return best_codec
+
+
+class CompressionResponder:
+    """Сжатие одного ответа."""
+
+    def __init__(self, app: ASGIApp, codec: Codec, minimum_size: int) -> None:
+        self.app = app
+        self.codec = codec
+        self.minimum_size = minimum_size
+        self._send: Send
+        self._initial_message: Message = {}
+        self._started = False
+        self._passthrough = False
+        self._compressor: Optional[StreamCompressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        self._send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        """
+        Перехват сообщений ответа.
+
+        Начало ответа откладывается до первой части тела: только тогда
+        известно, нужно ли сжатие и каким будет Content-Length.
+
+        :param message: ASGI сообщение.
+        """
+        if message["type"] == "http.response.start":
+            self._initial_message = message
+            self._passthrough = not is_compressible(Headers(raw=message["headers"]))
+        elif message["type"] == "http.response.body":
+            await self.send_body(message)
+        else:
+            await self._send(message)
+
+    async def send_body(self, message: Message) -> None:
+        """
+        Отправка части тела ответа.
+
+        :param message: ASGI сообщение с телом ответа.
+        """
+        if self._started:
+            await self.send_chunk(message)
+            return
+        self._started = True
+        await self.start_body(message)
+
+    async def start_body(self, message: Message) -> None:
+        """
+        Отправка заголовков и первой части тела.
+
+        :param message: Первое ASGI сообщение с телом ответа.
+        """
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.get_body_size(body, more_body) < self.minimum_size:
+            self._passthrough = True
+        if self._passthrough:
+            await self._send(self._initial_message)
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self._initial_message["headers"])
+        set_encoding_headers(headers, self.codec.name)
+        if more_body:
+            del headers["Content-Length"]  # noqa: WPS420
+            self._compressor = self.codec.compressor()
+            await self._send(self._initial_message)
+            await self.send_chunk(message)
+        else:
+            await self.send_compressed_body(headers, body)
+
+    def get_body_size(self, body: bytes, more_body: bool) -> float:
+        """
+        Размер тела ответа, если он известен заранее.
+
+        :param body: Первая часть тела ответа.
+        :param more_body: Будут ли еще части.
+        :return: Размер тела или бесконечность для потоковых ответов.
+        """
+        if not more_body:
+            return len(body)
+        content_length = Headers(raw=self._initial_message["headers"]).get(
+            "content-length",
+        )
+        if content_length is None:
+            return float("inf")
+        return int(content_length)
+
+    async def send_compressed_body(self, headers: MutableHeaders, body: bytes) -> None:
+        """
+        Сжатие и отправка ответа, пришедшего одной частью.
+
+        :param headers: Заголовки ответа.
+        :param body: Тело ответа.
+        """
+        compressed = self.codec.compress(body)
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self._initial_message)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def send_chunk(self, message: Message) -> None:
+        """
+        Отправка очередной части потокового ответа.
+
+        :param message: ASGI сообщение с частью тела.
+        """
+        if self._passthrough or self._compressor is None:
+            await self._send(message)
+            return
+        more_body = message.get("more_body", False)
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": self._compressor.compress(message.get("body", b""), more_body),
+                "more_body": more_body,
+            },
+        )
+
+
+def is_compressible(headers: Headers) -> bool:
+    """
+    Можно ли сжимать ответ с такими заголовками.
+
+    :param headers: Заголовки ответа.
+    :return: Текстовый ли ответ без Content-Encoding.
+    """
+    if "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").partition(";")[0].strip()
+    return media_type.lower() in COMPRESSIBLE_TYPES
+
+
+def set_encoding_headers(headers: MutableHeaders, encoding: str) -> None:
+    """
+    Заголовки сжатого ответа.
+
+    Строгий ETag становится слабым: сжатое представление не совпадает
+    побайтово с исходным, а If-None-Match сравнивает ETag'и слабо.
+
+    :param headers: Заголовки ответа.
+    :param encoding: Название кодировки.
+    """
+    headers["Content-Encoding"] = encoding
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
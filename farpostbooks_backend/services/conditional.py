@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from farpostbooks_backend.db.models.catalogue_model import CatalogueModel
+
+
+def get_etag(catalogue: CatalogueModel) -> str:
+    """
+    Строгий ETag на основе версии каталога.
+
+    :param catalogue: Модель версии каталога.
+    :return: ETag в кавычках.
+    """
+    return f'"catalogue-{catalogue.version}"'
+
+
+def get_last_modified(catalogue: CatalogueModel) -> datetime:
+    """
+    Время последнего изменения каталога с точностью до секунды.
+
+    :param catalogue: Модель версии каталога.
+    :return: Время изменения в UTC.
+    """
+    updated = catalogue.updated_timestamp
+    if updated.tzinfo is None:
+        updated = updated.replace(tzinfo=timezone.utc)
+    return updated.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def get_validators(catalogue: CatalogueModel) -> Dict[str, str]:
+    """
+    Заголовки для условных запросов.
+
+    :param catalogue: Модель версии каталога.
+    :return: ETag, Last-Modified и Cache-Control.
+    """
+    return {
+        "ETag": get_etag(catalogue),
+        "Last-Modified": format_datetime(get_last_modified(catalogue), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def is_not_modified(request: Request, catalogue: CatalogueModel) -> bool:
+    """
+    Проверка, что у клиента уже есть актуальная версия ответа.
+
+    If-None-Match имеет приоритет над If-Modified-Since (RFC 9110).
+
+    :param request: Запрос.
+    :param catalogue: Модель версии каталога.
+    :return: Можно ли ответить 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = get_etag(catalogue)
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == etag:
+                return True
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    modified_since = _parse_http_date(if_modified_since)
+    if modified_since is None:
+        return False
+    return get_last_modified(catalogue) <= modified_since
+
+
+def not_modified(catalogue: CatalogueModel) -> Response:
+    """
+    Ответ 304 без тела.
+
+    :param catalogue: Модель версии каталога.
+    :return: Ответ.
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=get_validators(catalogue),
+    )
@@ -0,0 +1,206 @@
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from opentelemetry.trace import SpanKind, get_current_span, get_tracer
+from prometheus_client import Histogram
+from tortoise.backends.asyncpg.client import AsyncpgDBClient, TransactionWrapper
+
+DB_QUERIES = Histogram(
+    "fastapi_db_queries",
+    "Histogram of SQL queries per request by path",
+    ["method", "path", "app_name"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_DURATION = Histogram(
+    "fastapi_db_duration_seconds",
+    "Histogram of total SQL time per request by path (in seconds)",
+    ["method", "path", "app_name"],
+)
+
+# Методы клиента Tortoise, через которые проходят все SQL запросы.
+QUERY_METHODS = (
+    "execute_insert",
+    "execute_many",
+    "execute_query",
+    "execute_query_dict",
+    "execute_script",
+)
+# Признак уже обернутого класса клиента.
+INSTRUMENTED = "_counts_queries"
+# Сколько запросов запоминается для предупреждения о превышении бюджета.
+MAX_STATEMENTS = 20
+# Длина SQL запроса в атрибуте span'а.
+MAX_STATEMENT_LENGTH = 2048
+
+TRACER = get_tracer(__name__)
+
+QueryMethod = Callable[..., Awaitable[Any]]
+
+
+class QueryStats:
+    """
+    Количество и суммарное время SQL запросов.
+
+    Вложенный подсчет передает запросы и внешнему, поэтому тест может
+    считать запросы вокруг запроса к API, который считает их сам.
+    """
+
+    def __init__(self, parent: Optional["QueryStats"] = None) -> None:
+        self.count = 0
+        self.duration: float = 0
+        self.statements: List[str] = []
+        self._parent = parent
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Учет выполненного запроса.
+
+        :param statement: SQL запрос.
+        :param duration: Время выполнения в секундах.
+        """
+        self.count += 1
+        self.duration += duration
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append(statement)
+        if self._parent is not None:
+            self._parent.record(statement, duration)
+
+
+CURRENT_STATS: ContextVar[Optional[QueryStats]] = ContextVar(
+    "db_query_stats",
+    default=None,
+)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    Подсчет SQL запросов внутри блока.
+
+    :yield: Статистика запросов, заполняется по мере выполнения.
+    """
+    stats = QueryStats(CURRENT_STATS.get())
+    token = CURRENT_STATS.set(stats)
+    try:  # noqa: WPS501
+        yield stats
+    finally:
+        CURRENT_STATS.reset(token)
+
+
+def count_rows(query_result: Any) -> Optional[int]:
+    """
+    Количество строк в результате метода клиента БД.
+
+    :param query_result: Результат метода клиента.
+    :return: Количество строк или None, если метод их не возвращает.
+    """
+    if isinstance(query_result, list):
+        return len(query_result)
+    if isinstance(query_result, tuple) and query_result:
+        rows = query_result[0]
+        return rows if isinstance(rows, int) else 1
+    if query_result is not None:
+        return 1
+    return None
+
+
+async def record_query(query_result: Awaitable[Any], statement: str) -> Any:
+    """
+    Выполнение запроса с учетом в текущем подсчете.
+
+    :param query_result: Выполняемый запрос.
+    :param statement: SQL запрос.
+    :return: Результат запроса.
+    """
+    stats = CURRENT_STATS.get()
+    if stats is None:
+        return await query_result
+    before_time = time.perf_counter()
+    try:  # noqa: WPS501
+        return await query_result
+    finally:
+        stats.record(statement, time.perf_counter() - before_time)
+
+
+def counted(method: QueryMethod) -> QueryMethod:
+    """
+    Обертка метода клиента БД, учитывающая запрос в текущем подсчете.
+
+    Внутри записываемого трейса запрос выполняется в дочернем span'е
+    с текстом запроса и количеством строк, вне трейса span не создается.
+
+    :param method: Метод клиента.
+    :return: Метод с подсчетом запросов.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(  # noqa: WPS430
+        client: Any,
+        query: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        query_result = method(client, query, *args, **kwargs)
+        if not get_current_span().is_recording():
+            return await record_query(query_result, query)
+        operation = query.split(maxsplit=1)[0].upper() if query else "SQL"
+        with TRACER.start_as_current_span(operation, kind=SpanKind.CLIENT) as span:
+            span.set_attribute("db.system", "postgresql")
+            span.set_attribute("db.operation", operation)
+            span.set_attribute("db.statement", query[:MAX_STATEMENT_LENGTH])
+            query_rows = await record_query(query_result, query)
+            rows = count_rows(query_rows)
+            if rows is not None:
+                span.set_attribute("db.rows", rows)
+        return query_rows
+
+    return wrapper
+
+
+def instrument_tortoise() -> None:
+    """Подсчет и span'ы запросов клиента asyncpg, повторный вызов ничего не меняет."""
+    for client_class in (AsyncpgDBClient, TransactionWrapper):
+        if client_class.__dict__.get(INSTRUMENTED):
+            continue
+        for name in QUERY_METHODS:
+            method = client_class.__dict__.get(name)
+            if method is not None:
+                setattr(client_class, name, counted(method))
+        setattr(client_class, INSTRUMENTED, True)
+
+
+class QueryBudget:
+    """Метрики SQL запросов запроса к API и предупреждение о превышении бюджета."""
+
+    def __init__(
+        self,
+        app_name: str,
+        default: Optional[int] = None,
+        budgets: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.app_name = app_name
+        self.default = default
+        self.budgets = budgets or {}
+
+    def observe(self, method: str, path: str, stats: QueryStats) -> None:
+        """
+        Запись метрик и проверка бюджета запросов.
+
+        :param method: HTTP метод.
+        :param path: Шаблон пути.
+        :param stats: Статистика SQL запросов.
+        """
+        labels = {"method": method, "path": path, "app_name": self.app_name}
+        DB_QUERIES.labels(**labels).observe(stats.count)
+        DB_DURATION.labels(**labels).observe(stats.duration)
+        budget = self.budgets.get(path, self.default)
+        if budget is not None and stats.count > budget:
+            statements = "\n".join(stats.statements)
+            logging.warning(
+                f"{method} {path}: {stats.count} SQL queries,"
+                f" budget {budget}:\n{statements}",
+            )
@@ -0,0 +1,224 @@
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.userbook_dao import Rating, UserBookDAO
+from farpostbooks_backend.db.models.book_model import BookModel
+
+HEADER = "<b>📚 Добавлены новые книги:</b>"
+# Оценка книги без отзыва (книга еще у читателя) и оценка, ниже
+# которой автор становится менее интересен читателю.
+NEUTRAL_RATING = 3
+DISLIKE_RATING = 2
+
+
+class Digest(NamedTuple):
+    """Тексты еженедельной рассылки."""
+
+    # Общий текст для читателей без истории, связанной с новыми книгами
+    text: str
+    # Telegram ID -> текст с новыми книгами в порядке интереса читателя
+    texts: Dict[int, str]
+
+
+def book_line(book: BookModel) -> str:
+    """
+    Строка книги в рассылке.
+
+    :param book: Модель книги.
+    :return: Строка с названием и ISBN.
+    """
+    return f"<b>- {book.name}</b> (ISBN: <code>{book.id}</code>)"
+
+
+def author_names(author: str) -> List[str]:
+    """
+    Авторы книги из строки через запятую.
+
+    :param author: Авторы книги.
+    :return: Имена авторов в нижнем регистре.
+    """
+    names = (name.strip().lower() for name in author.split(","))
+    return [name for name in names if name]
+
+
+def author_matrix(  # noqa: WPS210
+    authors: Sequence[str],
+    vocabulary: Dict[str, int],
+) -> sparse.csr_matrix:
+    """
+    Разреженная матрица книга x автор из словаря авторов.
+
+    :param authors: Авторы каждой книги.
+    :param vocabulary: Автор -> номер столбца.
+    :return: Матрица с 1 для авторов книги.
+    """
+    rows = []
+    cols = []
+    for row, author in enumerate(authors):
+        for name in author_names(author):
+            col = vocabulary.get(name)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    values = np.ones(len(rows), dtype=np.float32)
+    shape = (len(authors), len(vocabulary))
+    return sparse.csr_matrix((values, (rows, cols)), shape=shape)
+
+
+def author_vocabulary(authors: Sequence[str]) -> Dict[str, int]:
+    """
+    Словарь авторов книг.
+
+    :param authors: Авторы каждой книги.
+    :return: Автор -> номер столбца.
+    """
+    names = {name for author in authors for name in author_names(author)}
+    return {name: col for col, name in enumerate(sorted(names))}
+
+
+def history_array(ratings: List[Rating]) -> np.ndarray:
+    """
+    История взятия книг в виде массива.
+
+    :param ratings: История взятия книг с оценками.
+    :return: Массив из столбцов Telegram ID, ISBN и оценки.
+    """
+    history = [
+        (user_id, book_id, NEUTRAL_RATING if rating is None else rating)
+        for user_id, book_id, rating in ratings
+    ]
+    return np.array(history, dtype=np.int64).reshape(-1, 3)
+
+
+def reader_weights(
+    ratings: List[Rating],
+    book_ids: np.ndarray,
+) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    """
+    Разреженная матрица читатель x книга с весами по оценкам.
+
+    Оценка 5 дает вес 3, оценка 1 - отрицательный вес.
+
+    :param ratings: История взятия книг с оценками.
+    :param book_ids: ISBN каталога по возрастанию.
+    :return: Telegram ID по номерам строк и матрица весов.
+    """
+    history = history_array(ratings)
+    users, user_index = np.unique(history[:, 0], return_inverse=True)
+    weights = (history[:, 2] - DISLIKE_RATING).astype(np.float32)
+    cells = (user_index, np.searchsorted(book_ids, history[:, 1]))
+    shape = (len(users), len(book_ids))
+    return users, sparse.csr_matrix((weights, cells), shape=shape)
+
+
+def interest_scores(
+    ratings: List[Rating],
+    catalogue: List[Tuple[int, str]],
+    new_authors: Sequence[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Интерес каждого читателя к каждой новой книге.
+
+    Интерес читателя к автору - сумма весов его оценок книг этого автора,
+    интерес к новой книге - сумма интересов к ее авторам. Учитываются
+    только авторы новых книг, поэтому матрицы остаются маленькими.
+
+    :param ratings: История взятия книг с оценками.
+    :param catalogue: Пары ISBN и авторов по возрастанию ISBN.
+    :param new_authors: Авторы новых книг.
+    :return: Telegram ID по номерам строк и матрица читатель x новая книга.
+    """
+    vocabulary = author_vocabulary(new_authors)
+    book_ids = np.array([book[0] for book in catalogue], dtype=np.int64)
+    users, readers = reader_weights(ratings, book_ids)
+    interest = readers @ author_matrix([book[1] for book in catalogue], vocabulary)
+    return users, (interest @ author_matrix(new_authors, vocabulary).T).toarray()
+
+
+def rank_new_books(
+    ratings: List[Rating],
+    catalogue: List[Tuple[int, str]],
+    new_authors: Sequence[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Порядок новых книг для всех читателей за один проход по матрицам.
+
+    Книги с равным интересом остаются в исходном порядке.
+
+    :param ratings: История взятия книг с оценками.
+    :param catalogue: Пары ISBN и авторов по возрастанию ISBN.
+    :param new_authors: Авторы новых книг.
+    :return: Telegram ID читателей с интересом хотя бы к одной новой книге
+        и номера новых книг в порядке интереса для каждого из них.
+    """
+    users, scores = interest_scores(ratings, catalogue, new_authors)
+    personalized = scores.max(axis=1, initial=0) > 0
+    order = np.argsort(-scores[personalized], axis=1, kind="stable")
+    return users[personalized], order
+
+
+def render(shown: List[str], total: int) -> str:
+    """
+    Текст рассылки из заранее собранных строк книг.
+
+    :param shown: Строки книг, которые выводятся в сообщении.
+    :param total: Сколько всего новых книг.
+    :return: Текст сообщения.
+    """
+    text = "\n".join([HEADER, *shown])
+    hidden = total - len(shown)
+    if hidden > 0:
+        text = f"{text}\n<i>и еще {hidden} в каталоге</i>"
+    return text
+
+
+def render_digests(
+    users: np.ndarray,
+    order: np.ndarray,
+    lines: List[str],
+    max_books: int,
+) -> Dict[int, str]:
+    """
+    Тексты для читателей: каждый уникальный порядок рендерится один раз.
+
+    :param users: Telegram ID читателей.
+    :param order: Номера новых книг в порядке интереса для каждого читателя.
+    :param lines: Строки новых книг.
+    :param max_books: Сколько книг выводится в сообщении.
+    :return: Telegram ID -> текст сообщения.
+    """
+    if not len(users):
+        return {}
+    rankings, inverse = np.unique(
+        order[:, :max_books],
+        axis=0,
+        return_inverse=True,
+    )
+    texts = [
+        render([lines[index] for index in ranking], len(lines))
+        for ranking in rankings.tolist()
+    ]
+    user_texts = (texts[index] for index in inverse.ravel())
+    return dict(zip(users.tolist(), user_texts))
+
+
+async def build_digest(books: List[BookModel], max_books: int = 10) -> Digest:
+    """
+    Персональные тексты еженедельной рассылки о новых книгах.
+
+    :param books: Новые книги, начиная с самой свежей.
+    :param max_books: Сколько книг выводится в сообщении.
+    :return: Общий текст и тексты для читателей.
+    """
+    lines = [book_line(book) for book in books]
+    ratings = await UserBookDAO.get_ratings()
+    # Каталог читается после истории, поэтому в нем есть все книги из нее.
+    catalogue = await BookDAO.get_authors()
+    users, order = rank_new_books(ratings, catalogue, [book.author for book in books])
+    return Digest(
+        text=render(lines[:max_books], len(lines)),
+        texts=render_digests(users, order, lines, max_books),
+    )
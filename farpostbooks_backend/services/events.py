@@ -0,0 +1,293 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from enum import Enum
+from typing import AsyncIterator, Deque, List, Optional, Set
+
+from pydantic import BaseModel
+from redis.asyncio import Redis  # type: ignore
+from redis.exceptions import RedisError  # type: ignore
+from starlette.requests import Request
+
+from farpostbooks_backend.settings import EventsBackend, Settings
+
+RECONNECT_DELAY = 1
+# Номер события выдается и событие публикуется одной атомарной операцией,
+# поэтому события приходят в канал строго по возрастанию номеров.
+PUBLISH_SCRIPT = """
+local event_id = redis.call("INCR", KEYS[1])
+redis.call("PUBLISH", ARGV[1], '{"id": ' .. event_id .. ', ' .. string.sub(ARGV[2], 2))
+return event_id
+"""
+
+
+class AvailabilityEventType(str, Enum):  # noqa: WPS600
+    """Изменения наличия книги на полке."""
+
+    created = "created"
+    taken = "taken"
+    returned = "returned"
+
+
+class AvailabilityEvent(BaseModel):
+    """Событие об изменении наличия книги."""
+
+    id: int
+    type: AvailabilityEventType
+    book_id: int
+
+
+class Subscription:
+    """
+    Подписка одного клиента на события.
+
+    None в очереди означает, что подписка закрыта (клиент не успевал
+    читать события или сервер останавливается) и клиенту нужно
+    переподключиться с Last-Event-ID.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue: "asyncio.Queue[Optional[AvailabilityEvent]]" = asyncio.Queue(
+            maxsize=queue_size,
+        )
+        self.backlog: List[AvailabilityEvent] = []
+        self.reset = False
+        self.last_id = 0
+
+    def push(self, event: AvailabilityEvent) -> bool:
+        """
+        Добавление события в очередь клиента.
+
+        :param event: Событие.
+        :return: Поместилось ли событие в очередь.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def close(self) -> None:
+        """Закрытие подписки: освобождаем место под маркер конца."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """
+    Рассылка событий подключенным к этому процессу клиентам.
+
+    Хранит последние события, чтобы переподключившийся клиент получил
+    пропущенное по Last-Event-ID. Если пропущенные события уже вытеснены,
+    клиент получает reset и должен заново запросить список книг.
+    """
+
+    def __init__(self, history_size: int, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self.last_id = 0
+        self._history: Deque[AvailabilityEvent] = deque(maxlen=history_size)
+        self._subscriptions: Set[Subscription] = set()
+
+    async def start(self) -> None:
+        """Запуск брокера."""
+
+    async def stop(self) -> None:
+        """Остановка брокера и закрытие всех подписок."""
+        for subscription in self._subscriptions:
+            subscription.close()
+
+    async def publish(self, event_type: AvailabilityEventType, book_id: int) -> None:
+        """
+        Публикация события.
+
+        :param event_type: Тип события.
+        :param book_id: ISBN книги.
+        """
+        self.dispatch(
+            AvailabilityEvent(id=self.last_id + 1, type=event_type, book_id=book_id),
+        )
+
+    def dispatch(self, event: AvailabilityEvent) -> None:
+        """
+        Доставка события подписчикам этого процесса.
+
+        Подписка, очередь которой переполнена, закрывается, чтобы медленный
+        клиент не держал память и не задерживал остальных.
+
+        :param event: Событие.
+        """
+        if event.id <= self.last_id:
+            return
+        self.last_id = event.id
+        self._history.append(event)
+        for subscription in list(self._subscriptions):
+            if not subscription.push(event):
+                subscription.close()
+                self._subscriptions.discard(subscription)
+
+    def reset(self, last_id: int) -> None:
+        """
+        Сброс истории, если часть событий могла быть потеряна.
+
+        :param last_id: Актуальный номер последнего события.
+        """
+        self._history.clear()
+        self.last_id = last_id
+        for subscription in self._subscriptions:
+            subscription.close()
+        self._subscriptions.clear()
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+    ) -> AsyncIterator[Subscription]:
+        """
+        Подписка на события.
+
+        Регистрация и выборка пропущенных событий выполняются без await,
+        поэтому между ними ничего не теряется.
+
+        :param last_event_id: Номер последнего полученного клиентом события.
+        :yields: Подписка.
+        """
+        subscription = Subscription(self.queue_size)
+        subscription.last_id = self.last_id
+        if last_event_id is not None and last_event_id != self.last_id:
+            backlog = self.get_backlog(last_event_id)
+            if backlog is None:
+                subscription.reset = True
+            else:
+                subscription.backlog = backlog
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def get_backlog(self, last_event_id: int) -> Optional[List[AvailabilityEvent]]:
+        """
+        События после указанного номера.
+
+        :param last_event_id: Номер последнего полученного клиентом события.
+        :return: Пропущенные события или None, если их уже нет в истории.
+        """
+        if last_event_id > self.last_id or not self._history:
+            return None
+        if self._history[0].id > last_event_id + 1:
+            return None
+        return [event for event in self._history if event.id > last_event_id]
+
+
+class RedisEventBroker(EventBroker):
+    """
+    Брокер, разделяющий события между воркерами через Redis pub/sub.
+
+    Номера событий выдает счетчик в Redis, поэтому Last-Event-ID
+    понятен любому воркеру. Номер выдается в том же скрипте, что и
+    публикует событие, поэтому события одновременно публикующих
+    воркеров не обгоняют друг друга. Каждый воркер один раз
+    подписывается на канал и раздает события своим клиентам.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        channel: str,
+        history_size: int,
+        queue_size: int,
+    ) -> None:
+        super().__init__(history_size=history_size, queue_size=queue_size)
+        self.redis = redis
+        self.channel = channel
+        self.counter_key = f"{channel}:id"
+        self._publish_script = redis.register_script(PUBLISH_SCRIPT)
+        self._listener: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Запуск фоновой подписки на канал Redis."""
+        self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        """Остановка подписки и закрытие соединения с Redis."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+        await super().stop()
+        await self.redis.close()
+
+    async def publish(self, event_type: AvailabilityEventType, book_id: int) -> None:
+        """
+        Публикация события для всех воркеров.
+
+        Недоступность Redis не должна ломать взятие и возврат книг,
+        поэтому ошибка только логируется.
+
+        :param event_type: Тип события.
+        :param book_id: ISBN книги.
+        """
+        event = AvailabilityEvent(id=0, type=event_type, book_id=book_id)
+        try:
+            await self._publish_script(
+                keys=[self.counter_key],
+                args=[self.channel, event.json(exclude={"id"})],
+            )
+        except RedisError:
+            logging.exception(f"Event [{event_type.value}:{book_id}]: not published")
+
+    async def listen(self) -> None:
+        """Чтение канала с переподключением при обрыве соединения."""
+        while True:  # noqa: WPS457
+            try:
+                await self.read_channel()
+            except RedisError:
+                logging.exception("Events channel: connection lost")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def read_channel(self) -> None:
+        """
+        Подписка на канал и раздача событий.
+
+        После (пере)подключения история сбрасывается: за время обрыва
+        события могли пройти мимо этого воркера.
+        """
+        async with self.redis.pubsub() as pubsub:
+            await pubsub.subscribe(self.channel)
+            last_id = await self.redis.get(self.counter_key)
+            self.reset(int(last_id or 0))
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self.dispatch(AvailabilityEvent.parse_raw(message["data"]))
+
+
+def create_event_broker(settings: Settings) -> EventBroker:
+    """
+    Создание брокера событий по настройкам.
+
+    :param settings: Настройки приложения.
+    :return: Брокер событий.
+    """
+    if settings.events_backend == EventsBackend.memory:
+        return EventBroker(
+            history_size=settings.events_history_size,
+            queue_size=settings.events_queue_size,
+        )
+    return RedisEventBroker(
+        redis=Redis(host=settings.redis_host, port=settings.redis_port),
+        channel=settings.events_channel,
+        history_size=settings.events_history_size,
+        queue_size=settings.events_queue_size,
+    )
+
+
+def get_event_broker(request: Request) -> EventBroker:
+    """
+    Брокер событий текущего приложения.
+
+    :param request: Запрос.
+    :return: Брокер событий.
+    """
+    return request.app.state.events  # type: ignore
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Union
+
+from prometheus_client import Counter
+from redis.asyncio import Redis  # type: ignore
+from redis.exceptions import RedisError  # type: ignore
+
+FLOOD_LIMITS = Counter(
+    "telegram_flood_limits_total",
+    "Total count of TelegramRetryAfter responses",
+)
+FLOOD_PAUSE = Counter(
+    "telegram_flood_pause_seconds_total",
+    "Total seconds of sending paused by flood control",
+)
+RETRIES_EXHAUSTED = Counter(
+    "telegram_retries_exhausted_total",
+    "Total count of messages dropped after too many flood limit retries",
+)
+
+# Продлевает паузу, только если новая длиннее текущей.
+PAUSE_SCRIPT = """
+if redis.call("PTTL", KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call("SET", KEYS[1], "1", "PX", ARGV[1])
+end
+"""
+MILLISECONDS = 1000
+
+
+class MemoryFloodControl:
+    """Пауза в отправке сообщений, общая для всех отправок процесса."""
+
+    def __init__(self) -> None:
+        self.paused_until: float = 0
+
+    async def wait(self) -> None:
+        """Ожидание окончания паузы."""
+        delay = self.paused_until - time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.paused_until - time.monotonic()
+
+    async def pause(self, retry_after: float) -> None:
+        """
+        Пауза в отправке после ответа Telegram о превышении лимита.
+
+        :param retry_after: Через сколько секунд можно продолжить.
+        """
+        FLOOD_LIMITS.inc()
+        paused_until = time.monotonic() + retry_after
+        if paused_until > self.paused_until:
+            FLOOD_PAUSE.inc(paused_until - max(self.paused_until, time.monotonic()))
+            self.paused_until = paused_until
+
+
+class RedisFloodControl:
+    """
+    Пауза в отправке сообщений, общая для всех процессов через Redis.
+
+    Пауза хранится ключом с TTL. Она также запоминается в процессе,
+    поэтому при недоступности Redis процесс продолжает соблюдать паузы,
+    о которых узнал сам.
+    """
+
+    def __init__(self, redis: Redis, key: str = "farpostbooks:flood") -> None:
+        self.redis = redis
+        self.key = key
+        self.local = MemoryFloodControl()
+        self._script = redis.register_script(PAUSE_SCRIPT)
+
+    async def wait(self) -> None:
+        """Ожидание окончания паузы."""
+        await self.local.wait()
+        try:
+            delay = await self.redis.pttl(self.key)
+            while delay > 0:
+                await asyncio.sleep(delay / MILLISECONDS)
+                delay = await self.redis.pttl(self.key)
+        except RedisError:
+            logging.exception("Flood control: Redis is unavailable")
+
+    async def pause(self, retry_after: float) -> None:
+        """
+        Пауза в отправке после ответа Telegram о превышении лимита.
+
+        :param retry_after: Через сколько секунд можно продолжить.
+        """
+        await self.local.pause(retry_after)
+        try:
+            await self._script(
+                keys=[self.key],
+                args=[int(retry_after * MILLISECONDS)],
+            )
+        except RedisError:
+            logging.exception("Flood control: Redis is unavailable")
+
+
+FloodControl = Union[MemoryFloodControl, RedisFloodControl]
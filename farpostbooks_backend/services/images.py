@@ -0,0 +1,491 @@
+import os
+import stat
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from mimetypes import guess_type
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import anyio
+from prometheus_client import Counter, Gauge
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+IMAGES_CACHE_REQUESTS = Counter(
+    "images_cache_requests_total",
+    "Total count of image requests by cache result",
+    ["result"],
+)
+IMAGES_CACHE_HIT_RATIO = Gauge(
+    "images_cache_hit_ratio",
+    "Share of image requests served from memory",
+    multiprocess_mode="liveall",
+)
+IMAGES_CACHE_BYTES = Gauge(
+    "images_cache_bytes",
+    "Size of images kept in memory",
+    multiprocess_mode="livesum",
+)
+IMAGES_BYTES_SERVED = Counter(
+    "images_bytes_served_total",
+    "Total bytes of image bodies sent by source",
+    ["source"],
+)
+
+CHUNK_SIZE = 65536
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+Header = Tuple[bytes, bytes]
+ByteRange = Tuple[int, int]
+
+
+class ImageFile(NamedTuple):
+    """Обложка: метаданные файла и тело, если оно хранится в памяти."""
+
+    path: Path
+    size: int
+    etag: str
+    last_modified: str
+    media_type: str
+    body: Optional[bytes]
+    checked_at: float
+
+
+class UnsatisfiableRangeError(Exception):
+    """Запрошенный диапазон лежит за пределами файла."""
+
+
+class ImageCache:
+    """LRU обложек, ограниченный суммарным размером в байтах."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._images: "OrderedDict[str, ImageFile]" = OrderedDict()
+
+    def get(self, name: str) -> Optional[ImageFile]:
+        """
+        Обложка из кэша.
+
+        :param name: Имя файла.
+        :return: Обложка или None.
+        """
+        image = self._images.get(name)
+        if image is not None:
+            self._images.move_to_end(name)
+        return image
+
+    def put(self, name: str, image: ImageFile) -> None:
+        """
+        Добавление обложки с вытеснением самых старых.
+
+        :param name: Имя файла.
+        :param image: Обложка с телом.
+        """
+        self.pop(name)
+        self._images[name] = image
+        self.size += image.size
+        while self.size > self.max_bytes:
+            _, evicted = self._images.popitem(last=False)
+            self.size -= evicted.size
+        IMAGES_CACHE_BYTES.set(self.size)
+
+    def pop(self, name: str) -> None:
+        """
+        Удаление обложки из кэша.
+
+        :param name: Имя файла.
+        """
+        image = self._images.pop(name, None)
+        if image is not None:
+            self.size -= image.size
+            IMAGES_CACHE_BYTES.set(self.size)
+
+
+class ImageApp:
+    """
+    ASGI приложение для раздачи обложек.
+
+    Часто запрашиваемые обложки отдаются из памяти без обращения
+    к файловой системе; файл проверяется через stat не чаще, чем раз
+    в revalidate_after секунд. Крупные файлы читаются с диска
+    (через zerocopysend, если сервер его поддерживает).
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        directory: str,
+        max_bytes: int,
+        max_item_bytes: int,
+        revalidate_after: float,
+        cache_control: str,
+    ) -> None:
+        self.directory = Path(directory)
+        self.cache = ImageCache(max_bytes)
+        self.max_item_bytes = max_item_bytes
+        self.revalidate_after = revalidate_after
+        self.cache_control = cache_control.encode()
+        self._hits = 0
+        self._misses = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        if scope["method"] not in {"GET", "HEAD"}:
+            await send_empty(
+                send,
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                [(b"allow", b"GET, HEAD")],
+            )
+            return
+
+        image = await self.get_image(scope["path"].lstrip("/"))
+        if image is None:
+            await send_empty(send, status.HTTP_404_NOT_FOUND, [])
+            return
+        await self.send_image(scope, send, image)
+
+    async def get_image(self, name: str) -> Optional[ImageFile]:
+        """
+        Поиск обложки в памяти или на диске.
+
+        :param name: Имя файла.
+        :return: Обложка или None, если файла нет.
+        """
+        if not name or name.startswith(".") or "/" in name or "\\" in name:
+            return None
+        now = time.monotonic()
+        cached = self.cache.get(name)
+        if cached is not None and now - cached.checked_at < self.revalidate_after:
+            self.record(hit=True)
+            return cached
+
+        image = await self.load_image(name, now, cached)
+        self.record(hit=image is not None and image.body is not None)
+        return image
+
+    async def load_image(
+        self,
+        name: str,
+        now: float,
+        cached: Optional[ImageFile],
+    ) -> Optional[ImageFile]:
+        """
+        Проверка файла на диске и обновление кэша.
+
+        :param name: Имя файла.
+        :param now: Текущее время (monotonic).
+        :param cached: Устаревшая запись кэша.
+        :return: Обложка или None, если файла нет.
+        """
+        path = self.directory / name
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except (OSError, ValueError):
+            # Нет файла, слишком длинное имя или NUL в имени.
+            self.cache.pop(name)
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+
+        mtime, size = stat_result.st_mtime_ns, stat_result.st_size
+        etag = f'"{mtime:x}-{size:x}"'
+        if cached is not None and cached.etag == etag:
+            image = cached._replace(checked_at=now)  # noqa: WPS437
+        else:
+            image = await self.read_image(path, stat_result, etag, now)
+        if image.body is None:
+            self.cache.pop(name)
+        else:
+            self.cache.put(name, image)
+        return image
+
+    async def read_image(
+        self,
+        path: Path,
+        stat_result: os.stat_result,
+        etag: str,
+        now: float,
+    ) -> ImageFile:
+        """
+        Чтение обложки с диска; крупные файлы в память не читаются.
+
+        :param path: Путь к файлу.
+        :param stat_result: Результат stat для файла.
+        :param etag: ETag файла.
+        :param now: Текущее время (monotonic).
+        :return: Обложка.
+        """
+        body = None
+        if stat_result.st_size <= self.max_item_bytes:
+            body = await anyio.to_thread.run_sync(path.read_bytes)
+        return ImageFile(
+            path=path,
+            size=stat_result.st_size if body is None else len(body),
+            etag=etag,
+            last_modified=formatdate(stat_result.st_mtime, usegmt=True),
+            media_type=guess_type(path.name)[0] or "application/octet-stream",
+            body=body,
+            checked_at=now,
+        )
+
+    def record(self, hit: bool) -> None:
+        """
+        Учет попадания в кэш.
+
+        :param hit: Отдана ли обложка из памяти.
+        """
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+        IMAGES_CACHE_REQUESTS.labels(result="hit" if hit else "miss").inc()
+        IMAGES_CACHE_HIT_RATIO.set(self._hits / (self._hits + self._misses))
+
+    async def send_image(self, scope: Scope, send: Send, image: ImageFile) -> None:
+        """
+        Отправка обложки с учетом If-None-Match и Range.
+
+        :param scope: ASGI scope.
+        :param send: ASGI send.
+        :param image: Обложка.
+        """
+        headers = Headers(scope=scope)
+        response_headers = [
+            (b"etag", image.etag.encode()),
+            (b"last-modified", image.last_modified.encode()),
+            (b"cache-control", self.cache_control),
+            (b"accept-ranges", b"bytes"),
+        ]
+        if etag_matches(headers.get("if-none-match"), image.etag):
+            await send_empty(send, status.HTTP_304_NOT_MODIFIED, response_headers)
+            return
+
+        try:
+            byte_range = get_range(headers, image)
+        except UnsatisfiableRangeError:
+            content_range = f"bytes */{image.size}"
+            response_headers.append((b"content-range", content_range.encode()))
+            await send_empty(
+                send,
+                status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                response_headers,
+            )
+            return
+        await send_content(scope, send, image, response_headers, byte_range)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Слабое сравнение ETag для If-None-Match.
+
+    :param if_none_match: Заголовок If-None-Match.
+    :param etag: ETag обложки.
+    :return: Есть ли у клиента актуальная версия.
+    """
+    if if_none_match is None:
+        return False
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return any(tag in {"*", etag} for tag in candidates)
+
+
+def get_range(headers: Headers, image: ImageFile) -> Optional[ByteRange]:
+    """
+    Диапазон байт из заголовков Range и If-Range.
+
+    :param headers: Заголовки запроса.
+    :param image: Обложка.
+    :return: Первый и последний байт или None для полного ответа.
+    """
+    range_header = headers.get("range")
+    if range_header is None or not image.size:
+        return None
+    if_range = headers.get("if-range")
+    if if_range is not None and if_range != image.etag:
+        return None
+    return parse_range(range_header, image.size)
+
+
+def parse_range(range_header: str, size: int) -> Optional[ByteRange]:
+    """
+    Разбор заголовка Range.
+
+    Поддерживается один диапазон; несколько диапазонов и некорректный
+    заголовок дают полный ответ, как допускает RFC 9110.
+
+    :param range_header: Заголовок Range.
+    :param size: Размер файла.
+    :raises UnsatisfiableRangeError: Диапазон за пределами файла.
+    :return: Первый и последний байт или None для полного ответа.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    first, _, last = ranges.strip().partition("-")
+    if not (first + last).isdigit():
+        return None
+    if not first:
+        return suffix_range(int(last), size)
+
+    start = int(first)
+    if start >= size:
+        raise UnsatisfiableRangeError
+    end = min(int(last or size), size - 1)
+    return (start, end) if start <= end else None
+
+
+def suffix_range(length: int, size: int) -> ByteRange:
+    """
+    Диапазон из последних байт файла (bytes=-N).
+
+    :param length: Сколько последних байт запрошено.
+    :param size: Размер файла.
+    :raises UnsatisfiableRangeError: Запрошено 0 байт или файл пустой.
+    :return: Первый и последний байт.
+    """
+    if not length or not size:
+        raise UnsatisfiableRangeError
+    return max(size - length, 0), size - 1
+
+
+async def send_content(  # noqa: WPS211
+    scope: Scope,
+    send: Send,
+    image: ImageFile,
+    headers: List[Header],
+    byte_range: Optional[ByteRange],
+) -> None:
+    """
+    Отправка обложки целиком или запрошенного диапазона.
+
+    :param scope: ASGI scope.
+    :param send: ASGI send.
+    :param image: Обложка.
+    :param headers: Общие заголовки ответа.
+    :param byte_range: Диапазон байт или None для полного ответа.
+    """
+    status_code = status.HTTP_200_OK
+    start, end = 0, image.size - 1
+    if byte_range is not None:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        start, end = byte_range
+        content_range = f"bytes {start}-{end}/{image.size}"
+        headers.append((b"content-range", content_range.encode()))
+    headers.append((b"content-type", image.media_type.encode()))
+    content_length = end - start + 1
+    headers.append((b"content-length", str(content_length).encode()))
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": headers},
+    )
+    if scope["method"] == "HEAD":
+        await send({"type": "http.response.body", "body": b""})
+    elif image.body is not None:
+        await send_memory(send, image.body, start, end)
+    else:
+        await send_file(scope, send, image.path, start, end)
+
+
+async def send_empty(send: Send, status_code: int, headers: List[Header]) -> None:
+    """
+    Ответ без тела.
+
+    У 304 нет content-length: иначе кэш может заменить им длину
+    сохраненной обложки.
+
+    :param send: ASGI send.
+    :param status_code: Код ответа.
+    :param headers: Заголовки ответа.
+    """
+    if status_code != status.HTTP_304_NOT_MODIFIED:
+        headers = [*headers, (b"content-length", b"0")]
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers,
+        },
+    )
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send_memory(send: Send, body: bytes, start: int, end: int) -> None:
+    """
+    Отправка обложки из памяти.
+
+    :param send: ASGI send.
+    :param body: Тело обложки.
+    :param start: Первый байт.
+    :param end: Последний байт.
+    """
+    chunk = body
+    if end - start + 1 < len(body):
+        chunk = body[start : end + 1]
+    IMAGES_BYTES_SERVED.labels(source="memory").inc(len(chunk))
+    await send({"type": "http.response.body", "body": chunk})
+
+
+async def send_zerocopy(send: Send, path: Path, start: int, count: int) -> None:
+    """
+    Отправка части файла через расширение zerocopysend.
+
+    :param send: ASGI send.
+    :param path: Путь к файлу.
+    :param start: Первый байт.
+    :param count: Количество байт.
+    """
+    async with await anyio.open_file(path, mode="rb") as zerocopy_file:
+        await send(
+            {
+                "type": ZEROCOPY_EXTENSION,
+                "file": zerocopy_file.wrapped.fileno(),
+                "offset": start,
+                "count": count,
+            },
+        )
+
+
+async def send_file(  # noqa: WPS211
+    scope: Scope,
+    send: Send,
+    path: Path,
+    start: int,
+    end: int,
+) -> None:
+    """
+    Отправка обложки с диска.
+
+    Если сервер поддерживает расширение zerocopysend, файл отдается через
+    sendfile без копирования в память процесса, иначе читается частями.
+
+    :param scope: ASGI scope.
+    :param send: ASGI send.
+    :param path: Путь к файлу.
+    :param start: Первый байт.
+    :param end: Последний байт.
+    """
+    count = end - start + 1
+    IMAGES_BYTES_SERVED.labels(source="disk").inc(count)
+    if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+        await send_zerocopy(send, path, start, count)
+        return
+
+    async with await anyio.open_file(path, mode="rb") as image_file:
+        await image_file.seek(start)
+        while count > 0:
+            chunk = await image_file.read(min(CHUNK_SIZE, count))
+            count -= len(chunk)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": count > 0 and bool(chunk),
+                },
+            )
+            if not chunk:
+                return
@@ -0,0 +1,133 @@
+import atexit
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from typing import Any, Dict, TextIO
+
+import ujson
+from prometheus_client import Counter
+
+LOGS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Total count of log records dropped because the log queue was full",
+)
+
+# Фабрика обработчика для logging.config.dictConfig.
+QUEUE_HANDLER_FACTORY = "farpostbooks_backend.services.logs.create_queue_handler"
+
+
+class JSONFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON с ID трейса и span'а OpenTelemetry."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Форматирование записи.
+
+        :param record: Запись лога.
+        :return: Строка JSON.
+        """
+        document = {
+            "timestamp": datetime.fromtimestamp(
+                record.created,
+                timezone.utc,
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "otelTraceID", "0"),
+            "span_id": getattr(record, "otelSpanID", "0"),
+            "service_name": getattr(record, "otelServiceName", ""),
+        }
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            document["stack"] = self.formatStack(record.stack_info)
+        return ujson.dumps(document, ensure_ascii=False)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Передача записей лога в очередь без ожидания.
+
+    Запись форматируется уже в потоке QueueListener'а, поэтому запрос
+    не ждет ни форматирования, ни записи в поток вывода. Если очередь
+    полна (вывод не успевает), запись отбрасывается и учитывается
+    в log_records_dropped_total.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Подготовка записи к передаче в очередь.
+
+        :param record: Запись лога.
+        :return: Та же запись без форматирования.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Добавление записи в очередь.
+
+        :param record: Запись лога.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            LOGS_DROPPED.inc()
+
+
+class LogListener(QueueListener):
+    """Вывод записей из очереди в фоновом потоке."""
+
+    def enqueue_sentinel(self) -> None:
+        """Сигнал остановки (None) ждет места в полной очереди."""
+        self.queue.put(None)
+
+
+def create_queue_handler(stream: TextIO, queue_size: int = 10000) -> QueueHandler:
+    """
+    Обработчик, пишущий JSON в поток вывода из фонового потока.
+
+    :param stream: Поток вывода.
+    :param queue_size: Сколько записей ждут вывода, остальные отбрасываются.
+    :return: Обработчик для логгеров.
+    """
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JSONFormatter())
+    records: "Queue[logging.LogRecord]" = Queue(queue_size)
+    listener = LogListener(records, output, respect_handler_level=True)
+    listener.start()
+    # Оставшиеся в очереди записи выводятся при завершении процесса.
+    atexit.register(listener.stop)
+    return BoundedQueueHandler(records)
+
+
+def create_log_config(level: str, queue_size: int = 10000) -> Dict[str, Any]:
+    """
+    Конфигурация логирования uvicorn и приложения через очереди.
+
+    :param level: Уровень логирования.
+    :param queue_size: Размер очереди каждого обработчика.
+    :return: Конфигурация для logging.config.dictConfig.
+    """
+    handler = {"()": QUEUE_HANDLER_FACTORY, "queue_size": queue_size}
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {
+            "default": {**handler, "stream": "ext://sys.stderr"},
+            "access": {**handler, "stream": "ext://sys.stdout"},
+        },
+        "loggers": {
+            "uvicorn": {"handlers": ["default"], "level": level, "propagate": False},
+            "uvicorn.error": {"level": level},
+            "uvicorn.access": {
+                "handlers": ["access"],
+                "level": level,
+                "propagate": False,
+            },
+        },
+        "root": {"handlers": ["default"], "level": level},
+    }
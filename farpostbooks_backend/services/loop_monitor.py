@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import suppress
+from typing import Optional
+
+from prometheus_client import Counter, Histogram
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Histogram of event loop lag: how late a timer callback runs (in seconds)",
+    ["app_name"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Total count of callbacks blocking the event loop longer than the threshold",
+    ["app_name"],
+)
+
+
+class LoopMonitor:
+    """
+    Задержка event loop и поиск блокирующих его вызовов.
+
+    Задача в event loop раз в interval секунд засыпает и записывает,
+    насколько позже срока она проснулась. Фоновый поток следит за этими
+    отметками: если event loop не отвечает дольше threshold секунд,
+    в лог пишется стек потока event loop в этот момент, то есть
+    блокирующий вызов.
+    """
+
+    def __init__(
+        self,
+        app_name: str,
+        interval: float = 0.1,
+        threshold: float = 0.1,
+    ) -> None:
+        self.app_name = app_name
+        self.interval = interval
+        self.threshold = threshold
+        self._ticks = 0
+        self._tick_time = time.monotonic()
+        self._loop_thread_id = 0
+        self._stopped = threading.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Запуск из потока event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._tick_time = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self.measure())
+        threading.Thread(
+            target=self.watch,
+            name="loop-monitor",
+            daemon=True,
+        ).start()
+
+    async def stop(self) -> None:
+        """Остановка задачи и потока."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def measure(self) -> None:
+        """Измерение задержки event loop."""
+        loop = asyncio.get_running_loop()
+        lag = LOOP_LAG.labels(app_name=self.app_name)
+        while True:  # noqa: WPS457
+            expected_time = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag.observe(max(loop.time() - expected_time, 0))
+            self._ticks += 1
+            self._tick_time = time.monotonic()
+
+    def watch(self) -> None:
+        """Поиск блокировок event loop в фоновом потоке."""
+        reported = -1
+        while not self._stopped.wait(self.interval):
+            ticks = self._ticks
+            blocked = time.monotonic() - self._tick_time - self.interval
+            if ticks != reported and blocked > self.threshold:
+                reported = ticks
+                self.report(blocked)
+
+    def report(self, blocked: float) -> None:
+        """
+        Стек потока event loop в лог.
+
+        :param blocked: Сколько секунд event loop уже не отвечает.
+        """
+        LOOP_BLOCKS.labels(app_name=self.app_name).inc()
+        frame = sys._current_frames().get(self._loop_thread_id)  # noqa: WPS437
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        logging.warning(
+            f"Event loop blocked for more than {blocked:.3f} s:\n{stack}",
+        )
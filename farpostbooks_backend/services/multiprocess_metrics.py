@@ -0,0 +1,85 @@
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import List
+
+from prometheus_client import CollectorRegistry
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+
+# Переменная окружения, по которой prometheus_client при импорте
+# переключается на хранение значений метрик в файлах.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Файлы gauge, значения которых учитываются только для живых процессов.
+LIVE_GAUGE_FILE = re.compile(r"gauge_live\w+?_(\d+)\.db")
+
+
+def enable_multiprocess(directory: Path) -> None:
+    """
+    Включение сбора метрик со всех воркеров uvicorn.
+
+    Вызывается до запуска воркеров: они наследуют переменную окружения.
+    Файлы прошлого запуска удаляются, иначе счетчики продолжат старые значения.
+
+    :param directory: Папка для файлов метрик.
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    os.environ[MULTIPROC_DIR_ENV] = str(directory)
+
+
+def is_alive(pid: int) -> bool:
+    """
+    Проверка, что процесс еще существует.
+
+    :param pid: ID процесса.
+    :return: Процесс существует.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_dead_processes(directory: str) -> List[int]:
+    """
+    Удаление значений live gauge процессов, которые завершились аварийно.
+
+    Счетчики и гистограммы завершившихся процессов остаются, чтобы
+    суммы по всем воркерам не уменьшались.
+
+    :param directory: Папка с файлами метрик.
+    :return: ID завершившихся процессов.
+    """
+    pids = set()
+    for name in os.listdir(directory):
+        match = LIVE_GAUGE_FILE.fullmatch(name)
+        if match is not None:
+            pids.add(int(match.group(1)))
+    dead = sorted(pid for pid in pids if not is_alive(pid))
+    for pid in dead:
+        mark_process_dead(pid, directory)
+    return dead
+
+
+def multiprocess_registry(directory: str) -> CollectorRegistry:
+    """
+    Реестр с метриками всех воркеров, собранными из файлов.
+
+    :param directory: Папка с файлами метрик.
+    :return: Реестр для экспорта.
+    """
+    cleanup_dead_processes(directory)
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=directory)
+    return registry
+
+
+def mark_worker_dead() -> None:
+    """Удаление значений live gauge текущего воркера при остановке."""
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    if directory is not None:
+        mark_process_dead(os.getpid(), directory)
@@ -0,0 +1,282 @@
+import enum
+import itertools
+import random
+from collections import deque
+from datetime import datetime
+from typing import Deque, Iterable, List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from fastapi.security import SecurityScopes
+from pyinstrument import Profiler
+from pyinstrument.renderers import HTMLRenderer, Renderer, SpeedscopeRenderer
+from pyinstrument.session import Session
+from starlette.datastructures import QueryParams
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from farpostbooks_backend.db.dao.user_dao import UserDAO
+from farpostbooks_backend.services.access_token import get_current_user, oauth2_scheme
+
+# Параметр запроса, по которому администратор получает профиль вместо ответа.
+PROFILE_PARAM = "profile"
+
+
+class ProfileFormat(str, enum.Enum):  # noqa: WPS600
+    """Формат файла профиля."""
+
+    speedscope = "speedscope"
+    html = "html"
+
+
+class Profile(NamedTuple):
+    """Профиль одного запроса."""
+
+    id: int
+    method: str
+    path: str
+    duration: float
+    created_timestamp: datetime
+    session: Session
+
+
+class SamplingRule(NamedTuple):
+    """Маршрут, доля запросов к которому профилируется."""
+
+    method: str
+    path: str
+    route: BaseRoute
+    rate: float
+
+
+class ProfileStore:
+    """Последние профили запросов в памяти воркера и правило выборки."""
+
+    def __init__(self, max_profiles: int = 20, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.rule: Optional[SamplingRule] = None
+        self._profiles: Deque[Profile] = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+
+    def add(self, method: str, path: str, session: Session) -> Profile:
+        """
+        Сохранение профиля, самый старый вытесняется.
+
+        :param method: HTTP метод.
+        :param path: Путь запроса.
+        :param session: Результат профилировщика.
+        :return: Профиль.
+        """
+        profile = Profile(
+            id=next(self._ids),
+            method=method,
+            path=path,
+            duration=session.duration,
+            created_timestamp=datetime.utcnow(),
+            session=session,
+        )
+        self._profiles.append(profile)
+        return profile
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        """
+        Профиль по ID.
+
+        :param profile_id: ID профиля.
+        :return: Профиль или None, если он уже вытеснен.
+        """
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def get_profiles(self) -> List[Profile]:
+        """
+        Все сохраненные профили.
+
+        :return: Профили, начиная с последнего.
+        """
+        return list(reversed(self._profiles))
+
+    def should_sample(self, scope: Scope) -> bool:
+        """
+        Решение о профилировании запроса по правилу выборки.
+
+        :param scope: ASGI scope запроса.
+        :return: Запрос нужно профилировать.
+        """
+        rule = self.rule
+        if rule is None or scope["method"] != rule.method:
+            return False
+        match, _ = rule.route.matches(scope)
+        return match == Match.FULL and random.random() < rule.rate  # noqa: S311
+
+
+def find_route(routes: Iterable[BaseRoute], method: str, path: str) -> Optional[Route]:
+    """
+    Маршрут приложения по методу и шаблону пути.
+
+    :param routes: Маршруты приложения.
+    :param method: HTTP метод.
+    :param path: Шаблон пути.
+    :return: Маршрут или None, если такого нет.
+    """
+    for route in routes:
+        if isinstance(route, Route) and route.path == path:
+            if method in (route.methods or ()):
+                return route
+    return None
+
+
+def requested_format(scope: Scope) -> Optional[ProfileFormat]:
+    """
+    Формат профиля из параметров запроса.
+
+    :param scope: ASGI scope запроса.
+    :return: Формат или None, если профиль не запрошен.
+    """
+    query_string = scope["query_string"]
+    if PROFILE_PARAM.encode() not in query_string:
+        return None
+    profile_format = QueryParams(query_string).get(PROFILE_PARAM)
+    if profile_format not in ProfileFormat.__members__:
+        return None
+    return ProfileFormat(profile_format)
+
+
+def profile_response(profile: Profile, profile_format: ProfileFormat) -> Response:
+    """
+    Файл профиля для скачивания.
+
+    :param profile: Профиль запроса.
+    :param profile_format: Формат файла.
+    :return: Ответ с файлом.
+    """
+    renderer: Renderer
+    if profile_format == ProfileFormat.speedscope:
+        renderer = SpeedscopeRenderer()
+        media_type = "application/json"
+    else:
+        renderer = HTMLRenderer()
+        media_type = "text/html"
+    filename = f"profile-{profile.id}.{renderer.output_file_extension}"
+    return Response(
+        renderer.render(profile.session),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def authorize_admin(request: Request) -> Optional[Response]:
+    """
+    Проверка скоупа admin, как у эндпоинтов администратора.
+
+    :param request: Запрос.
+    :return: Ответ с ошибкой или None, если доступ есть.
+    """
+    try:
+        token = await oauth2_scheme(request)
+        await get_current_user(SecurityScopes(scopes=["admin"]), UserDAO(), token or "")
+    except HTTPException as error:
+        return JSONResponse(
+            {"detail": error.detail},
+            status_code=error.status_code,
+            headers=error.headers,
+        )
+    return None
+
+
+async def discard(message: Message) -> None:
+    """
+    Ответ эндпоинта не отправляется: вместо него отдается профиль.
+
+    :param message: Сообщение ASGI.
+    """
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware для профилирования запросов pyinstrument'ом.
+
+    Администратор получает профиль любого запроса вместо ответа,
+    добавив ?profile=speedscope или ?profile=html. Кроме того, доля
+    запросов к маршруту из правила выборки профилируется в фоне.
+    Без правила и параметра запрос не замедляется.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore) -> None:
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_format = requested_format(scope)
+        if profile_format is not None:
+            await self.send_profile(scope, receive, send, profile_format)
+        elif self.store.should_sample(scope):
+            await self.profile(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def send_profile(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        profile_format: ProfileFormat,
+    ) -> None:
+        """
+        Профиль запроса вместо ответа эндпоинта.
+
+        :param scope: ASGI scope запроса.
+        :param receive: Получение сообщений ASGI.
+        :param send: Отправка сообщений ASGI.
+        :param profile_format: Формат файла профиля.
+        """
+        error = await authorize_admin(Request(scope))
+        if error is not None:
+            await error(scope, receive, send)
+            return
+        profile = await self.profile(scope, receive, discard)
+        await profile_response(profile, profile_format)(scope, receive, send)
+
+    async def profile(self, scope: Scope, receive: Receive, send: Send) -> Profile:
+        """
+        Обработка запроса под профилировщиком.
+
+        Учитывается только время задачи этого запроса, а не других
+        запросов, выполняющихся в том же event loop.
+
+        :param scope: ASGI scope запроса.
+        :param receive: Получение сообщений ASGI.
+        :param send: Отправка сообщений ASGI.
+        :return: Сохраненный профиль.
+        """
+        profiler = Profiler(interval=self.store.interval, async_mode="enabled")
+        profiler.start()
+        try:  # noqa: WPS501
+            await self.app(scope, receive, send)
+        finally:
+            session = profiler.stop()
+        return self.store.add(scope["method"], scope["path"], session)
+
+
+def get_profile_store(request: Request) -> ProfileStore:
+    """
+    Профили запросов текущего приложения.
+
+    :param request: Запрос.
+    :return: Хранилище профилей.
+    """
+    return request.app.state.profiles  # type: ignore
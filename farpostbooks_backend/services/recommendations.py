@@ -0,0 +1,146 @@
+import asyncio
+import functools
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from farpostbooks_backend.db.dao.similar_book_dao import SimilarBookDAO
+
+
+class SimilarBooks(NamedTuple):
+    """Похожие книги: строки таблицы в виде столбцов NumPy."""
+
+    book_ids: np.ndarray
+    similar_book_ids: np.ndarray
+    scores: np.ndarray
+    ranks: np.ndarray
+
+
+def readers_matrix(
+    borrows: List[Tuple[int, int]],
+) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Разреженная матрица пользователь x книга: 1, если пользователь брал книгу.
+
+    :param borrows: Пары Telegram ID и ISBN.
+    :return: Матрица и ISBN книг по номерам столбцов.
+    """
+    pairs = np.array(borrows, dtype=np.int64).reshape(-1, 2)
+    users, user_index = np.unique(pairs[:, 0], return_inverse=True)
+    books, book_index = np.unique(pairs[:, 1], return_inverse=True)
+    cells = (user_index, book_index)
+    readers = sparse.csr_matrix(  # noqa: WPS317
+        (np.ones(len(pairs), dtype=np.float32), cells),
+        shape=(len(users), len(books)),
+    )
+    # Повторные взятия одной книги складываются, читатель учитывается один раз.
+    readers.data = np.ones_like(readers.data)
+    return readers, books
+
+
+def cosine_similarity(
+    readers: sparse.csr_matrix,
+    min_common: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Близость пар книг, у которых есть общие читатели.
+
+    Произведение матрицы читателей на себя дает число общих читателей,
+    оно делится на среднее геометрическое числа читателей обеих книг.
+
+    :param readers: Матрица пользователь x книга.
+    :param min_common: Минимум общих читателей.
+    :return: Номера книг, номера похожих книг и близость.
+    """
+    readers_count = np.asarray(readers.sum(axis=0)).ravel()
+    common = (readers.T @ readers).tocoo()
+    keep = np.logical_and(common.row != common.col, common.data >= min_common)
+    rows = common.row[keep]
+    cols = common.col[keep]
+    norms = np.sqrt(readers_count[rows] * readers_count[cols])
+    return rows, cols, common.data[keep] / norms
+
+
+def top_similar(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    scores: np.ndarray,
+    top_k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Самые близкие книги для каждой книги.
+
+    Пары сортируются по книге и убыванию близости, место внутри книги -
+    позиция пары минус позиция первой пары этой книги.
+
+    :param rows: Номера книг.
+    :param cols: Номера похожих книг.
+    :param scores: Близость.
+    :param top_k: Сколько похожих книг остается для каждой книги.
+    :return: Индексы оставшихся пар и их места.
+    """
+    order = np.lexsort((cols, -scores, rows))
+    sorted_rows = rows[order]
+    ranks = np.arange(len(order)) - np.searchsorted(sorted_rows, sorted_rows)
+    in_top = ranks < top_k
+    return order[in_top], ranks[in_top]
+
+
+def compute_similar_books(
+    borrows: List[Tuple[int, int]],
+    top_k: int,
+    min_common: int = 1,
+) -> SimilarBooks:
+    """
+    Похожие книги по общим читателям.
+
+    Все шаги - операции над массивами NumPy/SciPy без циклов по книгам.
+
+    :param borrows: Пары Telegram ID и ISBN.
+    :param top_k: Сколько похожих книг сохраняется для каждой книги.
+    :param min_common: Минимум общих читателей для похожих книг.
+    :return: Похожие книги, отсортированные по книге и месту.
+    """
+    readers, books = readers_matrix(borrows)
+    rows, cols, scores = cosine_similarity(readers, min_common)
+    top, ranks = top_similar(rows, cols, scores, top_k)
+    return SimilarBooks(
+        book_ids=books[rows[top]],
+        similar_book_ids=books[cols[top]],
+        scores=scores[top],
+        ranks=ranks,
+    )
+
+
+async def refresh_similar_books(
+    top_k: int,
+    min_common: int = 1,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Пересчет таблицы похожих книг по всей истории взятия книг.
+
+    Расчет выполняется в пуле потоков, чтобы не блокировать event loop.
+
+    :param top_k: Сколько похожих книг сохраняется для каждой книги.
+    :param min_common: Минимум общих читателей для похожих книг.
+    :param batch_size: Сколько строк добавляется в БД одним запросом.
+    :return: Количество сохраненных пар книг.
+    """
+    borrows = await SimilarBookDAO.get_borrows()
+    loop = asyncio.get_running_loop()
+    similar = await loop.run_in_executor(
+        None,
+        functools.partial(compute_similar_books, borrows, top_k, min_common),
+    )
+    await SimilarBookDAO.replace_similar_books(
+        zip(
+            similar.book_ids.tolist(),
+            similar.similar_book_ids.tolist(),
+            similar.scores.tolist(),
+            similar.ranks.tolist(),
+        ),
+        batch_size,
+    )
+    return len(similar.scores)
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from tortoise import timezone
+
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.db.models.userbook_model import UserBookModel
+from farpostbooks_backend.services.broadcast import Broadcaster, BroadcastResult
+
+
+def reminder_text(user_book: UserBookModel, loan_period: timedelta) -> str:
+    """
+    Текст напоминания о возврате книги.
+
+    :param user_book: Взятие книги вместе с книгой.
+    :param loan_period: Срок, на который выдается книга.
+    :return: Текст сообщения.
+    """
+    book = user_book.book
+    overdue = timezone.now() - user_book.get_timestamp - loan_period
+    days = max(overdue.days, 1)
+    return (
+        "<b>📕 Пора вернуть книгу</b>\n"
+        f"<b>{book.name}</b> (ISBN: <code>{book.id}</code>) просрочена на {days} дн."
+    )
+
+
+async def remind_overdue_loans(
+    broadcaster: Broadcaster,
+    loan_period: timedelta,
+    cooldown: timedelta,
+    batch_size: int = 100,
+) -> BroadcastResult:
+    """
+    Напоминания о возврате просроченных книг.
+
+    Время напоминания записывается до отправки, поэтому даже при
+    перезапуске задачи об одной книге напоминают не чаще раза в cooldown.
+
+    :param broadcaster: Рассыльщик.
+    :param loan_period: Срок, на который выдается книга.
+    :param cooldown: Минимальный интервал между напоминаниями об одной книге.
+    :param batch_size: Сколько книг читается и отправляется за раз.
+    :return: Количество доставленных и недоставленных напоминаний.
+    """
+    now: datetime = timezone.now()
+    sent = 0
+    failed = 0
+    while True:
+        user_books = await UserBookDAO.get_overdue_loans(
+            taken_before=now - loan_period,
+            reminded_before=now - cooldown,
+            limit=batch_size,
+        )
+        if not user_books:
+            break
+        await UserBookDAO.mark_reminded([user_book.id for user_book in user_books], now)
+        result = await broadcaster.send_many(
+            (user_book.user_id, reminder_text(user_book, loan_period))
+            for user_book in user_books
+        )
+        sent += result.sent
+        failed += result.failed
+    return BroadcastResult(sent=sent, failed=failed)
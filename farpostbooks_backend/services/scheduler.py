@@ -1,71 +1,88 @@
-import asyncio
 import logging
+from datetime import datetime, timedelta
+from logging.config import dictConfig
 from typing import Any, Dict
 
-from aiogram import Bot, exceptions
+from aiogram import Bot
 from aiogram.enums import ParseMode
 from arq import cron
 from arq.connections import RedisSettings
+from prometheus_client import start_http_server
 from tortoise import Tortoise
 
 from farpostbooks_backend.db.config import TORTOISE_CONFIG
 from farpostbooks_backend.db.dao.book_dao import BookDAO
-from farpostbooks_backend.db.dao.user_dao import UserDAO
+from farpostbooks_backend.services.broadcast import Broadcaster
+from farpostbooks_backend.services.campaign import run_campaign
+from farpostbooks_backend.services.db_metrics import instrument_tortoise
+from farpostbooks_backend.services.digest import build_digest
+from farpostbooks_backend.services.flood_control import RedisFloodControl
+from farpostbooks_backend.services.logs import create_log_config
+from farpostbooks_backend.services.loop_monitor import LoopMonitor
+from farpostbooks_backend.services.recommendations import refresh_similar_books
+from farpostbooks_backend.services.reminders import remind_overdue_loans
+from farpostbooks_backend.services.utils import create_tracer_provider
+from farpostbooks_backend.services.worker_metrics import observe_job
 from farpostbooks_backend.settings import settings
 
 
-async def send_message(
-    bot: Bot,
-    chat_id: int,
-    text: str,
-) -> bool:
+@observe_job
+async def new_books(ctx: Dict[str, Any]) -> None:  # pragma: no cover
     """
-    Отправка сообщения пользователю в Telegram.
+    Рассылка в Telegram о добавлении новых книг.
 
-    :param bot: Инстанс бота.
-    :param chat_id: ID пользователя, которому будет доставлено сообщение.
-    :param text: Текст для отправки.
-    :return: Удалось ли отправить сообщение.
+    Рассылка одна на неделю: перезапущенная задача продолжает ее.
+    Читатели видят новые книги в порядке интереса по своей истории.
+
+    :param ctx: Данные воркера.
     """
-    try:
-        await bot.send_message(chat_id=chat_id, text=text)
-    except (exceptions.TelegramBadRequest, exceptions.TelegramForbiddenError):
-        logging.error(f"Target [ID:{chat_id}]: got TelegramError")
-    except exceptions.TelegramRetryAfter as error:
-        logging.error(
-            f"Target [ID:{chat_id}]: Flood limit is exceeded."
-            f" Sleep {error.retry_after} seconds.",
-        )
-        await asyncio.sleep(error.retry_after)
-        return await send_message(bot, chat_id, text)
-    except exceptions.TelegramAPIError:
-        logging.exception(f"Target [ID:{chat_id}]: failed")
-    else:
-        logging.info(f"Target [ID:{chat_id}]: success")
-        return True
-    return False
+    broadcaster: Broadcaster = ctx["broadcaster"]
 
+    books = await BookDAO().get_new_books()
+    digest = await build_digest(books, settings.digest_max_books)
+    personal_count = len(digest.texts)
+    logging.info(f"Personal digests: {personal_count}")
+
+    result = await run_campaign(
+        broadcaster,
+        key=datetime.utcnow().strftime("new_books:%G-W%V"),
+        text=digest.text,
+        chunk_size=settings.broadcast_chunk_size,
+        batch_size=settings.broadcast_batch_size,
+        texts=digest.texts,
+    )
+    logging.info(f"Messages sent: {result.sent}, failed: {result.failed}")
 
-async def new_books(ctx: Dict[str, Any]) -> None:  # pragma: no cover
+
+@observe_job
+async def overdue_loans(ctx: Dict[str, Any]) -> None:  # pragma: no cover
     """
-    Рассылка в Telegram о добавлении новых книг.
+    Напоминания в Telegram о возврате просроченных книг.
 
     :param ctx: Данные воркера.
     """
-    bot: Bot = ctx["bot"]
+    result = await remind_overdue_loans(
+        ctx["broadcaster"],
+        loan_period=timedelta(days=settings.loan_period_days),
+        cooldown=timedelta(days=settings.overdue_reminder_cooldown_days),
+        batch_size=settings.overdue_reminder_batch_size,
+    )
+    logging.info(f"Reminders sent: {result.sent}, failed: {result.failed}")
 
-    books = await BookDAO().get_new_books()
-    books_raw = "<b>📚 Добавлены новые книги:</b>"
-    for book in books:
-        books_raw = f"{books_raw}\n<b>- {book.name}</b> (ISBN: <code>{book.id}</code>)"
 
-    users = await UserDAO().get_users()
-    count = 0
-    for user in users:
-        if await send_message(bot=bot, chat_id=user.id, text=books_raw):
-            count += 1
-        await asyncio.sleep(settings.broadcast_sleep)
-    logging.info(f"Messages sent: {count}")
+@observe_job
+async def similar_books(ctx: Dict[str, Any]) -> None:  # pragma: no cover
+    """
+    Пересчет похожих книг по истории взятия книг.
+
+    :param ctx: Данные воркера.
+    """
+    count = await refresh_similar_books(
+        top_k=settings.similar_books_top_k,
+        min_common=settings.similar_books_min_common,
+        batch_size=settings.similar_books_batch_size,
+    )
+    logging.info(f"Similar books saved: {count}")
 
 
 async def startup(ctx: Dict[str, Any]) -> None:
@@ -74,22 +91,48 @@ async def startup(ctx: Dict[str, Any]) -> None:
 
     :param ctx: Данные воркера.
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s [%(name)s] [%(filename)s:"  # noqa: WPS323
-        "%(lineno)d] - %(message)s",  # noqa: WPS323
+    dictConfig(
+        create_log_config(settings.log_level.value, settings.log_queue_size),
     )
+    # Метрики воркера отдаются отдельным HTTP сервером в фоновом потоке.
+    start_http_server(settings.worker_metrics_port)
+    create_tracer_provider(f"{settings.environment}-worker", settings)
+    instrument_tortoise()
+    ctx["loop_monitor"] = LoopMonitor(
+        f"{settings.environment}-worker",
+        interval=settings.loop_monitor_interval,
+        threshold=settings.loop_block_threshold,
+    )
+    ctx["loop_monitor"].start()
     ctx["bot"] = Bot(
         token=settings.bot_token,
         parse_mode=ParseMode.HTML,
     )
+    ctx["broadcaster"] = Broadcaster(
+        ctx["bot"],
+        global_limit=settings.broadcast_limit,
+        chat_limit=settings.broadcast_chat_limit,
+        max_in_flight=settings.broadcast_max_in_flight,
+        max_retries=settings.broadcast_max_retries,
+        flood_control=RedisFloodControl(ctx["redis"]),
+    )
     await Tortoise.init(TORTOISE_CONFIG)
 
 
+async def shutdown(ctx: Dict[str, Any]) -> None:
+    """
+    Действия при остановке воркера.
+
+    :param ctx: Данные воркера.
+    """
+    await ctx["loop_monitor"].stop()
+
+
 class WorkerSettings:
     """Настройки воркера."""
 
     on_startup = startup
+    on_shutdown = shutdown
     cron_jobs = [
         cron(
             "farpostbooks_backend.services.scheduler.new_books",
@@ -98,5 +141,17 @@ class WorkerSettings:
             minute=0,
             run_at_startup=False,
         ),
+        cron(
+            "farpostbooks_backend.services.scheduler.overdue_loans",
+            hour=settings.overdue_reminder_hour,
+            minute=0,
+            run_at_startup=False,
+        ),
+        cron(
+            "farpostbooks_backend.services.scheduler.similar_books",
+            hour=settings.similar_books_hour,
+            minute=0,
+            run_at_startup=False,
+        ),
     ]
     redis_settings = RedisSettings(settings.redis_host, settings.redis_port)
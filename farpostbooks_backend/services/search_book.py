@@ -2,8 +2,8 @@ from typing import Any, Dict, Optional
 
 import aiofiles
 import httpx
-from opentelemetry.propagate import inject
 
+from farpostbooks_backend.services.server_timing import timed
 from farpostbooks_backend.settings import settings
 from farpostbooks_backend.web.api.schema import BookModelDTO
 
@@ -62,10 +62,9 @@ async def search_google_books(isbn: int) -> Optional[BookModelDTO]:
     :param isbn: ISBN искомой книги.
     :return: Pydantic модель с данными о книге, если она найдена.
     """
-    headers: Dict[str, Any] = {}
-    inject(headers)
-    async with httpx.AsyncClient(headers=headers) as client:
-        books = await get_books(client, isbn)
+    async with httpx.AsyncClient() as client:
+        with timed("upstream"):
+            books = await get_books(client, isbn)
         if not books["totalItems"]:
             return None
 
@@ -75,7 +74,8 @@ async def search_google_books(isbn: int) -> Optional[BookModelDTO]:
         else:
             publish = book["publishedDate"]
 
-        thumbnail = await save_thumbnail(client, isbn, book)
+        with timed("upstream"):
+            thumbnail = await save_thumbnail(client, isbn, book)
 
     return BookModelDTO(
         id=isbn,
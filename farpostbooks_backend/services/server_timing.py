@@ -0,0 +1,201 @@
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from fastapi.responses import UJSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from farpostbooks_backend.services.db_metrics import count_queries
+
+Endpoint = Callable[..., Any]
+
+
+class ServerTiming:
+    """Время этапов обработки одного запроса в секундах."""
+
+    def __init__(self) -> None:
+        self.start_time = time.perf_counter()
+        self.endpoint_time: Optional[float] = None
+        self.durations: Dict[str, float] = {}
+
+    def add(self, phase: str, duration: float) -> None:
+        """
+        Учет времени этапа, повторные вызовы суммируются.
+
+        :param phase: Название этапа.
+        :param duration: Время в секундах.
+        """
+        self.durations[phase] = self.durations.get(phase, 0) + duration
+
+    def header(self) -> str:
+        """
+        Значение заголовка Server-Timing.
+
+        :return: Этапы с временем в миллисекундах.
+        """
+        metrics = []
+        for phase, duration in self.durations.items():
+            milliseconds = duration * 1000
+            metrics.append(f"{phase};dur={milliseconds:.1f}")
+        return ", ".join(metrics)
+
+
+CURRENT_TIMING: ContextVar[Optional[ServerTiming]] = ContextVar(
+    "server_timing",
+    default=None,
+)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Учет времени блока в заголовке Server-Timing текущего запроса.
+
+    Без ServerTimingMiddleware блок выполняется без измерений.
+
+    :param phase: Название этапа.
+    :yield: Ничего.
+    """
+    timing = CURRENT_TIMING.get()
+    if timing is None:
+        yield
+        return
+    before_time = time.perf_counter()
+    try:  # noqa: WPS501
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - before_time)
+
+
+def endpoint_done() -> None:
+    """Отметка завершения эндпоинта: дальше идет сериализация ответа."""
+    timing = CURRENT_TIMING.get()
+    if timing is not None:
+        timing.endpoint_time = time.perf_counter()
+
+
+def timed_endpoint(endpoint: Endpoint) -> Endpoint:
+    """
+    Обертка эндпоинта, отмечающая его завершение.
+
+    Синхронный эндпоинт остается синхронным, чтобы FastAPI
+    по-прежнему выполнял его в пуле потоков.
+
+    :param endpoint: Функция эндпоинта.
+    :return: Эндпоинт с отметкой завершения.
+    """
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+            try:  # noqa: WPS501
+                return await endpoint(*args, **kwargs)
+            finally:
+                endpoint_done()
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+        try:  # noqa: WPS501
+            return endpoint(*args, **kwargs)
+        finally:
+            endpoint_done()
+
+    return wrapper
+
+
+class TimedUJSONResponse(UJSONResponse):
+    """UJSONResponse, кодирование JSON которого учитывается в этапе serialization."""
+
+    def render(self, content: Any) -> bytes:
+        """
+        Кодирование ответа в JSON.
+
+        :param content: Данные ответа.
+        :return: Тело ответа.
+        """
+        with timed("serialization"):
+            return super().render(content)
+
+
+def time_endpoints(routes: Iterable[BaseRoute]) -> None:
+    """
+    Отметка завершения эндпоинтов приложения.
+
+    Обработчик маршрута FastAPI вызывает функцию из dependant при каждом
+    запросе, поэтому ее можно заменить после создания маршрута.
+
+    :param routes: Маршруты приложения.
+    """
+    for route in routes:
+        if isinstance(route, APIRoute) and route.dependant.call is not None:
+            route.dependant.call = timed_endpoint(route.dependant.call)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware, добавляющее заголовок Server-Timing.
+
+    В заголовке время этапов запроса: auth (get_current_user),
+    db (все SQL запросы), upstream (запросы к Google Books),
+    serialization (сериализаторы и кодирование JSON внутри эндпоинта,
+    а также время от завершения эндпоинта до начала ответа) и total.
+    Этапы могут пересекаться: запрос пользователя в auth учтен и в db.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Optional[List[str]] = None) -> None:
+        self.app = app
+        # Браузер отдает Server-Timing другому origin'у только с этим заголовком.
+        self.allow_origins = ", ".join(allow_origins or [])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+
+        async def send_wrapper(message: Message) -> None:  # noqa: WPS430
+            if message["type"] == "http.response.start":
+                self.add_header(message, timing, queries.duration)
+            await send(message)
+
+        token = CURRENT_TIMING.set(timing)
+        try:  # noqa: WPS501
+            with count_queries() as queries:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            CURRENT_TIMING.reset(token)
+
+    def add_header(self, message: Message, timing: ServerTiming, db: float) -> None:
+        """
+        Заголовки с временем этапов в начале ответа.
+
+        :param message: Сообщение http.response.start.
+        :param timing: Время этапов запроса.
+        :param db: Суммарное время SQL запросов.
+        """
+        response_time = time.perf_counter()
+        if db:
+            timing.add("db", db)
+        if timing.endpoint_time is not None:
+            timing.add("serialization", response_time - timing.endpoint_time)
+        timing.add("total", response_time - timing.start_time)
+        headers = MutableHeaders(scope=message)
+        headers.append("Server-Timing", timing.header())
+        if self.allow_origins:
+            headers.append("Timing-Allow-Origin", self.allow_origins)
@@ -0,0 +1,336 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+from opentelemetry.attributes import BoundedAttributes  # type: ignore
+from opentelemetry.context import Context
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.sdk.util import BoundedList
+from opentelemetry.trace import (
+    Link,
+    SpanContext,
+    SpanKind,
+    StatusCode,
+    TraceFlags,
+    get_current_span,
+)
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+from prometheus_client import Counter
+
+from farpostbooks_backend.settings import Settings
+
+TRACES = Counter(
+    "otel_traces_total",
+    "Total count of finished local traces by sampling decision",
+    ["decision"],
+)
+SPANS_DROPPED = Counter(
+    "otel_spans_dropped_total",
+    "Total count of spans dropped before export by reason",
+    ["reason"],
+)
+
+# Решения по трейсу: выбран заранее, сохранен из-за ошибки или
+# длительности, отброшен.
+SAMPLED = "sampled"
+ERROR = "error"
+SLOW = "slow"
+DROPPED = "dropped"
+# Сколько span'ов одного несохраненного трейса ждут корневой span.
+MAX_TRACE_SPANS = 512
+NANOSECONDS = 1e9
+
+
+def parent_trace_state(parent_context: Optional[Context]) -> TraceState:
+    """
+    Состояние трейса родителя.
+
+    :param parent_context: Контекст родителя.
+    :return: Состояние трейса.
+    """
+    return get_current_span(parent_context).get_span_context().trace_state
+
+
+class RecordOnlySampler(Sampler):
+    """Span записывается, но не экспортируется без решения после завершения."""
+
+    def should_sample(  # noqa: WPS211
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        """
+        Решение о записи span'а.
+
+        :param parent_context: Контекст родителя.
+        :param trace_id: ID трейса.
+        :param name: Название span'а.
+        :param kind: Тип span'а.
+        :param attributes: Атрибуты span'а.
+        :param links: Ссылки на другие span'ы.
+        :param trace_state: Состояние трейса.
+        :return: Только запись.
+        """
+        return SamplingResult(
+            Decision.RECORD_ONLY,
+            attributes,
+            parent_trace_state(parent_context),
+        )
+
+    def get_description(self) -> str:
+        """
+        Описание семплера.
+
+        :return: Название.
+        """
+        return "RecordOnlySampler"
+
+
+class RatioSampler(TraceIdRatioBased):
+    """Доля трейсов по ID, остальные только записываются."""
+
+    def should_sample(  # noqa: WPS211
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        """
+        Решение о записи и экспорте span'а.
+
+        :param parent_context: Контекст родителя.
+        :param trace_id: ID трейса.
+        :param name: Название span'а.
+        :param kind: Тип span'а.
+        :param attributes: Атрибуты span'а.
+        :param links: Ссылки на другие span'ы.
+        :param trace_state: Состояние трейса.
+        :return: Экспорт для доли трейсов, иначе только запись.
+        """
+        if trace_id & self.TRACE_ID_LIMIT < self.bound:
+            decision = Decision.RECORD_AND_SAMPLE
+        else:
+            decision = Decision.RECORD_ONLY
+        return SamplingResult(decision, attributes, parent_trace_state(parent_context))
+
+
+def is_local_root(span: ReadableSpan) -> bool:
+    """
+    Проверка, что span корневой в этом процессе.
+
+    :param span: Завершенный span.
+    :return: У span'а нет родителя или родитель в другом сервисе.
+    """
+    return span.parent is None or span.parent.is_remote
+
+
+def duration(span: ReadableSpan) -> float:
+    """
+    Длительность span'а.
+
+    :param span: Завершенный span.
+    :return: Длительность в секундах.
+    """
+    return ((span.end_time or 0) - (span.start_time or 0)) / NANOSECONDS
+
+
+def sampled_copy(span: ReadableSpan) -> ReadableSpan:
+    """
+    Копия span'а, помеченная для экспорта.
+
+    :param span: Завершенный span.
+    :return: Span с флагом sampled.
+    """
+    context = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(
+            trace_id=context.trace_id,
+            span_id=context.span_id,
+            is_remote=context.is_remote,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+            trace_state=context.trace_state,
+        ),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=BoundedAttributes(attributes=span.attributes),
+        events=BoundedList.from_seq(len(span.events), span.events),
+        links=BoundedList.from_seq(len(span.links), span.links),
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """
+    Экспорт выбранных трейсов, трейсов с ошибками и медленных трейсов.
+
+    Span'ы невыбранного трейса ждут завершения корневого span'а процесса,
+    после чего трейс экспортируется целиком, если в нем есть ошибка или
+    корневой span дольше порога. Ожидающих трейсов не больше max_pending,
+    самые старые отбрасываются.
+    """
+
+    def __init__(
+        self,
+        processor: BatchSpanProcessor,
+        slow_threshold: float,
+        max_pending: int = 1000,
+    ) -> None:
+        self.processor = processor
+        self.slow_threshold = slow_threshold
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(
+        self,
+        span: Span,
+        parent_context: Optional[Context] = None,
+    ) -> None:
+        """
+        Начало span'а.
+
+        :param span: Начатый span.
+        :param parent_context: Контекст родителя.
+        """
+        self.processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        """
+        Завершение span'а: экспорт или ожидание корневого span'а.
+
+        :param span: Завершенный span.
+        """
+        if span.context.trace_flags.sampled:
+            if is_local_root(span):
+                TRACES.labels(decision=SAMPLED).inc()
+            self.export(span)
+            return
+
+        spans = self.collect(span)
+        if spans is None:
+            return
+        decision = self.decide(span, spans)
+        TRACES.labels(decision=decision).inc()
+        if decision != DROPPED:
+            for pending in spans:
+                self.export(sampled_copy(pending))
+
+    def collect(self, span: ReadableSpan) -> Optional[List[ReadableSpan]]:
+        """
+        Накопление span'ов невыбранного трейса.
+
+        :param span: Завершенный span.
+        :return: Все span'ы трейса, если завершился корневой span.
+        """
+        trace_id = span.context.trace_id
+        with self._lock:
+            spans = self._pending.pop(trace_id, [])
+            if len(spans) < MAX_TRACE_SPANS:
+                spans.append(span)
+            if is_local_root(span):
+                return spans
+            self._pending[trace_id] = spans
+            if len(self._pending) > self.max_pending:
+                _, evicted = self._pending.popitem(last=False)
+                SPANS_DROPPED.labels(reason="pending_full").inc(len(evicted))
+        return None
+
+    def decide(self, root: ReadableSpan, spans: List[ReadableSpan]) -> str:
+        """
+        Решение по невыбранному трейсу.
+
+        :param root: Корневой span.
+        :param spans: Все span'ы трейса.
+        :return: Решение.
+        """
+        if any(span.status.status_code == StatusCode.ERROR for span in spans):
+            return ERROR
+        if duration(root) >= self.slow_threshold:
+            return SLOW
+        return DROPPED
+
+    def export(self, span: ReadableSpan) -> None:
+        """
+        Передача span'а в очередь экспорта.
+
+        Из полной очереди вытесняется самый старый span.
+
+        :param span: Span с флагом sampled.
+        """
+        if len(self.processor.queue) >= self.processor.max_queue_size:
+            SPANS_DROPPED.labels(reason="queue_full").inc()
+        self.processor.on_end(span)
+
+    def shutdown(self) -> None:
+        """Остановка экспорта."""
+        self.processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """
+        Экспорт накопленных span'ов.
+
+        :param timeout_millis: Время ожидания.
+        :return: Экспорт завершен.
+        """
+        return self.processor.force_flush(timeout_millis)
+
+
+def create_sampler(settings: Settings) -> Sampler:
+    """
+    Семплер трейсов по настройкам.
+
+    Решение родителя имеет приоритет, невыбранные трейсы только
+    записываются, чтобы сохранить их при ошибке или задержке.
+
+    :param settings: Настройки приложения.
+    :return: Семплер.
+    """
+    record_only = RecordOnlySampler()
+    return ParentBased(
+        root=RatioSampler(settings.otlp_sample_ratio),
+        remote_parent_not_sampled=record_only,
+        local_parent_not_sampled=record_only,
+    )
+
+
+def create_span_processor(settings: Settings) -> TailSamplingProcessor:
+    """
+    Экспорт span'ов в OTLP по настройкам.
+
+    :param settings: Настройки приложения.
+    :return: Обработчик span'ов.
+    """
+    return TailSamplingProcessor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(endpoint=settings.OTLP_GRPC_ENDPOINT),
+            max_queue_size=settings.otlp_max_queue_size,
+            max_export_batch_size=settings.otlp_max_export_batch_size,
+            schedule_delay_millis=settings.otlp_schedule_delay,
+        ),
+        slow_threshold=settings.otlp_slow_threshold,
+        max_pending=settings.otlp_max_pending_traces,
+    )
@@ -1,31 +1,46 @@
 import logging
+import os
 import time
-from typing import Tuple
+from typing import Any, Dict, Iterable, Optional
 
 from fastapi import FastAPI
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.instrumentation.logging import LoggingInstrumentor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from prometheus_client import REGISTRY, Counter, Gauge, Histogram
 from prometheus_client.openmetrics.exposition import (
     CONTENT_TYPE_LATEST,
     generate_latest,
 )
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.routing import Match
+from starlette.routing import BaseRoute, Mount
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from farpostbooks_backend.services.db_metrics import (
+    QueryBudget,
+    QueryStats,
+    count_queries,
+)
+from farpostbooks_backend.services.multiprocess_metrics import (
+    MULTIPROC_DIR_ENV,
+    multiprocess_registry,
+)
+from farpostbooks_backend.services.tracing import create_sampler, create_span_processor
+from farpostbooks_backend.settings import Settings
+
+# Аргументы записи access лога uvicorn.
+ACCESS_LOG_ARGS = 5
 
 INFO = Gauge(
     "fastapi_app_info",
     "FastAPI application information.",
     ["app_name"],
+    multiprocess_mode="livemax",
 )
 REQUESTS = Counter(
     "fastapi_requests_total",
@@ -51,11 +66,17 @@ REQUESTS_IN_PROGRESS = Gauge(
     "fastapi_requests_in_progress",
     "Gauge of requests by method and path currently being processed",
     ["method", "path", "app_name"],
+    multiprocess_mode="livesum",
 )
 
 
 class EndpointFilter(logging.Filter):
-    """Фильтр для логирования uvicorn эндпоинтов."""
+    """
+    Фильтр для логирования uvicorn эндпоинтов.
+
+    Запись access лога uvicorn проверяется по аргументам (адрес, метод,
+    путь, версия HTTP, статус) без форматирования сообщения.
+    """
 
     def filter(self, record: logging.LogRecord) -> bool:
         """
@@ -64,123 +85,272 @@ class EndpointFilter(logging.Filter):
         :param record: Регистрируемое событие.
         :return: Отключение фильтра.
         """
-        return record.getMessage().find("GET /metrics") == -1
+        args = record.args
+        if not isinstance(args, tuple) or len(args) < ACCESS_LOG_ARGS:
+            return True
+        path = str(args[2]).partition("?")[0]
+        return args[1] != "GET" or path != "/metrics"
 
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    """Middleware для метрик prometheus'а."""
+class PrometheusMiddleware:
+    """
+    ASGI middleware для метрик prometheus'а.
 
-    def __init__(self, app: ASGIApp, app_name: str = "fastapi-app") -> None:
-        super().__init__(app)
+    Шаблон пути берется после маршрутизации: Router записывает в scope
+    endpoint найденного маршрута, а шаблон находится по словарю
+    endpoint → путь. Словарь ограничен числом маршрутов, поэтому запросы
+    не перебирают маршруты повторно. Запросы в обработке считаются
+    с начала ответа, когда шаблон уже известен. Запросы, не дошедшие
+    до маршрута (404, отказ AdmissionMiddleware), в метрики не попадают.
+    Также считаются SQL запросы: сверх бюджета маршрута (query_budgets
+    по шаблону пути или query_budget) пишется предупреждение с SQL.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        app_name: str = "fastapi-app",
+        query_budget: Optional[int] = None,
+        query_budgets: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.app = app
         self.app_name = app_name
+        self.query_budget = QueryBudget(app_name, query_budget, query_budgets)
+        self._paths: Dict[Any, Optional[str]] = {}
         INFO.labels(app_name=self.app_name).inc()
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as queries:
+            await self.dispatch(scope, receive, send, queries)
+
     async def dispatch(
         self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        method = request.method
-        path, is_handled_path = self.get_path(request)
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        queries: QueryStats,
+    ) -> None:
+        """
+        Обработка запроса с записью метрик запросов, ответов и исключений.
 
-        if not is_handled_path:
-            return await call_next(request)
+        :param scope: ASGI scope.
+        :param receive: ASGI receive.
+        :param send: ASGI send.
+        :param queries: SQL запросы, выполненные при обработке.
+        :raises BaseException: Исключение приложения после учета в метриках.
+        """
+        method = scope["method"]
+        status_codes = [HTTP_500_INTERNAL_SERVER_ERROR]
+        route = RequestRoute(self, scope)
+
+        async def send_wrapper(message: Message) -> None:  # noqa: WPS430
+            if message["type"] == "http.response.start":
+                status_codes.append(message["status"])
+                route.resolve()
+            await send(message)
 
-        REQUESTS_IN_PROGRESS.labels(
-            method=method,
-            path=path,
-            app_name=self.app_name,
-        ).inc()
-        REQUESTS.labels(method=method, path=path, app_name=self.app_name).inc()
         before_time = time.perf_counter()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except BaseException as error:
-            status_code = HTTP_500_INTERNAL_SERVER_ERROR
-            EXCEPTIONS.labels(
-                method=method,
-                path=path,
-                exception_type=type(error).__name__,
-                app_name=self.app_name,
-            ).inc()
+            status_codes.append(HTTP_500_INTERNAL_SERVER_ERROR)
+            self.observe_exception(method, route.resolve(), error)
             raise error from None
         else:
-            status_code = response.status_code
             after_time = time.perf_counter()
-            span = trace.get_current_span()
-            trace_id = trace.format_trace_id(
-                span.get_span_context().trace_id,
-            )
-
-            REQUESTS_PROCESSING_TIME.labels(
-                method=method,
-                path=path,
-                app_name=self.app_name,
-            ).observe(
-                after_time - before_time,
-                exemplar={"TraceID": trace_id},
-            )
+            self.observe_time(method, route.resolve(), after_time - before_time)
         finally:
-            RESPONSES.labels(
-                method=method,
-                path=path,
-                status_code=status_code,
-                app_name=self.app_name,
-            ).inc()
-            REQUESTS_IN_PROGRESS.labels(
-                method=method,
-                path=path,
-                app_name=self.app_name,
-            ).dec()
+            self.finish_request(method, route.resolve(), status_codes[-1], queries)
+
+    def start_request(self, method: str, path: Optional[str]) -> None:
+        """
+        Учет начала обработки запроса.
+
+        :param method: HTTP метод.
+        :param path: Шаблон пути или None для запроса без маршрута.
+        """
+        if path is None:
+            return
+        labels = {"method": method, "path": path, "app_name": self.app_name}
+        REQUESTS_IN_PROGRESS.labels(**labels).inc()
+        REQUESTS.labels(**labels).inc()
+
+    def finish_request(
+        self,
+        method: str,
+        path: Optional[str],
+        status_code: int,
+        queries: QueryStats,
+    ) -> None:
+        """
+        Учет ответа, SQL запросов и завершения обработки запроса.
+
+        :param method: HTTP метод.
+        :param path: Шаблон пути или None для запроса без маршрута.
+        :param status_code: HTTP статус ответа.
+        :param queries: SQL запросы, выполненные при обработке.
+        """
+        if path is None:
+            return
+        labels = {"method": method, "path": path, "app_name": self.app_name}
+        RESPONSES.labels(status_code=status_code, **labels).inc()
+        REQUESTS_IN_PROGRESS.labels(**labels).dec()
+        self.query_budget.observe(method, path, queries)
+
+    def observe_exception(
+        self,
+        method: str,
+        path: Optional[str],
+        error: BaseException,
+    ) -> None:
+        """
+        Учет исключения приложения.
 
-        return response
+        :param method: HTTP метод.
+        :param path: Шаблон пути или None для запроса без маршрута.
+        :param error: Исключение.
+        """
+        if path is None:
+            return
+        EXCEPTIONS.labels(
+            method=method,
+            path=path,
+            exception_type=type(error).__name__,
+            app_name=self.app_name,
+        ).inc()
 
-    @staticmethod
-    def get_path(request: Request) -> Tuple[str, bool]:
+    def observe_time(self, method: str, path: Optional[str], duration: float) -> None:
         """
-        Получение эндпоинта.
+        Запись времени обработки запроса с ID трейса в exemplar.
 
-        :param request: Запрос.
-        :return: Эндпоинт + Обрабатывается/Не обрабатывается.
+        :param method: HTTP метод.
+        :param path: Шаблон пути или None для запроса без маршрута.
+        :param duration: Время обработки в секундах.
         """
-        for route in request.app.routes:
-            match, child_scope = route.matches(request.scope)
-            if match == Match.FULL:
-                return route.path, True
+        if path is None:
+            return
+        span = trace.get_current_span()
+        trace_id = trace.format_trace_id(
+            span.get_span_context().trace_id,
+        )
 
-        return request.url.path, False
+        REQUESTS_PROCESSING_TIME.labels(
+            method=method,
+            path=path,
+            app_name=self.app_name,
+        ).observe(
+            duration,
+            exemplar={"TraceID": trace_id},
+        )
+
+    def get_path(self, scope: Scope) -> Optional[str]:
+        """
+        Шаблон пути маршрута, обработавшего запрос.
+
+        Словарь endpoint → путь пересобирается по маршрутам приложения
+        только для endpoint'а, которого в нем еще нет.
+
+        :param scope: ASGI scope запроса после маршрутизации.
+        :return: Шаблон пути или None, если запрос не дошел до маршрута.
+        """
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if endpoint not in self._paths:
+            self._paths.update(route_paths(scope["app"].routes))
+            self._paths.setdefault(endpoint, None)
+        return self._paths[endpoint]
+
+
+class RequestRoute:
+    """
+    Шаблон пути запроса, известный только после маршрутизации.
+
+    При первом получении шаблона учитывается начало обработки запроса.
+    """
+
+    def __init__(self, middleware: PrometheusMiddleware, scope: Scope) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.resolved = False
+        self.path: Optional[str] = None
+
+    def resolve(self) -> Optional[str]:
+        """
+        Шаблон пути запроса.
+
+        :return: Шаблон пути или None, если запрос не дошел до маршрута.
+        """
+        if not self.resolved:
+            self.resolved = True
+            self.path = self.middleware.get_path(self.scope)
+            self.middleware.start_request(self.scope["method"], self.path)
+        return self.path
+
+
+def route_paths(routes: Iterable[BaseRoute]) -> Dict[Any, str]:
+    """
+    Шаблоны путей маршрутов по endpoint'ам, которые Router пишет в scope.
+
+    :param routes: Маршруты приложения.
+    :return: Словарь endpoint → шаблон пути.
+    """
+    paths: Dict[Any, str] = {}
+    for route in routes:
+        endpoint: Any = getattr(route, "endpoint", None)
+        if isinstance(route, Mount):
+            endpoint = route.app
+        path = getattr(route, "path", None)
+        if endpoint is not None and path is not None:
+            paths.setdefault(endpoint, path)
+    return paths
 
 
 def metrics(_: Request) -> Response:
     """
     Настройка метрик.
 
+    При нескольких воркерах отдаются метрики, собранные со всех воркеров.
+
     :param _: Запрос.
     :return: Ответ.
     """
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    registry = REGISTRY if directory is None else multiprocess_registry(directory)
     return Response(
-        generate_latest(REGISTRY),
+        generate_latest(registry),
         headers={
             "Content-Type": CONTENT_TYPE_LATEST,
         },
     )
 
 
-def setting_otlp(
-    app: FastAPI,
+def create_tracer_provider(
     app_name: str,
-    endpoint: str,
+    settings: Settings,
     log_correlation: bool = True,
-) -> None:
+) -> TracerProvider:
     """
-    Настройка OpenTelemetry.
+    Настройка экспорта трейсов в OTLP.
 
     Установка названия приложения для отображения в трейсах.
+    Используется и приложением, и воркером arq.
 
-    :param app: FastAPI приложение.
     :param app_name: Название приложения.
-    :param endpoint: Эндпоинт.
+    :param settings: Настройки эндпоинта, семплирования и очереди экспорта.
     :param log_correlation: Корреляция логов.
+    :return: Глобальный провайдер трейсов.
     """
     resource = Resource.create(
         attributes={
@@ -189,16 +359,37 @@ def setting_otlp(
         },
     )
 
-    tracer = TracerProvider(resource=resource)
+    tracer = TracerProvider(resource=resource, sampler=create_sampler(settings))
     trace.set_tracer_provider(tracer)
 
-    tracer.add_span_processor(
-        BatchSpanProcessor(
-            OTLPSpanExporter(endpoint=endpoint),
-        ),
-    )
+    tracer.add_span_processor(create_span_processor(settings))
+
+    # Span'ы исходящих запросов httpx с передачей контекста трейса.
+    httpx_instrumentor = HTTPXClientInstrumentor()
+    if not httpx_instrumentor.is_instrumented_by_opentelemetry:
+        httpx_instrumentor.instrument(tracer_provider=tracer)
 
     if log_correlation:
         LoggingInstrumentor().instrument(set_logging_format=True)
 
+    return tracer
+
+
+def setting_otlp(
+    app: FastAPI,
+    app_name: str,
+    settings: Settings,
+    log_correlation: bool = True,
+) -> None:
+    """
+    Настройка OpenTelemetry.
+
+    Установка названия приложения для отображения в трейсах.
+
+    :param app: FastAPI приложение.
+    :param app_name: Название приложения.
+    :param settings: Настройки трейсов.
+    :param log_correlation: Корреляция логов.
+    """
+    tracer = create_tracer_provider(app_name, settings, log_correlation)
     FastAPIInstrumentor.instrument_app(app, tracer_provider=tracer)
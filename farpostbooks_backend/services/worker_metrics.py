@@ -0,0 +1,58 @@
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from opentelemetry import trace
+from prometheus_client import Counter, Histogram
+
+JOBS = Counter(
+    "arq_jobs_total",
+    "Total count of arq jobs by function and status",
+    ["job", "status"],
+)
+JOB_DURATION = Histogram(
+    "arq_job_duration_seconds",
+    "Histogram of arq job duration by function (in seconds)",
+    ["job"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800, 3600),
+)
+MESSAGES = Counter(
+    "telegram_messages_total",
+    "Total count of Telegram messages by result (sent, failed, throttled)",
+    ["result"],
+)
+
+Job = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def observe_job(job: Job) -> Job:
+    """
+    Метрики и span для задачи воркера arq.
+
+    Длительность записывается и для упавших задач, статус задачи
+    (succeeded/failed) попадает в счетчик.
+
+    :param job: Задача воркера.
+    :return: Задача с метриками.
+    """
+    tracer = trace.get_tracer(__name__)
+
+    @functools.wraps(job)
+    async def wrapper(ctx: Dict[str, Any]) -> None:  # noqa: WPS430
+        with tracer.start_as_current_span(f"arq {job.__name__}") as span:
+            span.set_attribute("arq.job_id", str(ctx.get("job_id", "")))
+            span.set_attribute("arq.job_try", int(ctx.get("job_try", 1)))
+            status = "failed"
+            before_time = time.perf_counter()
+            try:  # noqa: WPS501
+                await job(ctx)
+                status = "succeeded"
+            finally:
+                trace_id = trace.format_trace_id(span.get_span_context().trace_id)
+                JOB_DURATION.labels(job=job.__name__).observe(
+                    time.perf_counter() - before_time,
+                    exemplar={"TraceID": trace_id},
+                )
+                JOBS.labels(job=job.__name__, status=status).inc()
+
+    return wrapper
@@ -1,7 +1,7 @@
 import enum
 from pathlib import Path
 from tempfile import gettempdir
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseSettings
 from yarl import URL
@@ -20,6 +20,20 @@ class LogLevel(str, enum.Enum):  # noqa: WPS600
     FATAL = "FATAL"
 
 
+class EventsBackend(str, enum.Enum):  # noqa: WPS600
+    """Способ доставки событий о наличии книг между воркерами."""
+
+    redis = "redis"
+    memory = "memory"
+
+
+class RateLimitBackend(str, enum.Enum):  # noqa: WPS600
+    """Хранилище корзин для ограничения частоты запросов."""
+
+    memory = "memory"
+    redis = "redis"
+
+
 class Settings(BaseSettings):
     """
     Настройки приложения.
@@ -39,6 +53,8 @@ class Settings(BaseSettings):
     environment: str = "dev"
 
     log_level: LogLevel = LogLevel.INFO
+    # Сколько записей лога ждут вывода, остальные отбрасываются
+    log_queue_size: int = 10000
 
     # Variables for the database
     db_host: str = "localhost"
@@ -47,6 +63,9 @@ class Settings(BaseSettings):
     db_pass: str = "farpostbooks_backend"
     db_base: str = "farpostbooks_backend"
     db_echo: bool = False
+    # Размер пула соединений (параллельные запросы одного эндпоинта)
+    db_pool_minsize: int = 1
+    db_pool_maxsize: int = 10
 
     # Конфигурация OAuth2
     secret_key: str = "secret_key"
@@ -56,14 +75,103 @@ class Settings(BaseSettings):
 
     # Конфигурация для Telegram
     bot_token: str = "42:TOKEN"
-    broadcast_sleep: float = 0.05
+    # Рассылка: (сообщений в секунду, размер корзины) на бота и на один чат
+    broadcast_limit: Tuple[float, int] = (30, 30)
+    broadcast_chat_limit: Tuple[float, int] = (1, 1)
+    # Максимум одновременных запросов к Bot API при рассылке
+    broadcast_max_in_flight: int = 16
+    # Сколько раз повторять сообщение после ответа Telegram о превышении лимита
+    broadcast_max_retries: int = 3
+    # Сколько ID получателей читается из БД за один запрос
+    broadcast_chunk_size: int = 1000
+    # Сколько состояний доставки записывается в БД за один запрос
+    broadcast_batch_size: int = 100
+    # Сколько новых книг выводится в еженедельной рассылке
+    digest_max_books: int = 10
+    # Срок, на который выдается книга, и напоминания о просрочке
+    loan_period_days: int = 30
+    # Не чаще одного напоминания об одной книге за столько дней
+    overdue_reminder_cooldown_days: int = 3
+    # Сколько просроченных книг читается и отправляется за раз
+    overdue_reminder_batch_size: int = 100
+    # Час (UTC), в который отправляются напоминания
+    overdue_reminder_hour: int = 9
+
+    # Похожие книги: сколько хранится для каждой книги, минимум общих
+    # читателей и час (UTC) ежедневного пересчета
+    similar_books_top_k: int = 20
+    similar_books_min_common: int = 1
+    similar_books_hour: int = 3
+    # Сколько строк похожих книг записывается в БД одним запросом
+    similar_books_batch_size: int = 1000
 
     # Конфигурация для Google Books
     google_books_url: str = "https://www.googleapis.com/books/v1/volumes"
     google_api_key: Optional[str] = None
 
+    # Сжатие ответов (gzip/brotli)
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_excluded_paths: List[str] = ["/images", "/metrics"]
+
+    # События о наличии книг (SSE)
+    events_backend: EventsBackend = EventsBackend.redis
+    events_channel: str = "farpostbooks:availability"
+    events_history_size: int = 1000
+    events_queue_size: int = 100
+    events_heartbeat: float = 15
+    events_retry: int = 3000
+
+    # Ограничение нагрузки: префикс пути -> (токенов в секунду, размер корзины)
+    rate_limit_backend: RateLimitBackend = RateLimitBackend.memory
+    rate_limits: Dict[str, Tuple[float, int]] = {
+        "/api/users/token": (0.2, 5),
+        "/api/books/events": (0.1, 5),
+        "/api": (10, 30),
+    }
+    # Максимум запросов в обработке на воркер, остальные получают 503
+    max_concurrency: int = 64
+    overload_retry_after: int = 1
+
+    # Обложки книг: горячие файлы держатся в памяти (LRU по байтам)
+    image_directory: str = "images"
+    image_cache_max_bytes: int = 33554432  # 32 МиБ
+    image_cache_max_item_bytes: int = 1048576  # 1 МиБ
+    # Через сколько секунд файл из кэша сверяется с диском
+    image_cache_revalidate: float = 60
+    image_cache_control: str = "public, max-age=3600"
+
     # Метрики
+    # Бюджет SQL запросов на запрос к API: по шаблону пути и по умолчанию.
+    # При превышении в лог пишется предупреждение с запросами.
+    db_query_budget: Optional[int] = 20
+    db_query_budgets: Dict[str, int] = {}
+    # Папка для файлов метрик, если воркеров uvicorn больше одного
+    prometheus_multiproc_dir: Path = TEMP_DIR / "prometheus_multiproc"
+    # Сколько последних профилей запросов хранит воркер и интервал
+    # семплирования профилировщика в секундах
+    profiling_max_profiles: int = 20
+    profiling_interval: float = 0.001
+    # Период измерения задержки event loop и порог, после которого
+    # в лог пишется стек блокирующего вызова (в секундах)
+    loop_monitor_interval: float = 0.1
+    loop_block_threshold: float = 0.1
+    # Заголовок Server-Timing с временем этапов запроса
+    server_timing: bool = False
+    # Порт, на котором воркер arq отдает /metrics
+    worker_metrics_port: int = 8001
     OTLP_GRPC_ENDPOINT: str = "http://tempo:4317"
+    # Доля экспортируемых трейсов (решение вызывающего сервиса в приоритете).
+    # Трейсы с ошибками и дольше порога в секундах экспортируются всегда,
+    # ожидая завершения корневого span'а не больше otlp_max_pending_traces.
+    otlp_sample_ratio: float = 1.0
+    otlp_slow_threshold: float = 1.0
+    otlp_max_pending_traces: int = 1000
+    # Очередь экспорта span'ов: размер, пакет и период отправки в мс
+    otlp_max_queue_size: int = 2048
+    otlp_max_export_batch_size: int = 512
+    otlp_schedule_delay: int = 5000
 
     # Настройки Redis'а.
     redis_host: str = "redis"
@@ -83,6 +191,10 @@ class Settings(BaseSettings):
             user=self.db_user,
             password=self.db_pass,
             path=f"/{self.db_base}",
+            query={
+                "minsize": self.db_pool_minsize,
+                "maxsize": self.db_pool_maxsize,
+            },
         )
 
     class Config:
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from farpostbooks_backend.services.access_token import create_access_token
+from farpostbooks_backend.services.admission import (
+    AdmissionMiddleware,
+    MemoryRateLimiter,
+)
+
+
+def create_app(release: asyncio.Event, max_concurrency: int) -> AdmissionMiddleware:
+    """
+    Приложение с одним маршрутом, закрытое AdmissionMiddleware.
+
+    :param release: Событие, которого ждет обработчик /slow.
+    :param max_concurrency: Максимум запросов в обработке.
+    :return: Приложение.
+    """
+
+    async def fast(request: Request) -> PlainTextResponse:  # noqa: WPS430
+        return PlainTextResponse("ok")
+
+    async def slow(request: Request) -> PlainTextResponse:  # noqa: WPS430
+        await release.wait()
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/fast", fast), Route("/slow", slow)])
+    return AdmissionMiddleware(
+        app,
+        limiter=MemoryRateLimiter(),
+        limits={"/": (0.001, 2)},
+        max_concurrency=max_concurrency,
+    )
+
+
+@pytest.mark.anyio
+async def test_rate_limit(anyio_backend: str) -> None:
+    """Тест ограничения частоты запросов по ключу клиента."""
+    app = create_app(asyncio.Event(), max_concurrency=10)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        statuses = [(await client.get("/fast")).status_code for _ in range(3)]
+        assert statuses == [
+            status.HTTP_200_OK,
+            status.HTTP_200_OK,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        ]
+
+        response = await client.get("/fast")
+        assert int(response.headers["Retry-After"]) > 0
+
+        token = create_access_token(data={"sub": "5", "scopes": ["user"]})
+        response = await client.get(
+            "/fast",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_load_shedding(anyio_backend: str) -> None:
+    """Тест сброса запросов сверх общего лимита."""
+    release = asyncio.Event()
+    app = create_app(release, max_concurrency=1)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        slow_request = asyncio.create_task(client.get("/slow"))
+        while not app.in_flight:
+            await asyncio.sleep(0)
+
+        response = await client.get("/fast")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+
+        release.set()
+        assert (await slow_request).status_code == status.HTTP_200_OK
+        assert not app.in_flight
@@ -5,7 +5,9 @@ from httpx import AsyncClient
 from starlette import status
 
 from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.user_dao import UserDAO
 from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.services.recommendations import refresh_similar_books
 from farpostbooks_backend.web.api.enums import FilterFlag
 
 
@@ -19,7 +21,7 @@ async def test_search_book(
     dao = BookDAO()
 
     isbn = int(fake.isbn13().replace("-", ""))
-    book = await dao.create_book_model(
+    book, _ = await dao.create_book_model(
         book_id=isbn,
         name=fake.sentence(nb_words=5),
         description=fake.sentence(nb_words=5),
@@ -92,7 +94,7 @@ async def test_get_books(
     assert response.status_code == status.HTTP_200_OK
     assert not response.json()
 
-    book = await dao.create_book_model(
+    book, _ = await dao.create_book_model(
         book_id=isbn,
         name=fake.sentence(nb_words=5),
         description=fake.sentence(nb_words=5),
@@ -113,6 +115,25 @@ async def test_get_books(
     assert response.json()[0]["id"] == book.id
 
 
+@pytest.mark.anyio
+async def test_create_existing_book(fake: Faker) -> None:
+    """Тест признака добавления книги при повторном добавлении ISBN."""
+    book_fields = {
+        "book_id": int(fake.isbn13().replace("-", "")),
+        "name": fake.sentence(nb_words=5),
+        "description": fake.sentence(nb_words=5),
+        "image": fake.image_url(),
+        "author": fake.name(),
+        "publish": fake.year(),
+    }
+    book, created = await BookDAO.create_book_model(**book_fields)
+    assert created
+
+    same_book, created = await BookDAO.create_book_model(**book_fields)
+    assert not created
+    assert same_book.id == book.id
+
+
 @pytest.mark.anyio
 async def test_get_taken_books(
     fastapi_app: FastAPI,
@@ -128,16 +149,15 @@ async def test_get_taken_books(
     books = []
     for _ in range(5):
         isbn = int(fake.isbn13().replace("-", ""))
-        books.append(
-            await book_dao.create_book_model(
-                book_id=isbn,
-                name=fake.sentence(nb_words=5),
-                description=fake.sentence(nb_words=5),
-                image=fake.image_url(),
-                author=fake.name(),
-                publish=fake.year(),
-            ),
+        book, _ = await book_dao.create_book_model(
+            book_id=isbn,
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=fake.name(),
+            publish=fake.year(),
         )
+        books.append(book)
     for index in range(2):
         await dao.take_book(telegram_id=2, book_id=books[index].id)
 
@@ -168,16 +188,15 @@ async def test_get_not_taken_books(
     books = []
     for _ in range(5):
         isbn = int(fake.isbn13().replace("-", ""))
-        books.append(
-            await book_dao.create_book_model(
-                book_id=isbn,
-                name=fake.sentence(nb_words=5),
-                description=fake.sentence(nb_words=5),
-                image=fake.image_url(),
-                author=fake.name(),
-                publish=fake.year(),
-            ),
+        book, _ = await book_dao.create_book_model(
+            book_id=isbn,
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=fake.name(),
+            publish=fake.year(),
         )
+        books.append(book)
     for index in range(2):
         await dao.take_book(telegram_id=2, book_id=books[index].id)
 
@@ -209,3 +228,190 @@ async def test_not_permitted_member_get_books(
         },
     )
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_get_books_not_modified(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест условного запроса списка книг по ETag."""
+    book_dao = BookDAO()
+    dao = UserBookDAO()
+    url = fastapi_app.url_path_for("get_books")
+
+    response = await user_client.get(url)
+    etag = response.headers["ETag"]
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await user_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+    isbn = int(fake.isbn13().replace("-", ""))
+    await book_dao.create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    response = await user_client.get(url, headers={"If-None-Match": etag})
+    assert response.json()[0]["id"] == isbn
+
+    etag = response.headers["ETag"]
+    await dao.take_book(telegram_id=2, book_id=isbn)
+    response = await user_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_search_book_not_modified(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест условного запроса книги по ETag и Last-Modified."""
+    dao = BookDAO()
+
+    isbn = int(fake.isbn13().replace("-", ""))
+    await dao.create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    url = fastapi_app.url_path_for("search_book", book_id=isbn)
+
+    response = await user_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await user_client.get(
+        url,
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await user_client.get(
+        url,
+        headers={"If-Modified-Since": response.headers["Last-Modified"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await user_client.get(url, headers={"If-None-Match": '"other"'})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_search_book_reader_modified(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест смены ETag книги после изменения данных читателя."""
+    isbn = int(fake.isbn13().replace("-", ""))
+    await BookDAO.create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    await UserBookDAO.take_book(telegram_id=2, book_id=isbn)
+    url = fastapi_app.url_path_for("search_book", book_id=isbn)
+    etag = (await user_client.get(url)).headers["ETag"]
+
+    await user_client.put(
+        fastapi_app.url_path_for("update_me"),
+        json={"about": fake.sentence(nb_words=5)},
+    )
+    response = await user_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_search_book_fields(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест выбора полей книги параметром fields."""
+    dao = BookDAO()
+
+    isbn = int(fake.isbn13().replace("-", ""))
+    book, _ = await dao.create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    await UserBookDAO().take_book(telegram_id=2, book_id=isbn)
+    url = fastapi_app.url_path_for("search_book", book_id=isbn)
+
+    response = await user_client.get(
+        url,
+        params={"fields": "id,name,user_books.user.name"},
+    )
+    assert response.json() == {
+        "id": isbn,
+        "name": book.name,
+        "user_books": [{"user": {"name": "user"}}],
+    }
+
+    response = await user_client.get(url, params={"fields": "id,isbn"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_similar_books(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест похожих книг по общим читателям."""
+    books = []
+    for _ in range(3):
+        book, _ = await BookDAO.create_book_model(
+            book_id=int(fake.isbn13().replace("-", "")),
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=f"{fake.first_name()} {fake.last_name()}",
+            publish=fake.year(),
+        )
+        books.append(book)
+    for telegram_id in (3, 4):
+        await UserDAO.create_user_model(
+            telegram_id=telegram_id,
+            name=f"{fake.first_name()} {fake.last_name()}",
+            position=fake.job(),
+            about=fake.sentence(nb_words=10),
+        )
+    # Первую книгу читали 2 и 3, вторую - 2 и 4, третью - только 3.
+    readers = {
+        books[0].id: (2, 3),
+        books[1].id: (2, 4),
+        books[2].id: (3,),
+    }
+    for book_id, reader_ids in readers.items():
+        for reader_id in reader_ids:
+            await UserBookDAO.take_book(reader_id, book_id)
+            await UserBookDAO.return_book(reader_id, rating=5)
+
+    assert await refresh_similar_books(top_k=2) == 4
+
+    url = fastapi_app.url_path_for("get_similar_books", book_id=books[0].id)
+    response = await user_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    similar_ids = [book["id"] for book in response.json()]
+    assert similar_ids == [books[2].id, books[1].id]
+
+    response = await user_client.get(url, params={"limit": 1, "fields": "id"})
+    assert response.json() == [{"id": books[2].id}]
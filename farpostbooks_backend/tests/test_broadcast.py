@@ -0,0 +1,210 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import Any, List, Optional, cast
+
+import pytest
+from aiogram import Bot, exceptions
+from aiogram.methods import SendMessage
+from faker import Faker
+from fastapi import FastAPI
+from httpx import AsyncClient
+from tortoise import timezone
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.user_dao import UserDAO
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.db.models.userbook_model import UserBookModel
+from farpostbooks_backend.services.broadcast import Broadcaster
+from farpostbooks_backend.services.campaign import run_campaign
+from farpostbooks_backend.services.reminders import remind_overdue_loans
+
+# 6 сообщений при 50 в секунду и корзине на одно: 5 интервалов по 0.02 с.
+MIN_DURATION = 0.09
+FLOOD_WAIT = 0.05
+
+
+class FakeBot:
+    """Бот, который отвечает с задержкой и запоминает параллельность."""
+
+    def __init__(
+        self,
+        latency: float,
+        fail_on: Optional[int] = None,
+        floods: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.fail_on = fail_on
+        self.floods = floods
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat_ids: List[int] = []
+
+    async def send_message(self, chat_id: int, text: str) -> Any:
+        """
+        Отправка сообщения.
+
+        :param chat_id: ID чата.
+        :param text: Текст сообщения.
+        :raises RuntimeError: Имитация падения воркера на чате fail_on.
+        :raises TelegramRetryAfter: Первые floods запросов.
+        """
+        if chat_id == self.fail_on:
+            raise RuntimeError("Worker stopped")
+        if self.floods:
+            self.floods -= 1
+            raise exceptions.TelegramRetryAfter(
+                method=SendMessage(chat_id=chat_id, text=text),
+                message="Flood control exceeded",
+                retry_after=cast(int, FLOOD_WAIT),
+            )
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        self.chat_ids.append(chat_id)
+
+
+@pytest.mark.anyio
+async def test_broadcast_concurrency(anyio_backend: str) -> None:
+    """Тест ограничения числа одновременных запросов к Bot API."""
+    bot = FakeBot(latency=0.01)
+    broadcaster = Broadcaster(
+        cast(Bot, bot),
+        global_limit=(1000, 1000),
+        chat_limit=(1, 1),
+        max_in_flight=4,
+    )
+    result = await broadcaster.broadcast(range(20), "text")
+    assert result.sent == 20
+    assert not result.failed
+    assert bot.max_in_flight == 4
+    assert sorted(bot.chat_ids) == list(range(20))
+
+
+@pytest.mark.anyio
+async def test_broadcast_rate_limit(anyio_backend: str) -> None:
+    """Тест общего ограничения частоты отправки."""
+    bot = FakeBot(latency=0)
+    broadcaster = Broadcaster(
+        cast(Bot, bot),
+        global_limit=(50, 1),
+        chat_limit=(1, 1),
+        max_in_flight=4,
+    )
+    before_time = time.perf_counter()
+    result = await broadcaster.broadcast(range(6), "text")
+    assert result.sent == 6
+    assert time.perf_counter() - before_time >= MIN_DURATION
+
+
+@pytest.mark.anyio
+async def test_broadcast_flood_control(anyio_backend: str) -> None:
+    """Тест общей паузы и ограничения повторов после TelegramRetryAfter."""
+    bot = FakeBot(latency=0, floods=3)
+    broadcaster = Broadcaster(
+        cast(Bot, bot),
+        global_limit=(1000, 1000),
+        chat_limit=(1000, 1000),
+        max_in_flight=1,
+        max_retries=2,
+    )
+    before_time = time.perf_counter()
+    result = await broadcaster.broadcast(range(2), "text")
+    assert result == (1, 1)
+    assert bot.chat_ids == [1]
+    assert time.perf_counter() - before_time >= FLOOD_WAIT * 3
+
+
+def create_broadcaster(bot: FakeBot) -> Broadcaster:
+    """
+    Рассыльщик с последовательной отправкой без ограничения частоты.
+
+    :param bot: Фейковый бот.
+    :return: Рассыльщик.
+    """
+    return Broadcaster(
+        cast(Bot, bot),
+        global_limit=(1000, 1000),
+        chat_limit=(1000, 1000),
+        max_in_flight=1,
+    )
+
+
+@pytest.mark.anyio
+async def test_resume_campaign(
+    fastapi_app: FastAPI,
+    admin_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест продолжения прерванной рассылки и хода доставки в админке."""
+    for telegram_id in range(2, 6):
+        await UserDAO.create_user_model(
+            telegram_id=telegram_id,
+            name=f"{fake.first_name()} {fake.last_name()}",
+            position=fake.job(),
+            about=fake.sentence(nb_words=10),
+        )
+
+    bot = FakeBot(latency=0, fail_on=4)
+    with pytest.raises(RuntimeError):
+        await run_campaign(create_broadcaster(bot), "test", "text", 2, 2)
+
+    resumed_bot = FakeBot(latency=0)
+    for _ in range(2):
+        await run_campaign(create_broadcaster(resumed_bot), "test", "text", 2, 2)
+    assert bot.chat_ids == [1, 2, 3]
+    assert resumed_bot.chat_ids == [4, 5]
+
+    response = await admin_client.get(fastapi_app.url_path_for("get_broadcasts"))
+    broadcast = response.json()[0]
+    assert broadcast["status"] == "finished"
+    assert broadcast["total"] == broadcast["sent"] == 5
+
+
+@pytest.mark.anyio
+async def test_overdue_reminders(fake: Faker) -> None:
+    """Тест напоминаний о просроченных книгах с интервалом между ними."""
+    now = timezone.now()
+    book_dao = BookDAO()
+    for telegram_id in range(2, 5):
+        await UserDAO.create_user_model(
+            telegram_id=telegram_id,
+            name=f"{fake.first_name()} {fake.last_name()}",
+            position=fake.job(),
+            about=fake.sentence(nb_words=10),
+        )
+        book, _ = await book_dao.create_book_model(
+            book_id=int(fake.isbn13().replace("-", "")),
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=f"{fake.first_name()} {fake.last_name()}",
+            publish=fake.year(),
+        )
+        await UserBookDAO.take_book(telegram_id=telegram_id, book_id=book.id)
+    # 2 и 4 взяли книги 40 дней назад, 4 уже вернул свою.
+    await UserBookModel.filter(user_id__in=[2, 4]).update(
+        get_timestamp=now - timedelta(days=40),
+    )
+    await UserBookDAO.return_book(telegram_id=4, rating=5)
+
+    bot = FakeBot(latency=0)
+    for _ in range(2):
+        await remind_overdue_loans(
+            create_broadcaster(bot),
+            loan_period=timedelta(days=30),
+            cooldown=timedelta(days=3),
+        )
+    assert bot.chat_ids == [2]
+
+    await UserBookModel.filter(user_id=2).update(
+        reminded_timestamp=now - timedelta(days=4),
+    )
+    result = await remind_overdue_loans(
+        create_broadcaster(bot),
+        loan_period=timedelta(days=30),
+        cooldown=timedelta(days=3),
+    )
+    assert result == (1, 0)
+    assert bot.chat_ids == [2, 2]
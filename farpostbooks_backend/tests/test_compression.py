@@ -0,0 +1,120 @@
+import pytest
+from faker import Faker
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.services.compression import parse_accept_encoding
+
+
+async def create_large_book(fake: Faker) -> int:
+    """
+    Создание книги с длинным описанием.
+
+    :param fake: Генератор фейковых данных.
+    :return: ISBN книги.
+    """
+    isbn = int(fake.isbn13().replace("-", ""))
+    await BookDAO().create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.text(max_nb_chars=4000),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    return isbn
+
+
+def test_parse_accept_encoding() -> None:
+    """Тест разбора заголовка Accept-Encoding."""
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "identity": 0,
+    }
+
+
+@pytest.mark.anyio
+async def test_negotiated_compression(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест выбора кодировки по Accept-Encoding."""
+    isbn = await create_large_book(fake)
+    url = fastapi_app.url_path_for("search_book", book_id=isbn)
+
+    response = await user_client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.json()["id"] == isbn
+
+    response = await user_client.get(
+        url,
+        headers={"Accept-Encoding": "gzip, br;q=0"},
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json()["id"] == isbn
+
+    response = await user_client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_compressed_etag(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест условного запроса со слабым ETag сжатого ответа."""
+    isbn = await create_large_book(fake)
+    url = fastapi_app.url_path_for("search_book", book_id=isbn)
+
+    response = await user_client.get(url, headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["ETag"]
+    assert etag.startswith("W/")
+
+    response = await user_client.get(
+        url,
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.anyio
+async def test_skip_compression(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+) -> None:
+    """Тест ответов, которые не сжимаются: маленькие и исключенные пути."""
+    url = fastapi_app.url_path_for("get_books")
+    response = await user_client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+    response = await user_client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_vary_accept_encoding(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест Vary: Accept-Encoding у сжатых и несжатых ответов."""
+    isbn = await create_large_book(fake)
+    url = fastapi_app.url_path_for("search_book", book_id=isbn)
+    for accept_encoding in ("gzip", "identity"):
+        response = await user_client.get(
+            url,
+            headers={"Accept-Encoding": accept_encoding},
+        )
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    url = fastapi_app.url_path_for("get_books")
+    response = await user_client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    response = await user_client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+    assert "Vary" not in response.headers
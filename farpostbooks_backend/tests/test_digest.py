@@ -0,0 +1,57 @@
+import pytest
+from faker import Faker
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.user_dao import UserDAO
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.services.digest import build_digest, rank_new_books
+
+
+def test_rank_new_books() -> None:
+    """Тест порядка новых книг по оценкам книг тех же авторов."""
+    ratings = [
+        (1, 10, 5),
+        (1, 11, None),
+        (2, 12, 1),
+        (3, 10, 2),
+    ]
+    catalogue = [(10, "Толстой"), (11, "Пушкин, Гоголь"), (12, "Гоголь")]
+    users, order = rank_new_books(
+        ratings,
+        catalogue,
+        ["Чехов", "Гоголь", "Толстой, Чехов"],
+    )
+    # Читателю 2 не понравился Гоголь, читателю 3 Толстой безразличен.
+    assert users.tolist() == [1]
+    assert order.tolist() == [[2, 1, 0]]
+
+
+@pytest.mark.anyio
+async def test_build_digest(anyio_backend: str, fake: Faker) -> None:
+    """Тест персональных текстов рассылки о новых книгах."""
+    books = []
+    for author in ("Толстой", "Чехов", "Толстой"):
+        book, _ = await BookDAO.create_book_model(
+            book_id=int(fake.isbn13().replace("-", "")),
+            name=fake.sentence(nb_words=3),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=author,
+            publish=fake.year(),
+        )
+        books.append(book)
+    for telegram_id in (1, 2):
+        await UserDAO.create_user_model(
+            telegram_id=telegram_id,
+            name=f"{fake.first_name()} {fake.last_name()}",
+            position=fake.job(),
+            about=fake.sentence(nb_words=10),
+        )
+    await UserBookDAO.take_book(telegram_id=1, book_id=books[0].id)
+    await UserBookDAO.return_book(telegram_id=1, rating=5)
+
+    digest = await build_digest(books[1:], max_books=1)
+    assert list(digest.texts) == [1]
+    assert books[2].name in digest.texts[1]
+    assert books[1].name in digest.text
+    assert "и еще 1" in digest.text
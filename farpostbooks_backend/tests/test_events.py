@@ -0,0 +1,89 @@
+import pytest
+from faker import Faker
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.services.events import AvailabilityEventType, EventBroker
+from farpostbooks_backend.web.api.events.views import HEARTBEAT, event_stream
+
+
+@pytest.mark.anyio
+async def test_event_backlog(anyio_backend: str) -> None:
+    """Тест выдачи пропущенных событий по Last-Event-ID."""
+    broker = EventBroker(history_size=2, queue_size=10)
+    for book_id in range(1, 4):
+        await broker.publish(AvailabilityEventType.taken, book_id)
+
+    async with broker.subscribe(last_event_id=2) as resumed:
+        assert [event.book_id for event in resumed.backlog] == [3]
+        assert not resumed.reset
+
+    async with broker.subscribe(last_event_id=0) as outdated:
+        assert outdated.reset
+        assert outdated.last_id == 3
+
+
+@pytest.mark.anyio
+async def test_event_stream(anyio_backend: str) -> None:
+    """Тест потока событий: heartbeat, событие и завершение при остановке."""
+    broker = EventBroker(history_size=10, queue_size=10)
+    messages = []
+    async for message in event_stream(broker, last_event_id=None, heartbeat=0.01):
+        messages.append(message)
+        if message == HEARTBEAT:
+            await broker.publish(AvailabilityEventType.returned, 42)
+        elif message.startswith("id:"):
+            await broker.stop()
+
+    assert messages[0].startswith("retry:")
+    assert messages[1] == HEARTBEAT
+    assert messages[2].startswith("id: 1\nevent: returned\ndata: ")
+    assert '"book_id": 42' in messages[2]
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber(anyio_backend: str) -> None:
+    """Тест закрытия подписки клиента, который не успевает читать события."""
+    broker = EventBroker(history_size=10, queue_size=1)
+    async with broker.subscribe() as subscription:
+        await broker.publish(AvailabilityEventType.taken, 1)
+        await broker.publish(AvailabilityEventType.returned, 1)
+        assert subscription.queue.get_nowait() is None
+
+
+@pytest.mark.anyio
+async def test_take_book_events(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест публикации событий при взятии и возврате книги."""
+    broker: EventBroker = fastapi_app.state.events
+    isbn = int(fake.isbn13().replace("-", ""))
+    await BookDAO().create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+
+    response = await user_client.post(
+        fastapi_app.url_path_for("take_book", book_id=isbn),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await user_client.put(
+        fastapi_app.url_path_for("return_book"),
+        json={"rating": 5},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    events = broker.get_backlog(0)
+    assert events is not None
+    assert [(event.type, event.book_id) for event in events] == [
+        (AvailabilityEventType.taken, isbn),
+        (AvailabilityEventType.returned, isbn),
+    ]
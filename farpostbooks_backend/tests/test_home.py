@@ -0,0 +1,59 @@
+import pytest
+from faker import Faker
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+
+
+@pytest.mark.anyio
+async def test_get_home(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест эндпоинта с данными для главного экрана."""
+    book_dao = BookDAO()
+    dao = UserBookDAO()
+
+    books = []
+    for _ in range(3):
+        isbn = int(fake.unique.isbn13().replace("-", ""))
+        new_book, _ = await book_dao.create_book_model(
+            book_id=isbn,
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=fake.name(),
+            publish=fake.year(),
+        )
+        books.append(new_book)
+    for book in books[:2]:
+        await dao.take_book(telegram_id=2, book_id=book.id)
+        await dao.return_book(telegram_id=2, rating=5)
+    await dao.take_book(telegram_id=2, book_id=books[2].id)
+
+    response = await user_client.get(fastapi_app.url_path_for("get_home"))
+    home = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert home["user"]["id"] == 2
+    assert home["current"]["book"]["id"] == books[2].id
+    assert [user_book["book"]["id"] for user_book in home["history"]] == [
+        books[1].id,
+        books[0].id,
+    ]
+    assert len(home["books"]) == len(books)
+
+
+@pytest.mark.anyio
+async def test_get_home_history_limit(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+) -> None:
+    """Тест ограничения количества книг в истории главного экрана."""
+    url = fastapi_app.url_path_for("get_home")
+    for history_limit in (-1, 0, 10**6):
+        response = await user_client.get(url, params={"history_limit": history_limit})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
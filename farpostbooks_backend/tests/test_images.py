@@ -0,0 +1,157 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+from starlette.types import Message
+
+from farpostbooks_backend.services.images import (
+    ZEROCOPY_EXTENSION,
+    ImageApp,
+    UnsatisfiableRangeError,
+    parse_range,
+)
+
+BODY = bytes(range(50))
+
+
+def create_app(directory: Path, max_bytes: int = 1000) -> ImageApp:
+    """
+    Приложение для раздачи обложек из временной директории.
+
+    :param directory: Директория с обложками.
+    :param max_bytes: Размер кэша в байтах.
+    :return: Приложение.
+    """
+    return ImageApp(
+        directory=str(directory),
+        max_bytes=max_bytes,
+        max_item_bytes=100,
+        revalidate_after=60,
+        cache_control="public, max-age=3600",
+    )
+
+
+@pytest.mark.anyio
+async def test_get_image(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест полного ответа и If-None-Match."""
+    (tmp_path / "cover.jpeg").write_bytes(BODY)
+    async with AsyncClient(app=create_app(tmp_path), base_url="http://test") as client:
+        response = await client.get("/cover.jpeg")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == BODY
+        assert response.headers["content-type"] == "image/jpeg"
+
+        etag = response.headers["etag"]
+        response = await client.get("/cover.jpeg", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+
+@pytest.mark.anyio
+async def test_get_image_range(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест запросов части файла."""
+    (tmp_path / "cover.jpeg").write_bytes(BODY)
+    async with AsyncClient(app=create_app(tmp_path), base_url="http://test") as client:
+        response = await client.get("/cover.jpeg", headers={"Range": "bytes=10-19"})
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == BODY[10:20]
+
+        response = await client.get("/cover.jpeg", headers={"Range": "bytes=-5"})
+        assert response.content == BODY[-5:]
+
+        response = await client.get("/cover.jpeg", headers={"Range": "bytes=50-"})
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response.headers["content-range"] == "bytes */50"
+
+
+@pytest.mark.anyio
+async def test_get_image_empty_range(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест пустого диапазона с конца файла и диапазона пустого файла."""
+    (tmp_path / "cover.jpeg").write_bytes(BODY)
+    async with AsyncClient(app=create_app(tmp_path), base_url="http://test") as client:
+        response = await client.get("/cover.jpeg", headers={"Range": "bytes=-0"})
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+    with pytest.raises(UnsatisfiableRangeError):
+        parse_range("bytes=-5", 0)
+
+
+@pytest.mark.anyio
+async def test_empty_response_length(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест content-length у 416 и его отсутствия у 304."""
+    (tmp_path / "cover.jpeg").write_bytes(BODY)
+    async with AsyncClient(app=create_app(tmp_path), base_url="http://test") as client:
+        response = await client.get("/cover.jpeg")
+        etag = response.headers["etag"]
+        response = await client.get("/cover.jpeg", headers={"If-None-Match": etag})
+        assert "content-length" not in response.headers
+
+        response = await client.get("/cover.jpeg", headers={"Range": "bytes=50-"})
+        assert response.headers["content-length"] == "0"
+
+
+@pytest.mark.anyio
+async def test_get_image_zerocopy(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест отдачи большой обложки с диска через zerocopysend."""
+    body = bytes(200)
+    (tmp_path / "cover.jpeg").write_bytes(body)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/cover.jpeg",
+        "headers": [(b"range", b"bytes=10-")],
+        "extensions": {ZEROCOPY_EXTENSION: {}},
+    }
+    messages: List[Message] = []
+
+    async def receive() -> Message:  # noqa: WPS430
+        return {"type": "http.request"}
+
+    async def send(message: Message) -> None:  # noqa: WPS430
+        messages.append(message)
+
+    await create_app(tmp_path)(scope, receive, send)
+    assert messages[0]["status"] == status.HTTP_206_PARTIAL_CONTENT
+    zerocopy = messages[1]
+    assert zerocopy["type"] == ZEROCOPY_EXTENSION
+    assert zerocopy["offset"] == 10
+    assert zerocopy["count"] == len(body) - 10
+
+
+@pytest.mark.anyio
+async def test_get_image_not_found(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест отсутствующих файлов и выхода за пределы директории."""
+    (tmp_path / "cover.jpeg").write_bytes(BODY)
+    app = create_app(tmp_path / "covers")
+    (tmp_path / "covers").mkdir()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/missing.jpeg")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = await client.get("/../cover.jpeg")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = await client.get("/cover%00.jpeg")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        long_name = "a" * 300
+        response = await client.get(f"/{long_name}.jpeg")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_image_cache(anyio_backend: str, tmp_path: Path) -> None:
+    """Тест LRU по байтам и отдачи крупных файлов с диска."""
+    for small in ("first", "second", "third"):
+        (tmp_path / small).write_bytes(b"x" * 40)
+    large = b"y" * 500
+    (tmp_path / "large").write_bytes(large)
+    app = create_app(tmp_path, max_bytes=100)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for name in ("first", "second", "first", "third"):
+            await client.get(f"/{name}")
+        assert app.cache.get("first") is not None
+        assert app.cache.get("second") is None
+        assert app.cache.size == 80
+
+        response = await client.get("/large", headers={"Range": "bytes=100-"})
+        assert response.content == large[100:]
+        assert app.cache.get("large") is None
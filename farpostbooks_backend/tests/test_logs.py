@@ -0,0 +1,62 @@
+import logging
+from queue import Queue
+
+import ujson
+from prometheus_client import REGISTRY
+
+from farpostbooks_backend.services.logs import BoundedQueueHandler, JSONFormatter
+from farpostbooks_backend.services.utils import EndpointFilter
+
+
+def make_record(msg: str, *args: object) -> logging.LogRecord:
+    """
+    Запись лога uvicorn.access.
+
+    :param msg: Шаблон сообщения.
+    :param args: Аргументы сообщения.
+    :return: Запись лога.
+    """
+    return logging.LogRecord(
+        "uvicorn.access",
+        logging.INFO,
+        __file__,
+        1,
+        msg,
+        args,
+        None,
+    )
+
+
+def test_queue_handler_drops() -> None:
+    """Тест отбрасывания записей при полной очереди без ожидания."""
+    dropped_before = REGISTRY.get_sample_value("log_records_dropped_total") or 0
+    records: "Queue[logging.LogRecord]" = Queue(1)
+    handler = BoundedQueueHandler(records)
+    for index in range(3):
+        handler.handle(make_record("message %d", index))  # noqa: WPS323
+
+    assert records.qsize() == 1
+    dropped = REGISTRY.get_sample_value("log_records_dropped_total")
+    assert dropped == dropped_before + 2
+
+
+def test_json_formatter() -> None:
+    """Тест JSON с ID трейса и span'а."""
+    record = make_record("Книга %s взята", "123")  # noqa: WPS323
+    record.otelTraceID = "abc"
+    record.otelSpanID = "def"
+    document = ujson.loads(JSONFormatter().format(record))
+    assert document["message"] == "Книга 123 взята"
+    assert document["trace_id"] == "abc"
+    assert document["span_id"] == "def"
+
+
+def test_endpoint_filter() -> None:
+    """Тест фильтра /metrics по аргументам, без форматирования сообщения."""
+    endpoint_filter = EndpointFilter()
+    # Шаблон не подходит к аргументам: форматирование упало бы.
+    template = "%d"  # noqa: WPS323
+    metrics = make_record(template, "127.0.0.1", "GET", "/metrics?x=1", "1.1", 200)
+    books = make_record(template, "127.0.0.1", "GET", "/api/books/", "1.1", 200)
+    assert not endpoint_filter.filter(metrics)
+    assert endpoint_filter.filter(books)
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from farpostbooks_backend.services.loop_monitor import LoopMonitor
+
+
+@pytest.mark.anyio
+async def test_loop_monitor(
+    anyio_backend: str,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Тест задержки event loop и стека блокирующего вызова."""
+    monitor = LoopMonitor("loop-test", interval=0.01, threshold=0.05)
+    with caplog.at_level(logging.WARNING):
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)  # noqa: WPS432
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    assert "Event loop blocked" in caplog.text
+    assert "time.sleep(0.3)" in caplog.text
+    labels = {"app_name": "loop-test"}
+    # Одна задержка около 0.3 с попадает только в корзины выше 0.25 с.
+    slow_ticks = REGISTRY.get_sample_value(
+        "event_loop_lag_seconds_bucket",
+        {**labels, "le": "0.25"},
+    )
+    ticks = REGISTRY.get_sample_value("event_loop_lag_seconds_count", labels)
+    assert slow_ticks == (ticks or 0) - 1
+    assert REGISTRY.get_sample_value("event_loop_blocks_total", labels) == 1
@@ -0,0 +1,171 @@
+import logging
+import os
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from faker import Faker
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from starlette import status
+from starlette.routing import Mount
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.services.db_metrics import (
+    QueryBudget,
+    QueryStats,
+    count_queries,
+)
+from farpostbooks_backend.services.multiprocess_metrics import (
+    MULTIPROC_DIR_ENV,
+    multiprocess_registry,
+)
+from farpostbooks_backend.services.utils import PrometheusMiddleware
+from farpostbooks_backend.services.worker_metrics import observe_job
+from farpostbooks_backend.web.api.book.views import search_book
+
+# Воркер, который обработал запрос и завершился, не уменьшив gauge.
+WORKER_SCRIPT = """
+from farpostbooks_backend.services.utils import REQUESTS, REQUESTS_IN_PROGRESS
+labels = {"method": "GET", "path": "/api/books/", "app_name": "test"}
+REQUESTS.labels(**labels).inc()
+REQUESTS_IN_PROGRESS.labels(**labels).inc()
+"""
+
+
+@pytest.mark.anyio
+async def test_request_metrics(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Тест метрик запросов с шаблоном пути в лейблах."""
+    url = fastapi_app.url_path_for("search_book", book_id=1)
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.get("/metrics")
+    metrics = response.text
+    assert (
+        'fastapi_responses_total{app_name="dev",method="GET",'
+        'path="/api/books/{book_id}",status_code="401"}'
+    ) in metrics
+    assert 'fastapi_requests_duration_seconds_count{app_name="dev"' in metrics
+    assert 'fastapi_db_queries_count{app_name="dev"' in metrics
+
+
+def test_route_paths(fastapi_app: FastAPI) -> None:
+    """Тест шаблонов путей по endpoint'у из scope без перебора маршрутов."""
+    middleware = PrometheusMiddleware(fastapi_app, app_name="test")
+    scope = {"endpoint": search_book, "app": fastapi_app}
+    assert middleware.get_path(scope) == "/api/books/{book_id}"
+    images = next(route for route in fastapi_app.routes if isinstance(route, Mount))
+    scope = {"endpoint": images.app, "app": fastapi_app}
+    assert middleware.get_path(scope) == "/images"
+
+    assert middleware.get_path({"app": fastapi_app}) is None
+    assert middleware.get_path({"endpoint": object(), "app": fastapi_app}) is None
+    assert len(middleware._paths) <= len(fastapi_app.routes) + 1  # noqa: WPS437
+
+
+@observe_job
+async def failing_job(ctx: Dict[str, Any]) -> None:
+    """
+    Задача, которая падает со второй попытки.
+
+    :param ctx: Данные воркера.
+    :raises RuntimeError: Со второй попытки.
+    """
+    if ctx["job_try"] > 1:
+        raise RuntimeError("Job failed")
+
+
+@pytest.mark.anyio
+async def test_job_metrics(anyio_backend: str) -> None:
+    """Тест метрик задач воркера."""
+    await failing_job({"job_id": "1", "job_try": 1})
+    with pytest.raises(RuntimeError):
+        await failing_job({"job_id": "1", "job_try": 2})
+
+    for job_status in ("succeeded", "failed"):
+        labels = {"job": "failing_job", "status": job_status}
+        assert REGISTRY.get_sample_value("arq_jobs_total", labels) == 1
+    labels = {"job": "failing_job"}
+    assert REGISTRY.get_sample_value("arq_job_duration_seconds_count", labels) == 2
+
+
+async def add_taken_books(fake: Faker, count: int) -> None:
+    """
+    Добавление книг, каждая из которых побывала у пользователя 2.
+
+    :param fake: Faker.
+    :param count: Количество книг.
+    """
+    for _ in range(count):
+        book, _ = await BookDAO.create_book_model(
+            book_id=int(fake.isbn13().replace("-", "")),
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=f"{fake.first_name()} {fake.last_name()}",
+            publish=fake.year(),
+        )
+        await UserBookDAO.take_book(telegram_id=2, book_id=book.id)
+        await UserBookDAO.return_book(telegram_id=2, rating=5)
+
+
+@pytest.mark.anyio
+async def test_get_books_queries(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест: число SQL запросов списка книг не растет с числом книг."""
+    url = fastapi_app.url_path_for("get_books")
+    await add_taken_books(fake, 1)
+    with count_queries() as queries:
+        await user_client.get(url)
+        one_book_count = queries.count
+
+    await add_taken_books(fake, 4)
+    with count_queries() as queries:  # noqa: WPS440
+        response = await user_client.get(url)
+        many_books_count = queries.count
+    assert len(response.json()) == 5
+    assert many_books_count == one_book_count
+    assert many_books_count <= 3
+
+
+def test_query_budget_warning(caplog: pytest.LogCaptureFixture) -> None:
+    """Тест предупреждения с SQL при превышении бюджета маршрута."""
+    stats = QueryStats()
+    for statement in ("SELECT 1", "SELECT 2", "SELECT 3"):
+        stats.record(statement, 0.001)
+
+    budget = QueryBudget("test", default=10, budgets={"/api/books/": 2})
+    with caplog.at_level(logging.WARNING):
+        budget.observe("GET", "/api/books/{book_id}", stats)
+        assert not caplog.records
+        budget.observe("GET", "/api/books/", stats)
+    assert "3 SQL queries, budget 2" in caplog.text
+    assert "SELECT 3" in caplog.text
+
+
+def test_multiprocess_metrics(tmp_path: Path) -> None:
+    """Тест суммирования метрик воркеров и очистки завершившихся."""
+    env = {**os.environ, MULTIPROC_DIR_ENV: str(tmp_path)}
+    for _ in range(2):
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", WORKER_SCRIPT],
+            env=env,
+            check=True,
+        )
+
+    registry = multiprocess_registry(str(tmp_path))
+    labels = {"method": "GET", "path": "/api/books/", "app_name": "test"}
+    assert registry.get_sample_value("fastapi_requests_total", labels) == 2
+    assert registry.get_sample_value("fastapi_requests_in_progress", labels) is None
+    assert not list(tmp_path.glob("gauge_live*"))
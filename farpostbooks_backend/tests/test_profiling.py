@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+
+@pytest.mark.anyio
+async def test_profile_request(
+    fastapi_app: FastAPI,
+    admin_client: AsyncClient,
+    client: AsyncClient,
+) -> None:
+    """Тест профиля запроса вместо ответа только для администратора."""
+    url = fastapi_app.url_path_for("get_books")
+    response = await client.get(url, params={"profile": "speedscope"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await admin_client.get(url, params={"profile": "speedscope"})
+    assert response.status_code == status.HTTP_200_OK
+    assert "speedscope" in response.json()["$schema"]
+    assert "attachment" in response.headers["Content-Disposition"]
+
+
+@pytest.mark.anyio
+async def test_profile_sampling(
+    fastapi_app: FastAPI,
+    admin_client: AsyncClient,
+) -> None:
+    """Тест профилирования доли запросов к маршруту и скачивания профиля."""
+    sampling_url = fastapi_app.url_path_for("set_sampling")
+    response = await admin_client.put(
+        sampling_url,
+        json={"path": "/api/books/", "rate": 1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    await admin_client.get(fastapi_app.url_path_for("get_books"))
+    await admin_client.delete(sampling_url)
+    await admin_client.get(fastapi_app.url_path_for("get_books"))
+
+    profiles = (await admin_client.get(fastapi_app.url_path_for("get_profiles"))).json()
+    assert [profile["path"] for profile in profiles] == ["/api/books/"]
+
+    response = await admin_client.get(
+        fastapi_app.url_path_for("get_profile", profile_id=profiles[0]["id"]),
+        params={"format": "html"},
+    )
+    assert response.headers["Content-Type"].startswith("text/html")
@@ -0,0 +1,64 @@
+import pytest
+from faker import Faker
+from fastapi.encoders import jsonable_encoder
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.user_dao import UserDAO
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.db.models.book_model import BookModel
+from farpostbooks_backend.web.api.schema import BookIntroduction, BookModelDTO
+from farpostbooks_backend.web.api.serializers import BOOK_DETAIL, BOOK_INTRODUCTION
+
+
+@pytest.mark.anyio
+async def test_book_detail_serializer(
+    anyio_backend: str,
+    fake: Faker,
+) -> None:
+    """Тест совпадения сериализатора с валидацией через pydantic схему."""
+    book_dao = BookDAO()
+    dao = UserBookDAO()
+
+    await UserDAO().create_user_model(
+        telegram_id=2,
+        name="user",
+        position="user",
+        about="user",
+    )
+    isbn = int(fake.isbn13().replace("-", ""))
+    await book_dao.create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    await dao.take_book(telegram_id=2, book_id=isbn)
+    await dao.return_book(telegram_id=2, rating=4)
+    await dao.take_book(telegram_id=2, book_id=isbn)
+
+    book = await book_dao.search_book(isbn)
+    assert book is not None
+    tortoise_book = await pydantic_model_creator(BookModel).from_tortoise_orm(book)
+    validated_book = BookModelDTO.parse_obj(tortoise_book.dict())
+
+    assert BOOK_DETAIL.dump(book) == jsonable_encoder(validated_book)
+    assert BOOK_INTRODUCTION.dump_many([book]) == [
+        jsonable_encoder(BookIntroduction.from_orm(book)),
+    ]
+
+
+def test_sparse_serializer() -> None:
+    """Тест ограничения сериализатора выбранными полями."""
+    serializer = BOOK_DETAIL.only("id, user_books.user.name,user_books.rating")
+
+    assert serializer.tree == {
+        "id": {},
+        "user_books": {"user": {"name": {}}, "rating": {}},
+    }
+    assert BOOK_DETAIL.only("user_books.rating,id,user_books.user.name") is serializer
+    assert BOOK_DETAIL.only("") is BOOK_DETAIL
+    with pytest.raises(ValueError):
+        BOOK_DETAIL.only("name.first")
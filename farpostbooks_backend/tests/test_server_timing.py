@@ -0,0 +1,90 @@
+import time
+from typing import Any, Dict
+
+import pytest
+from faker import Faker
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+from starlette import status
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.web.api.serializers import Serializer
+from farpostbooks_backend.web.application import enable_server_timing
+
+# Задержка сериализации одного объекта в тесте, секунды.
+SLOW_CONVERT = 0.005
+
+
+def parse_timing(response: Response) -> Dict[str, float]:
+    """
+    Этапы из заголовка Server-Timing.
+
+    :param response: Ответ приложения.
+    :return: Время этапов в миллисекундах.
+    """
+    phases = {}
+    for metric in response.headers["Server-Timing"].split(", "):
+        phase, duration = metric.split(";dur=")
+        phases[phase] = float(duration)
+    return phases
+
+
+@pytest.mark.anyio
+async def test_server_timing(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+) -> None:
+    """Тест заголовка Server-Timing с временем этапов запроса."""
+    enable_server_timing(fastapi_app)
+    response = await user_client.get(fastapi_app.url_path_for("get_me"))
+    assert response.status_code == status.HTTP_200_OK
+
+    phases = parse_timing(response)
+    assert list(phases) == ["auth", "db", "serialization", "total"]
+    assert phases["total"] >= phases["auth"]
+
+
+@pytest.mark.anyio
+async def test_server_timing_serialization(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Тест учета сериализатора внутри эндпоинта в этапе serialization."""
+    for _ in range(3):
+        await BookDAO.create_book_model(
+            book_id=int(fake.isbn13().replace("-", "")),
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=fake.last_name(),
+            publish=fake.year(),
+        )
+    convert = Serializer.convert
+
+    def slow_convert(  # noqa: WPS430
+        serializer: Serializer,
+        obj: Any,
+    ) -> Dict[str, Any]:
+        time.sleep(SLOW_CONVERT)
+        return convert(serializer, obj)
+
+    monkeypatch.setattr(Serializer, "convert", slow_convert)
+    enable_server_timing(fastapi_app)
+    response = await user_client.get(fastapi_app.url_path_for("get_books"))
+    assert len(response.json()) == 3
+
+    phases = parse_timing(response)
+    assert phases["serialization"] >= 3 * SLOW_CONVERT * 1000
+    assert phases["total"] >= phases["serialization"]
+
+
+@pytest.mark.anyio
+async def test_server_timing_disabled(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+) -> None:
+    """Тест ответа без заголовка Server-Timing по умолчанию."""
+    response = await user_client.get(fastapi_app.url_path_for("get_me"))
+    assert "Server-Timing" not in response.headers
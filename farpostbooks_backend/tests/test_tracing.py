@@ -0,0 +1,79 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode, get_tracer_provider
+from prometheus_client import REGISTRY
+
+from farpostbooks_backend.db.models.book_model import BookModel
+from farpostbooks_backend.services.db_metrics import count_rows
+from farpostbooks_backend.services.tracing import TailSamplingProcessor, create_sampler
+from farpostbooks_backend.settings import Settings
+
+
+def test_tail_sampling() -> None:
+    """Тест экспорта только трейсов с ошибками и медленных трейсов."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=create_sampler(Settings(otlp_sample_ratio=0)))
+    provider.add_span_processor(
+        TailSamplingProcessor(BatchSpanProcessor(exporter), slow_threshold=1),
+    )
+    tracer = provider.get_tracer(__name__)
+    dropped = {"decision": "dropped"}
+    dropped_before = REGISTRY.get_sample_value("otel_traces_total", dropped) or 0
+
+    # Быстрый трейс без ошибок не экспортируется.
+    with tracer.start_as_current_span("fast"):
+        tracer.start_span("query").end()
+    with tracer.start_as_current_span("failed"):
+        with tracer.start_as_current_span("query") as query:
+            query.set_status(Status(StatusCode.ERROR))
+    slow_duration = 2 * 10**9
+    tracer.start_span("slow", start_time=0).end(end_time=slow_duration)
+    provider.force_flush()
+
+    spans = exporter.get_finished_spans()
+    assert sorted(span.name for span in spans) == ["failed", "query", "slow"]
+    assert all(span.context.trace_flags.sampled for span in spans)
+    dropped_after = REGISTRY.get_sample_value("otel_traces_total", dropped)
+    assert dropped_after == dropped_before + 1
+
+
+@pytest.mark.anyio
+async def test_client_spans(fastapi_app: FastAPI) -> None:
+    """Тест дочерних span'ов SQL запросов и исходящих запросов httpx."""
+    provider = get_tracer_provider()
+    assert isinstance(provider, TracerProvider)
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, text=request.headers["traceparent"]),
+    )
+
+    with provider.get_tracer(__name__).start_as_current_span("request") as parent:
+        parent_id = parent.get_span_context().span_id
+        await BookModel.all()
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://books.test/volumes")
+
+    spans = {
+        span.name: span
+        for span in exporter.get_finished_spans()
+        if span.parent is not None and span.parent.span_id == parent_id
+    }
+    query = spans["SELECT"]
+    request = spans["HTTP GET"]
+    assert query.kind == request.kind == SpanKind.CLIENT
+    assert query.attributes["db.statement"].startswith("SELECT")
+    assert query.attributes["db.rows"] == 0
+    assert format(request.context.span_id, "016x") in response.text
+
+
+def test_count_rows() -> None:
+    """Тест количества строк для результатов разных методов клиента БД."""
+    assert count_rows([{"id": 1}, {"id": 2}]) == 2
+    assert count_rows((3, [])) == 3
+    assert count_rows(()) == 1
+    assert count_rows(None) is None
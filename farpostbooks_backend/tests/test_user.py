@@ -190,3 +190,19 @@ async def test_fail_get_user(
     )
     response = await user_client.get(url)
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_iter_user_ids(fake: Faker) -> None:
+    """Тест постраничного обхода ID пользователей."""
+    dao = UserDAO()
+    for telegram_id in (5, 3, 9, 1, 7):
+        await dao.create_user_model(
+            telegram_id=telegram_id,
+            name=f"{fake.first_name()} {fake.last_name()}",
+            position=fake.job(),
+            about=fake.sentence(nb_words=10),
+        )
+
+    user_ids = [user_id async for user_id in dao.iter_user_ids(chunk_size=2)]
+    assert user_ids == [1, 3, 5, 7, 9]
@@ -24,16 +24,15 @@ async def test_get_user_books(
     books = []
     for _ in range(2):
         isbn = int(fake.isbn13().replace("-", ""))
-        books.append(
-            await book_dao.create_book_model(
-                book_id=isbn,
-                name=fake.sentence(nb_words=5),
-                description=fake.sentence(nb_words=5),
-                image=fake.image_url(),
-                author=fake.name(),
-                publish=fake.year(),
-            ),
+        book, _ = await book_dao.create_book_model(
+            book_id=isbn,
+            name=fake.sentence(nb_words=5),
+            description=fake.sentence(nb_words=5),
+            image=fake.image_url(),
+            author=fake.name(),
+            publish=fake.year(),
         )
+        books.append(book)
 
     response = await user_client.get(url)
     user_books = response.json()
@@ -63,7 +62,7 @@ async def test_take_book(
     dao = UserBookDAO()
 
     isbn = int(fake.isbn13().replace("-", ""))
-    book = await book_dao.create_book_model(
+    book, _ = await book_dao.create_book_model(
         book_id=isbn,
         name=fake.sentence(nb_words=5),
         description=fake.sentence(nb_words=5),
@@ -174,3 +173,37 @@ async def test_return_book(
         },
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_get_user_books_fields(
+    fastapi_app: FastAPI,
+    user_client: AsyncClient,
+    fake: Faker,
+) -> None:
+    """Тест выбора полей книг пользователя параметром fields."""
+    dao = UserBookDAO()
+    isbn = int(fake.isbn13().replace("-", ""))
+    await BookDAO().create_book_model(
+        book_id=isbn,
+        name=fake.sentence(nb_words=5),
+        description=fake.sentence(nb_words=5),
+        image=fake.image_url(),
+        author=fake.name(),
+        publish=fake.year(),
+    )
+    await dao.take_book(telegram_id=2, book_id=isbn)
+
+    response = await user_client.get(
+        fastapi_app.url_path_for("get_user_books", telegram_id=2),
+        params={"fields": "book.id,rating"},
+    )
+    assert response.json() == {
+        "current": {"book": {"id": isbn}, "rating": None},
+        "books": [],
+    }
+
+    user_book = await dao.get_unreturned_book(2, fields={"rating": {}})
+    assert user_book is not None
+    with pytest.raises(AttributeError):
+        assert user_book.book
@@ -1,5 +1,8 @@
 from typing import Optional
 
+from pydantic import BaseModel, conint
+
+from farpostbooks_backend.settings import settings
 from farpostbooks_backend.web.api.enums import FilterFlag
 from farpostbooks_backend.web.api.schema import ScrollDTO
 
@@ -8,3 +11,9 @@ class BooksDTO(ScrollDTO):
     """Получение списка книг с учетом фильтров."""
 
     flag: Optional[FilterFlag] = FilterFlag.all
+
+
+class SimilarBooksDTO(BaseModel):
+    """Параметры для получения похожих книг."""
+
+    limit: conint(ge=1, le=settings.similar_books_top_k) = 10  # type: ignore
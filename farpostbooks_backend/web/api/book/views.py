@@ -1,20 +1,39 @@
-from typing import List, Union
+from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Security
 from starlette import status
-from tortoise.contrib.pydantic import PydanticModel, pydantic_model_creator
+from starlette.requests import Request
+from starlette.responses import Response
 
 from farpostbooks_backend.db.dao.book_dao import BookDAO
-from farpostbooks_backend.db.models.book_model import BookModel
+from farpostbooks_backend.db.dao.catalogue_dao import CatalogueDAO
+from farpostbooks_backend.db.dao.similar_book_dao import SimilarBookDAO
 from farpostbooks_backend.db.models.user_model import UserModel
 from farpostbooks_backend.services.access_token import get_current_user
+from farpostbooks_backend.services.conditional import (
+    get_validators,
+    is_not_modified,
+    not_modified,
+)
+from farpostbooks_backend.services.events import (
+    AvailabilityEventType,
+    EventBroker,
+    get_event_broker,
+)
 from farpostbooks_backend.services.search_book import search_google_books
-from farpostbooks_backend.web.api.book.schema import BooksDTO
+from farpostbooks_backend.services.server_timing import TimedUJSONResponse
+from farpostbooks_backend.web.api.book.schema import BooksDTO, SimilarBooksDTO
 from farpostbooks_backend.web.api.schema import (
     BookIntroduction,
     BookModelDTO,
     UserModelDTO,
 )
+from farpostbooks_backend.web.api.serializers import (
+    BOOK_DETAIL,
+    BOOK_INTRODUCTION,
+    Serializer,
+    sparse_fields,
+)
 
 router = APIRouter(redirect_slashes=False)
 
@@ -24,13 +43,15 @@ async def create_book(
     book_id: int,
     _: UserModel = Security(get_current_user, scopes=["admin"]),
     book_dao: BookDAO = Depends(),
-) -> PydanticModel:
+    broker: EventBroker = Depends(get_event_broker),
+) -> TimedUJSONResponse:
     """
     Добавление новой книги по ISBN.
 
     :param book_id: ISBN книги.
     :param _: Текущий пользователь по JWT токену.
     :param book_dao: DAO для модели книги.
+    :param broker: Брокер событий о наличии книг.
     :raises HTTPException: Ошибка, если книга не найдена.
     :return: Возвращаем созданную книгу.
     """
@@ -43,28 +64,49 @@ async def create_book(
 
     json_book = book.dict(exclude_none=True)
     json_book["book_id"] = json_book.pop("id")
-    new_book = await book_dao.create_book_model(**json_book)
-    return await pydantic_model_creator(BookModel).from_tortoise_orm(new_book)
+    new_book, created = await book_dao.create_book_model(**json_book)
+    await new_book.fetch_related("user_books__user")
+    if created:
+        await broker.publish(AvailabilityEventType.created, new_book.id)
+    return TimedUJSONResponse(BOOK_DETAIL.dump(new_book))
 
 
 @router.get("/{book_id}", response_model=BookModelDTO)
-async def search_book(
+async def search_book(  # noqa: WPS211
     book_id: int,
+    request: Request,
     _: UserModelDTO = Depends(get_current_user),
     book_dao: BookDAO = Depends(),
-) -> Union[BookModelDTO, PydanticModel]:
+    catalogue_dao: CatalogueDAO = Depends(),
+    serializer: Serializer = Depends(sparse_fields(BOOK_DETAIL)),
+) -> Response:
     """
     Получение информации о книге по ISBN.
 
+    Ответ из БД помечается версией каталога, поэтому повторный запрос
+    с If-None-Match получает 304 без обращения к таблицам книг.
+    Параметр fields (например, fields=id,name,user_books.rating) ограничивает
+    и ответ, и выбираемые из БД столбцы и связи.
+
     :param book_id: ISBN книги.
+    :param request: Запрос.
     :param _: Текущий пользователь по JWT токену.
     :param book_dao: DAO для модели книги.
+    :param catalogue_dao: DAO для версии каталога.
+    :param serializer: Сериализатор с выбранными полями.
     :raises HTTPException: Ошибка, если книга не найдена.
     :return: Возвращаем информацию о книге.
     """
-    book = await book_dao.search_book(book_id=book_id)
+    catalogue = await catalogue_dao.get_catalogue()
+    if is_not_modified(request, catalogue):
+        return not_modified(catalogue)
+
+    book = await book_dao.search_book(book_id=book_id, fields=serializer.tree)
     if book is not None:
-        return await pydantic_model_creator(BookModel).from_tortoise_orm(book)
+        return TimedUJSONResponse(
+            serializer.dump(book),
+            headers=get_validators(catalogue),
+        )
 
     new_book = await search_google_books(book_id)
     if new_book is None:
@@ -72,21 +114,60 @@ async def search_book(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Книга не найдена.",
         )
-    return new_book
+    return TimedUJSONResponse(serializer.dump(new_book))
 
 
 @router.get("/", response_model=List[BookIntroduction])
-async def get_books(
+async def get_books(  # noqa: WPS211
+    request: Request,
     books_dto: BooksDTO = Depends(),
     _: UserModelDTO = Depends(get_current_user),
     book_dao: BookDAO = Depends(),
-) -> List[BookModel]:
+    catalogue_dao: CatalogueDAO = Depends(),
+    serializer: Serializer = Depends(sparse_fields(BOOK_INTRODUCTION)),
+) -> Response:
     """
     Общий список книг (ограничен по limit/offset).
 
+    :param request: Запрос.
     :param _: Текущий пользователь по JWT токену.
     :param books_dto: DTO для запроса списка книг.
     :param book_dao: DAO для модели книги.
+    :param catalogue_dao: DAO для версии каталога.
+    :param serializer: Сериализатор с выбранными полями.
     :return: Возвращаем список книг.
     """
-    return await book_dao.get_books(**books_dto.dict(exclude_none=True))
+    catalogue = await catalogue_dao.get_catalogue()
+    if is_not_modified(request, catalogue):
+        return not_modified(catalogue)
+
+    books = await book_dao.get_books(
+        **books_dto.dict(exclude_none=True),
+        fields=serializer.tree,
+    )
+    return TimedUJSONResponse(
+        serializer.dump_many(books),
+        headers=get_validators(catalogue),
+    )
+
+
+@router.get("/{book_id}/similar", response_model=List[BookIntroduction])
+async def get_similar_books(
+    book_id: int,
+    similar_dto: SimilarBooksDTO = Depends(),
+    _: UserModelDTO = Depends(get_current_user),
+    serializer: Serializer = Depends(sparse_fields(BOOK_INTRODUCTION)),
+) -> Response:
+    """
+    Книги, которые также брали читатели этой книги.
+
+    Список пересчитывается задачей воркера, здесь он только читается.
+
+    :param book_id: ISBN книги.
+    :param similar_dto: DTO для запроса похожих книг.
+    :param _: Текущий пользователь по JWT токену.
+    :param serializer: Сериализатор с выбранными полями.
+    :return: Возвращаем список похожих книг.
+    """
+    books = await SimilarBookDAO.get_similar_books(book_id, limit=similar_dto.limit)
+    return TimedUJSONResponse(serializer.dump_many(books))
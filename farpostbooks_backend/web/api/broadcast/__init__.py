@@ -0,0 +1,4 @@
+"""Broadcast model API."""
+from farpostbooks_backend.web.api.broadcast.views import router
+
+__all__ = ["router"]
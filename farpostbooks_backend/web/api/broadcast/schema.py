@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from farpostbooks_backend.db.models.broadcast_model import BroadcastStatus
+
+
+class BroadcastDTO(BaseModel):
+    """Рассылка и ход ее доставки."""
+
+    id: int
+    key: str
+    status: BroadcastStatus
+    created_timestamp: datetime
+    finished_timestamp: Optional[datetime]
+    total: int
+    sent: int
+    failed: int
+    pending: int
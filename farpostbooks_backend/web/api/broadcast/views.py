@@ -0,0 +1,87 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Security
+from starlette import status
+
+from farpostbooks_backend.db.dao.broadcast_dao import BroadcastDAO, Progress
+from farpostbooks_backend.db.models.broadcast_model import (
+    BroadcastModel,
+    DeliveryStatus,
+)
+from farpostbooks_backend.db.models.user_model import UserModel
+from farpostbooks_backend.services.access_token import get_current_user
+from farpostbooks_backend.web.api.broadcast.schema import BroadcastDTO
+from farpostbooks_backend.web.api.schema import ScrollDTO
+
+router = APIRouter(redirect_slashes=False)
+
+
+def to_dto(broadcast: BroadcastModel, progress: Progress) -> BroadcastDTO:
+    """
+    Рассылка вместе с количеством получателей по состояниям.
+
+    :param broadcast: Модель рассылки.
+    :param progress: Количество получателей по состояниям доставки.
+    :return: DTO рассылки.
+    """
+    return BroadcastDTO(
+        id=broadcast.id,
+        key=broadcast.key,
+        status=broadcast.status,
+        created_timestamp=broadcast.created_timestamp,
+        finished_timestamp=broadcast.finished_timestamp,
+        total=sum(progress.values()),
+        sent=progress.get(DeliveryStatus.sent, 0),
+        failed=progress.get(DeliveryStatus.failed, 0),
+        pending=progress.get(DeliveryStatus.pending, 0),
+    )
+
+
+@router.get("/", response_model=List[BroadcastDTO])
+async def get_broadcasts(
+    scroll_dto: ScrollDTO = Depends(),
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    broadcast_dao: BroadcastDAO = Depends(),
+) -> List[BroadcastDTO]:
+    """
+    Список рассылок с ходом доставки, начиная с последней.
+
+    :param scroll_dto: Параметры limit/offset.
+    :param _: Текущий пользователь по JWT токену.
+    :param broadcast_dao: DAO для рассылок.
+    :return: Список рассылок.
+    """
+    broadcasts = await broadcast_dao.get_broadcasts(
+        **scroll_dto.dict(exclude_none=True),
+    )
+    progress = await broadcast_dao.get_progress(
+        broadcast.id for broadcast in broadcasts
+    )
+    return [
+        to_dto(broadcast, progress.get(broadcast.id, {})) for broadcast in broadcasts
+    ]
+
+
+@router.get("/{broadcast_id}", response_model=BroadcastDTO)
+async def get_broadcast(
+    broadcast_id: int,
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    broadcast_dao: BroadcastDAO = Depends(),
+) -> BroadcastDTO:
+    """
+    Ход доставки рассылки.
+
+    :param broadcast_id: ID рассылки.
+    :param _: Текущий пользователь по JWT токену.
+    :param broadcast_dao: DAO для рассылок.
+    :raises HTTPException: Рассылка не найдена.
+    :return: Рассылка.
+    """
+    broadcast = await broadcast_dao.get_broadcast(broadcast_id)
+    if broadcast is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Рассылка не найдена.",
+        )
+    progress = await broadcast_dao.get_progress([broadcast_id])
+    return to_dto(broadcast, progress.get(broadcast_id, {}))
@@ -0,0 +1,4 @@
+"""Availability events API."""
+from farpostbooks_backend.web.api.events.views import router
+
+__all__ = ["router"]
@@ -0,0 +1,110 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+
+from farpostbooks_backend.services.access_token import get_current_user
+from farpostbooks_backend.services.events import (
+    AvailabilityEvent,
+    EventBroker,
+    Subscription,
+    get_event_broker,
+)
+from farpostbooks_backend.settings import settings
+from farpostbooks_backend.web.api.schema import UserModelDTO
+
+router = APIRouter(redirect_slashes=False)
+
+HEARTBEAT = ": heartbeat\n\n"
+
+
+def format_event(event: AvailabilityEvent) -> str:
+    """
+    Событие в формате text/event-stream.
+
+    :param event: Событие.
+    :return: Сообщение SSE.
+    """
+    event_id, event_type, data = event.id, event.type.value, event.json()
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def format_reset(last_id: int) -> str:
+    """
+    Сообщение о том, что часть событий потеряна и список книг нужно перезапросить.
+
+    :param last_id: Номер последнего события.
+    :return: Сообщение SSE.
+    """
+    return f"id: {last_id}\nevent: reset\ndata: null\n\n"
+
+
+async def event_stream(
+    broker: EventBroker,
+    last_event_id: Optional[int],
+    heartbeat: float,
+) -> AsyncIterator[str]:
+    """
+    Поток событий для одного клиента.
+
+    Heartbeat-комментарии не дают прокси закрыть молчащее соединение.
+    Поток завершается, когда брокер закрывает подписку; браузер
+    переподключится сам и передаст Last-Event-ID.
+
+    :param broker: Брокер событий.
+    :param last_event_id: Номер последнего полученного клиентом события.
+    :param heartbeat: Интервал heartbeat в секундах.
+    :yields: Сообщения SSE.
+    """
+    async with broker.subscribe(last_event_id) as subscription:
+        yield f"retry: {settings.events_retry}\n\n"
+        if subscription.reset:
+            yield format_reset(subscription.last_id)
+        for missed_event in subscription.backlog:
+            yield format_event(missed_event)
+        message = await next_message(subscription, heartbeat)
+        while message is not None:
+            yield message
+            message = await next_message(subscription, heartbeat)
+
+
+async def next_message(subscription: Subscription, heartbeat: float) -> Optional[str]:
+    """
+    Ожидание следующего события или heartbeat по таймауту.
+
+    :param subscription: Подписка клиента.
+    :param heartbeat: Интервал heartbeat в секундах.
+    :return: Сообщение SSE или None, если подписка закрыта.
+    """
+    try:
+        event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+    except asyncio.TimeoutError:
+        return HEARTBEAT
+    if event is None:
+        return None
+    return format_event(event)
+
+
+@router.get("/events")
+async def get_events(
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    _: UserModelDTO = Depends(get_current_user),
+    broker: EventBroker = Depends(get_event_broker),
+) -> StreamingResponse:
+    """
+    Поток событий о взятии, возврате и добавлении книг (Server-Sent Events).
+
+    Заменяет периодический опрос списка книг: клиент получает событие
+    сразу после изменения и перезапрашивает только то, что изменилось.
+
+    :param last_event_id: Номер последнего полученного события.
+    :param _: Текущий пользователь по JWT токену.
+    :param broker: Брокер событий.
+    :return: Поток text/event-stream.
+    """
+    return StreamingResponse(
+        event_stream(broker, last_event_id, settings.events_heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,4 @@
+"""Home screen API."""
+from farpostbooks_backend.web.api.home.views import router
+
+__all__ = ["router"]
@@ -0,0 +1,24 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, conint
+
+from farpostbooks_backend.web.api.schema import BookIntroduction, UserModelDTO
+from farpostbooks_backend.web.api.userbook.schema import UserBookIntroduction
+
+# Сколько последних прочитанных книг можно запросить для главного экрана.
+MAX_HISTORY_LIMIT = 50
+
+
+class HistoryDTO(BaseModel):
+    """Параметры истории прочитанных книг на главном экране."""
+
+    history_limit: conint(ge=1, le=MAX_HISTORY_LIMIT) = 10  # type: ignore
+
+
+class HomeDTO(BaseModel):
+    """Все данные для главного экрана одним ответом."""
+
+    user: UserModelDTO
+    current: Optional[UserBookIntroduction]
+    history: List[UserBookIntroduction]
+    books: List[BookIntroduction]
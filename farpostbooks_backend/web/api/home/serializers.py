@@ -0,0 +1,4 @@
+from farpostbooks_backend.web.api.home.schema import HomeDTO
+from farpostbooks_backend.web.api.serializers import Serializer
+
+HOME = Serializer(HomeDTO)
@@ -0,0 +1,57 @@
+import asyncio
+
+from fastapi import APIRouter, Depends
+
+from farpostbooks_backend.db.dao.book_dao import BookDAO
+from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
+from farpostbooks_backend.db.models.user_model import UserModel
+from farpostbooks_backend.services.access_token import get_current_user
+from farpostbooks_backend.services.server_timing import TimedUJSONResponse
+from farpostbooks_backend.web.api.book.schema import BooksDTO
+from farpostbooks_backend.web.api.home.schema import HistoryDTO, HomeDTO
+from farpostbooks_backend.web.api.home.serializers import HOME
+from farpostbooks_backend.web.api.serializers import BOOK_INTRODUCTION
+
+router = APIRouter(redirect_slashes=False)
+
+
+@router.get("/home", response_model=HomeDTO)
+async def get_home(
+    history_dto: HistoryDTO = Depends(),
+    books_dto: BooksDTO = Depends(),
+    current_user: UserModel = Depends(get_current_user),
+    book_dao: BookDAO = Depends(),
+    user_book_dao: UserBookDAO = Depends(),
+) -> TimedUJSONResponse:
+    """
+    Данные для главного экрана: профиль, текущая книга, история и каталог.
+
+    Пользователь проверяется один раз, а остальные запросы к БД идут
+    параллельно на разных соединениях из пула, поэтому ответ занимает
+    примерно столько же, сколько самый долгий из них.
+
+    :param history_dto: DTO с количеством последних прочитанных книг.
+    :param books_dto: DTO для запроса первой страницы каталога.
+    :param current_user: Текущий пользователь по JWT токену.
+    :param book_dao: DAO для модели книги.
+    :param user_book_dao: DAO для модели книг юзера.
+    :return: Данные главного экрана.
+    """
+    current, history, books = await asyncio.gather(
+        user_book_dao.get_unreturned_book(current_user.id),
+        user_book_dao.get_recent_books(
+            current_user.id,
+            limit=history_dto.history_limit,
+        ),
+        book_dao.get_books(
+            **books_dto.dict(exclude_none=True),
+            fields=BOOK_INTRODUCTION.tree,
+        ),
+    )
+    home = HomeDTO.construct(
+        user=current_user,
+        current=current,
+        history=history,
+        books=books,
+    )
+    return TimedUJSONResponse(HOME.dump(home))
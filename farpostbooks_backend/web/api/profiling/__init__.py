@@ -0,0 +1,4 @@
+"""Profiling API."""
+from farpostbooks_backend.web.api.profiling.views import router
+
+__all__ = ["router"]
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pydantic import BaseModel, confloat
+
+
+class ProfileDTO(BaseModel):
+    """Сохраненный профиль запроса."""
+
+    id: int
+    method: str
+    path: str
+    duration: float
+    created_timestamp: datetime
+
+
+class SamplingDTO(BaseModel):
+    """Правило выборки запросов для профилирования."""
+
+    method: str = "GET"
+    # Шаблон пути маршрута, например /api/books/{book_id}
+    path: str
+    rate: confloat(gt=0, le=1) = 0.1  # type: ignore
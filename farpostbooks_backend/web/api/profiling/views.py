@@ -0,0 +1,137 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Security
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from farpostbooks_backend.db.models.user_model import UserModel
+from farpostbooks_backend.services.access_token import get_current_user
+from farpostbooks_backend.services.profiling import (
+    ProfileFormat,
+    ProfileStore,
+    SamplingRule,
+    find_route,
+    get_profile_store,
+    profile_response,
+)
+from farpostbooks_backend.web.api.profiling.schema import ProfileDTO, SamplingDTO
+
+router = APIRouter(redirect_slashes=False)
+
+
+@router.get("/", response_model=List[ProfileDTO])
+async def get_profiles(
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    store: ProfileStore = Depends(get_profile_store),
+) -> List[ProfileDTO]:
+    """
+    Последние профили запросов этого воркера, начиная с последнего.
+
+    :param _: Текущий пользователь по JWT токену.
+    :param store: Хранилище профилей.
+    :return: Список профилей.
+    """
+    return [
+        ProfileDTO(
+            id=profile.id,
+            method=profile.method,
+            path=profile.path,
+            duration=profile.duration,
+            created_timestamp=profile.created_timestamp,
+        )
+        for profile in store.get_profiles()
+    ]
+
+
+@router.get("/sampling", response_model=Optional[SamplingDTO])
+async def get_sampling(
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    store: ProfileStore = Depends(get_profile_store),
+) -> Optional[SamplingDTO]:
+    """
+    Текущее правило выборки запросов для профилирования.
+
+    :param _: Текущий пользователь по JWT токену.
+    :param store: Хранилище профилей.
+    :return: Правило или None, если выборка выключена.
+    """
+    if store.rule is None:
+        return None
+    return SamplingDTO(
+        method=store.rule.method,
+        path=store.rule.path,
+        rate=store.rule.rate,
+    )
+
+
+@router.put("/sampling", response_model=SamplingDTO)
+async def set_sampling(
+    sampling_dto: SamplingDTO,
+    request: Request,
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    store: ProfileStore = Depends(get_profile_store),
+) -> SamplingDTO:
+    """
+    Профилирование доли запросов к маршруту.
+
+    :param sampling_dto: Метод, шаблон пути и доля запросов.
+    :param request: Запрос.
+    :param _: Текущий пользователь по JWT токену.
+    :param store: Хранилище профилей.
+    :raises HTTPException: Маршрут не найден.
+    :return: Установленное правило.
+    """
+    route = find_route(request.app.routes, sampling_dto.method, sampling_dto.path)
+    if route is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Маршрут не найден.",
+        )
+    store.rule = SamplingRule(
+        method=sampling_dto.method,
+        path=sampling_dto.path,
+        route=route,
+        rate=sampling_dto.rate,
+    )
+    return sampling_dto
+
+
+@router.delete("/sampling", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_sampling(
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    store: ProfileStore = Depends(get_profile_store),
+) -> None:
+    """
+    Выключение выборки запросов для профилирования.
+
+    :param _: Текущий пользователь по JWT токену.
+    :param store: Хранилище профилей.
+    """
+    store.rule = None
+
+
+@router.get("/{profile_id}")
+async def get_profile(
+    profile_id: int,
+    profile_format: ProfileFormat = Query(ProfileFormat.speedscope, alias="format"),
+    _: UserModel = Security(get_current_user, scopes=["admin"]),
+    store: ProfileStore = Depends(get_profile_store),
+) -> Response:
+    """
+    Скачивание профиля для speedscope или в виде HTML.
+
+    :param profile_id: ID профиля.
+    :param profile_format: Формат файла.
+    :param _: Текущий пользователь по JWT токену.
+    :param store: Хранилище профилей.
+    :raises HTTPException: Профиль не найден.
+    :return: Файл профиля.
+    """
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Профиль не найден.",
+        )
+    return profile_response(profile, profile_format)
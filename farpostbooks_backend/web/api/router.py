@@ -1,12 +1,27 @@
 from fastapi.routing import APIRouter
 
-from farpostbooks_backend.web.api import admin, book, monitoring, user, userbook
+from farpostbooks_backend.web.api import (  # noqa: WPS235
+    admin,
+    book,
+    broadcast,
+    events,
+    home,
+    monitoring,
+    profiling,
+    user,
+    userbook,
+)
 
 api_router = APIRouter(redirect_slashes=False)
 api_router.include_router(
     monitoring.router,
 )
 
+api_router.include_router(
+    home.router,
+    tags=["Главный экран"],
+)
+
 api_router.include_router(
     userbook.router,
     prefix="/users",
@@ -25,8 +40,26 @@ api_router.include_router(
     tags=["Администратор"],
 )
 
+api_router.include_router(
+    events.router,
+    prefix="/books",
+    tags=["Все книги"],
+)
+
 api_router.include_router(
     book.router,
     prefix="/books",
     tags=["Все книги"],
 )
+
+api_router.include_router(
+    broadcast.router,
+    prefix="/broadcasts",
+    tags=["Рассылки"],
+)
+
+api_router.include_router(
+    profiling.router,
+    prefix="/profiling",
+    tags=["Профилирование"],
+)
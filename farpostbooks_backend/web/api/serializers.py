@@ -0,0 +1,242 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+from starlette import status
+
+from farpostbooks_backend.db.dao.fields import FieldTree
+from farpostbooks_backend.services.server_timing import timed
+from farpostbooks_backend.web.api.schema import BookIntroduction, BookModelDTO
+
+Converter = Callable[[Any], Any]
+FieldSpec = Tuple[str, str, Any, Optional[Converter]]
+
+# Сколько разных наборов полей хранится для одного сериализатора.
+RESTRICTED_CACHE_SIZE = 128
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat()
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value
+
+
+def _type_converter(
+    field_type: Any,
+    nested: Optional["Serializer"],
+) -> Optional[Converter]:
+    """
+    Подбор функции преобразования значения в JSON-совместимый тип.
+
+    :param field_type: Тип поля pydantic схемы.
+    :param nested: Сериализатор вложенной схемы.
+    :return: Функция преобразования или None, если значение не меняется.
+    """
+    if nested is not None:
+        return nested.convert
+    if not isinstance(field_type, type):
+        return None
+    if issubclass(field_type, (datetime, date)):
+        return _isoformat
+    if issubclass(field_type, Enum):
+        return _enum_value
+    return None
+
+
+def _select_fields(
+    schema: Type[BaseModel],
+    fields: Optional[FieldTree],
+) -> List[ModelField]:
+    """
+    Поля схемы, которые нужно выводить.
+
+    :param schema: Pydantic схема.
+    :param fields: Дерево выбранных полей или None для всех полей.
+    :raises ValueError: Выбраны поля, которых нет в схеме.
+    :return: Поля схемы.
+    """
+    if fields is None:
+        return list(schema.__fields__.values())
+    unknown = sorted(set(fields) - set(schema.__fields__))
+    if unknown:
+        names = ", ".join(unknown)
+        raise ValueError(f"Неизвестные поля: {names}.")
+    return [field for name, field in schema.__fields__.items() if name in fields]
+
+
+def _nested_serializer(
+    field: ModelField,
+    fields: Optional[FieldTree],
+) -> Optional["Serializer"]:
+    """
+    Сериализатор для поля с вложенной схемой.
+
+    :param field: Поле pydantic схемы.
+    :param fields: Выбранные поля вложенной схемы или None для всех.
+    :raises ValueError: Выбраны поля у поля без вложенной схемы.
+    :return: Сериализатор или None, если схема не вложенная.
+    """
+    if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+        return Serializer(field.type_, fields or None)
+    if fields:
+        raise ValueError(f"У поля {field.name} нет вложенных полей.")
+    return None
+
+
+def _field_converter(
+    field: ModelField,
+    nested: Optional["Serializer"],
+) -> Optional[Converter]:
+    """
+    Сборка функции преобразования для поля схемы с учетом None и списков.
+
+    :param field: Поле pydantic схемы.
+    :param nested: Сериализатор вложенной схемы.
+    :return: Функция преобразования или None, если значение не меняется.
+    """
+    item_converter = _type_converter(field.type_, nested)
+    if item_converter is None and field.shape == SHAPE_SINGLETON:
+        return None
+
+    def convert_list(items: Iterable[Any]) -> Any:  # noqa: WPS430
+        if item_converter is None:
+            return list(items)
+        return [item_converter(item) for item in items]
+
+    convert = convert_list if field.shape == SHAPE_LIST else item_converter
+
+    def convert_optional(value: Any) -> Any:  # noqa: WPS430
+        return None if value is None else convert(value)  # type: ignore
+
+    return convert_optional
+
+
+class Serializer:
+    """
+    Предварительно собранный сериализатор для pydantic схемы.
+
+    Обходит поля схемы один раз при создании и дальше переводит объекты
+    Tortoise ORM в словари без повторной валидации доверенных данных.
+    Сериализатор может быть ограничен частью полей (sparse fieldsets),
+    тогда в tree лежит полное дерево полей, которые он выводит.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        fields: Optional[FieldTree] = None,
+    ) -> None:
+        self.schema = schema
+        self.tree: FieldTree = {}
+        self._restricted: Dict[Tuple[str, ...], Serializer] = {}
+        self.fields: Tuple[FieldSpec, ...] = tuple(
+            self._compile(field, fields[field.name] if fields else None)
+            for field in _select_fields(schema, fields)
+        )
+
+    def only(self, fields: str) -> "Serializer":
+        """
+        Сериализатор, ограниченный выбранными полями.
+
+        Собранные сериализаторы переиспользуются для одинаковых наборов полей.
+
+        :param fields: Поля через запятую, вложенные через точку: id,user_books.rating.
+        :return: Сериализатор.
+        """
+        names = {path.strip() for path in fields.split(",")}
+        paths = tuple(sorted(names - {""}))
+        if not paths:
+            return self
+        restricted = self._restricted.get(paths)
+        if restricted is None:
+            restricted = Serializer(self.schema, parse_fields(paths))
+            if len(self._restricted) < RESTRICTED_CACHE_SIZE:
+                self._restricted[paths] = restricted
+        return restricted
+
+    def dump(self, obj: Any) -> Dict[str, Any]:
+        """
+        Преобразование объекта в JSON-совместимый словарь.
+
+        Время учитывается в этапе serialization заголовка Server-Timing.
+
+        :param obj: Модель Tortoise ORM или pydantic схема.
+        :return: Словарь с полями схемы.
+        """
+        with timed("serialization"):
+            return self.convert(obj)
+
+    def dump_many(self, objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Преобразование списка объектов.
+
+        :param objs: Модели Tortoise ORM или pydantic схемы.
+        :return: Список словарей с полями схемы.
+        """
+        convert = self.convert
+        with timed("serialization"):
+            return [convert(obj) for obj in objs]
+
+    def convert(self, obj: Any) -> Dict[str, Any]:
+        """
+        Преобразование объекта без учета времени, в том числе вложенного.
+
+        :param obj: Модель Tortoise ORM или pydantic схема.
+        :return: Словарь с полями схемы.
+        """
+        dumped = {}
+        for alias, name, default, convert in self.fields:
+            value = getattr(obj, name, default)
+            dumped[alias] = value if convert is None else convert(value)
+        return dumped
+
+    def _compile(self, field: ModelField, fields: Optional[FieldTree]) -> FieldSpec:
+        nested = _nested_serializer(field, fields)
+        self.tree[field.name] = {} if nested is None else nested.tree
+        return field.alias, field.name, field.default, _field_converter(field, nested)
+
+
+def parse_fields(paths: Iterable[str]) -> FieldTree:
+    """
+    Дерево полей из списка путей.
+
+    :param paths: Пути к полям через точку.
+    :return: Дерево полей.
+    """
+    tree: FieldTree = {}
+    for path in paths:
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def sparse_fields(serializer: Serializer) -> Callable[[Optional[str]], Serializer]:
+    """
+    Зависимость, выбирающая сериализатор по параметру fields.
+
+    :param serializer: Сериализатор со всеми полями.
+    :return: Зависимость для FastAPI.
+    """
+
+    def dependency(fields: Optional[str] = None) -> Serializer:  # noqa: WPS430
+        if fields is None:
+            return serializer
+        try:
+            return serializer.only(fields)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(error),
+            ) from error
+
+    return dependency
+
+
+BOOK_DETAIL = Serializer(BookModelDTO)
+BOOK_INTRODUCTION = Serializer(BookIntroduction)
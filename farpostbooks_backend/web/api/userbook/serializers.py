@@ -0,0 +1,4 @@
+from farpostbooks_backend.web.api.serializers import Serializer
+from farpostbooks_backend.web.api.userbook.schema import UserBookIntroduction
+
+USER_BOOK = Serializer(UserBookIntroduction)
@@ -1,14 +1,19 @@
-from typing import Optional
-
 from fastapi import APIRouter, Body, Depends, HTTPException
 from starlette import status
 
 from farpostbooks_backend.db.dao.book_dao import BookDAO
 from farpostbooks_backend.db.dao.userbook_dao import UserBookDAO
-from farpostbooks_backend.db.models.userbook_model import UserBookModel
 from farpostbooks_backend.services.access_token import get_current_user
+from farpostbooks_backend.services.events import (
+    AvailabilityEventType,
+    EventBroker,
+    get_event_broker,
+)
+from farpostbooks_backend.services.server_timing import TimedUJSONResponse
 from farpostbooks_backend.web.api.schema import ScrollDTO, UserModelDTO
+from farpostbooks_backend.web.api.serializers import Serializer, sparse_fields
 from farpostbooks_backend.web.api.userbook.schema import UserBookIntroduction, UserBooks
+from farpostbooks_backend.web.api.userbook.serializers import USER_BOOK
 
 router = APIRouter(redirect_slashes=False)
 
@@ -19,6 +24,7 @@ async def take_book(
     current_user: UserModelDTO = Depends(get_current_user),
     book_dao: BookDAO = Depends(),
     user_book_dao: UserBookDAO = Depends(),
+    broker: EventBroker = Depends(get_event_broker),
 ) -> None:
     """
     Взятие книги по ISBN.
@@ -27,6 +33,7 @@ async def take_book(
     :param current_user: Текущий пользователь по JWT токену.
     :param book_dao: DAO для модели книг.
     :param user_book_dao: DAO для модели книг юзера.
+    :param broker: Брокер событий о наличии книг.
     :raises HTTPException: Ошибка, если не удалось взять книгу.
     """
     book = await book_dao.search_book(book_id=book_id)
@@ -58,6 +65,7 @@ async def take_book(
         telegram_id=current_user.id,
         book_id=book_id,
     )
+    await broker.publish(AvailabilityEventType.taken, book_id)
 
 
 @router.get("/{telegram_id}/books", response_model=UserBooks)
@@ -66,24 +74,37 @@ async def get_user_books(
     scroll_dto: ScrollDTO = Depends(),
     _: UserModelDTO = Depends(get_current_user),
     user_book_dao: UserBookDAO = Depends(),
-) -> UserBooks:
+    serializer: Serializer = Depends(sparse_fields(USER_BOOK)),
+) -> TimedUJSONResponse:
     """
     Общий список книг + текущая книга пользователя по Telegram ID.
 
     (ограничен по limit/offset).
 
+    Параметр fields (например, fields=book.name,rating) выбирает поля
+    каждой книги пользователя.
+
     :param telegram_id: Telegram ID пользователя.
     :param scroll_dto: DTO для работы со скроллингом.
     :param _: Текущий пользователь по JWT токену.
     :param user_book_dao: DAO для модели книг.
+    :param serializer: Сериализатор с выбранными полями.
     :return: Список книг.
     """
-    return UserBooks(
-        current=await user_book_dao.get_unreturned_book(telegram_id),
-        books=await user_book_dao.get_books(
-            telegram_id=telegram_id,
-            **scroll_dto.dict(exclude_none=True),
-        ),
+    current = await user_book_dao.get_unreturned_book(
+        telegram_id,
+        fields=serializer.tree,
+    )
+    books = await user_book_dao.get_books(
+        telegram_id=telegram_id,
+        **scroll_dto.dict(exclude_none=True),
+        fields=serializer.tree,
+    )
+    return TimedUJSONResponse(
+        {
+            "current": None if current is None else serializer.dump(current),
+            "books": serializer.dump_many(books),
+        },
     )
 
 
@@ -93,7 +114,8 @@ async def get_user_book(
     book_id: int,
     _: UserModelDTO = Depends(get_current_user),
     user_book_dao: UserBookDAO = Depends(),
-) -> Optional[UserBookModel]:
+    serializer: Serializer = Depends(sparse_fields(USER_BOOK)),
+) -> TimedUJSONResponse:
     """
     Подробная информация о книге пользователя по Telegram ID и ISBN.
 
@@ -101,12 +123,15 @@ async def get_user_book(
     :param book_id: ISBN книги.
     :param _: Текущий пользователь по JWT токену.
     :param user_book_dao: DAO для модели книг.
+    :param serializer: Сериализатор с выбранными полями.
     :return: Список книг.
     """
-    return await user_book_dao.get_user_book(
+    user_book = await user_book_dao.get_user_book(
         telegram_id=telegram_id,
         book_id=book_id,
+        fields=serializer.tree,
     )
+    return TimedUJSONResponse(None if user_book is None else serializer.dump(user_book))
 
 
 @router.put("/me/books")
@@ -114,6 +139,7 @@ async def return_book(
     rating: int = Body(embed=True),
     current_user: UserModelDTO = Depends(get_current_user),
     user_book_dao: UserBookDAO = Depends(),
+    broker: EventBroker = Depends(get_event_broker),
 ) -> None:
     """
     Обновление информации о книге при возвращении пользователем (timestamp, rating).
@@ -121,6 +147,7 @@ async def return_book(
     :param rating: Рейтинг, выставленный за книгу.
     :param current_user: Текущий пользователь по JWT токену.
     :param user_book_dao: DAO для модели книг юзера.
+    :param broker: Брокер событий о наличии книг.
     :raises HTTPException: Ошибка, если книгу нельзя вернуть пользователем.
     """
     if (rating < 1) or (rating > 5):
@@ -140,3 +167,4 @@ async def return_book(
         telegram_id=current_user.id,
         rating=rating,
     )
+    await broker.publish(AvailabilityEventType.returned, book.book.id)
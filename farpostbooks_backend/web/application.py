@@ -4,10 +4,22 @@ from importlib import metadata
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import UJSONResponse
-from fastapi.staticfiles import StaticFiles
 from tortoise.contrib.fastapi import register_tortoise
 
 from farpostbooks_backend.db.config import TORTOISE_CONFIG
+from farpostbooks_backend.services.admission import (
+    AdmissionMiddleware,
+    create_rate_limiter,
+)
+from farpostbooks_backend.services.compression import CompressionMiddleware
+from farpostbooks_backend.services.db_metrics import instrument_tortoise
+from farpostbooks_backend.services.events import create_event_broker
+from farpostbooks_backend.services.images import ImageApp
+from farpostbooks_backend.services.profiling import ProfileStore, ProfilingMiddleware
+from farpostbooks_backend.services.server_timing import (
+    ServerTimingMiddleware,
+    time_endpoints,
+)
 from farpostbooks_backend.services.utils import (
     EndpointFilter,
     PrometheusMiddleware,
@@ -29,12 +41,44 @@ def enable_metrics(app: FastAPI) -> None:
     :param app: Приложение FastAPI.
     """
     app.add_route("/metrics", metrics)
-    app.add_middleware(PrometheusMiddleware, app_name=settings.environment)
-    setting_otlp(app, settings.environment, settings.OTLP_GRPC_ENDPOINT)
+    instrument_tortoise()
+    app.add_middleware(
+        PrometheusMiddleware,
+        app_name=settings.environment,
+        query_budget=settings.db_query_budget,
+        query_budgets=settings.db_query_budgets,
+    )
+    setting_otlp(app, settings.environment, settings)
     logging.getLogger("uvicorn.access").addFilter(EndpointFilter())
 
 
-def get_app() -> FastAPI:
+def enable_profiling(app: FastAPI) -> None:
+    """
+    Включение профилирования запросов по запросу администратора.
+
+    :param app: Приложение FastAPI.
+    """
+    app.state.profiles = ProfileStore(
+        max_profiles=settings.profiling_max_profiles,
+        interval=settings.profiling_interval,
+    )
+    app.add_middleware(ProfilingMiddleware, store=app.state.profiles)
+
+
+def enable_server_timing(app: FastAPI) -> None:
+    """
+    Включение заголовка Server-Timing.
+
+    Вызывается после подключения роутеров: отмечается завершение
+    их эндпоинтов.
+
+    :param app: Приложение FastAPI.
+    """
+    time_endpoints(app.routes)
+    app.add_middleware(ServerTimingMiddleware, allow_origins=settings.origins)
+
+
+def get_app() -> FastAPI:  # noqa: WPS213
     """
     Конструктор для FastAPI приложения.
 
@@ -49,15 +93,53 @@ def get_app() -> FastAPI:
         default_response_class=UJSONResponse,
     )
 
+    # Рассылка событий о наличии книг.
+    app.state.events = create_event_broker(settings)
+
     # Ивенты при запуске и выключении.
     register_startup_event(app)
     register_shutdown_event(app)
 
     # Конфигурация главного роутера и статики.
-    app.mount("/images", StaticFiles(directory="images"), name="images")
+    app.mount(
+        "/images",
+        ImageApp(
+            directory=settings.image_directory,
+            max_bytes=settings.image_cache_max_bytes,
+            max_item_bytes=settings.image_cache_max_item_bytes,
+            revalidate_after=settings.image_cache_revalidate,
+            cache_control=settings.image_cache_control,
+        ),
+        name="images",
+    )
     app.include_router(router=api_router, prefix="/api")
     app.router.redirect_slashes = False
 
+    # Профилирование запросов администратором
+    enable_profiling(app)
+
+    # Время этапов запроса в заголовке Server-Timing
+    if settings.server_timing:
+        enable_server_timing(app)
+
+    # Сжатие ответов
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        excluded_paths=settings.compression_excluded_paths,
+    )
+
+    # Ограничение частоты запросов и сброс лишней нагрузки
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=create_rate_limiter(settings),
+        limits=settings.rate_limits,
+        max_concurrency=settings.max_concurrency,
+        retry_after=settings.overload_retry_after,
+    )
+
     # Метрики и логирование
     enable_metrics(app)
 
@@ -2,6 +2,10 @@ from typing import Awaitable, Callable
 
 from fastapi import FastAPI
 
+from farpostbooks_backend.services.loop_monitor import LoopMonitor
+from farpostbooks_backend.services.multiprocess_metrics import mark_worker_dead
+from farpostbooks_backend.settings import settings
+
 
 def register_startup_event(
     app: FastAPI,
@@ -18,7 +22,13 @@ def register_startup_event(
 
     @app.on_event("startup")
     async def _startup() -> None:  # noqa: WPS430
-        pass  # noqa: WPS420
+        await app.state.events.start()
+        app.state.loop_monitor = LoopMonitor(
+            settings.environment,
+            interval=settings.loop_monitor_interval,
+            threshold=settings.loop_block_threshold,
+        )
+        app.state.loop_monitor.start()
 
     return _startup
 
@@ -35,6 +45,8 @@ def register_shutdown_event(
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:  # noqa: WPS430
-        pass  # noqa: WPS420
+        await app.state.loop_monitor.stop()
+        await app.state.events.stop()
+        mark_worker_dead()
 
     return _shutdown